@@ -0,0 +1,46 @@
+# datasets.py
+import numpy as np
+import pandas as pd
+
+# Dataset sizes of the benchmark suite, in 1m candles
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+
+
+def parse_size(size) -> int:
+    """Rows of a size label ("10k", "1M") or plain number."""
+    if isinstance(size, int):
+        return size
+    text = str(size).strip()
+    if text in SIZES:
+        return SIZES[text]
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1].lower())
+    if multiplier:
+        return int(float(text[:-1]) * multiplier)
+    return int(text)
+
+
+def size_label(rows: int) -> str:
+    for label, value in SIZES.items():
+        if value == rows:
+            return label
+    return str(rows)
+
+
+def synthetic_candles(rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Fixed 1m candles for benchmarks: a random walk with realistic OHLC ranges. The
+    same rows and seed always give the same candles, so timings are comparable
+    across commits.
+    """
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.0008, rows)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.0004, (2, rows)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=rows, freq="1min", tz="UTC"),
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + wick[0]),
+        "low": np.minimum(open_, close) * (1 - wick[1]),
+        "close": close,
+        "volume": rng.lognormal(3, 1, rows),
+    })
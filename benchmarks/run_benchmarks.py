@@ -0,0 +1,248 @@
+# run_benchmarks.py
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+from benchmarks.datasets import parse_size, size_label, synthetic_candles
+from engine import indicators, kernels
+from engine.candle_store import STORE_DIR
+from engine.data_handler import save_candles_to_csv
+from engine.data_loader import load_csv
+from engine.indicators import INDICATOR_CACHE
+from engine.results_store import data_fingerprint
+from engine.trade_engine import TradeEngine, strategy_signal_arrays
+from engine.strategies.example_strategy import ExampleStrategy
+from engine.strategies.MovingAverageCrossStrategy import MovingAverageCrossStrategy
+from engine.strategies.RSIMovingAverageStrategy import RSIMovingAverageStrategy
+
+STRATEGIES = [ExampleStrategy, MovingAverageCrossStrategy, RSIMovingAverageStrategy]
+SYMBOL = "BENCHUSDT"
+INTERVAL = "1"
+# Strategy whose whole param_grid is swept by the grid_sweep benchmark
+SWEEP_STRATEGY = MovingAverageCrossStrategy
+
+# process_signal builds one event per candle; above this many rows it is skipped
+EVENT_PATH_MAX_ROWS = 100_000
+
+
+def first_params(StrategyClass) -> dict:
+    return next(iter(StrategyClass.generate_param_combinations()))
+
+
+def measure(fn, repeat):
+    """(timings in seconds, peak traced memory in MB) of calling fn()."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    # Separate traced call: tracemalloc slows allocations down
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return timings, peak / 1024 / 1024
+
+
+def benchmark_cases(df):
+    """(name, fn) pairs for one dataset; expects the dataset's CSV in data/."""
+    rows = len(df)
+
+    def load_cold():
+        shutil.rmtree(STORE_DIR, ignore_errors=True)
+        load_csv(SYMBOL, INTERVAL)
+
+    def load_warm():
+        load_csv(SYMBOL, INTERVAL)
+
+    def compute_indicators():
+        indicators.sma(df, 20)
+        indicators.ema(df, 50)
+        indicators.rsi(df, 14)
+        indicators.atr(df, 14)
+
+    def signals(StrategyClass):
+        def run():
+            INDICATOR_CACHE.clear()
+            strategy_signal_arrays(StrategyClass(SYMBOL, INTERVAL, df, first_params(StrategyClass)))
+        return run
+
+    INDICATOR_CACHE.clear()
+    replay_strategy = MovingAverageCrossStrategy(SYMBOL, INTERVAL, df, first_params(MovingAverageCrossStrategy))
+    timestamps, close, signal_array = strategy_signal_arrays(replay_strategy)
+
+    def replay():
+        TradeEngine().replay_arrays(SYMBOL, timestamps, close, signal_array)
+
+    def process_signal():
+        replay_strategy.run()
+        signals = replay_strategy.get_results()
+        engine = TradeEngine()
+        events = signals + [{"timestamp": ts, "symbol": SYMBOL, "action": "price_update", "price": price}
+                            for ts, price in zip(df["timestamp"], close)]
+        events.sort(key=lambda event: event["timestamp"])
+        for event in events:
+            engine.process_signal(event)
+
+    def grid_sweep():
+        INDICATOR_CACHE.clear()
+        for params in SWEEP_STRATEGY.generate_param_combinations():
+            TradeEngine().run_strategy(SWEEP_STRATEGY(SYMBOL, INTERVAL, df, params))
+
+    cases = [("load_csv_cold", load_cold), ("load_csv_warm", load_warm), ("indicators", compute_indicators)]
+    cases += [(f"signals_{StrategyClass.__name__}", signals(StrategyClass)) for StrategyClass in STRATEGIES]
+    cases.append(("replay_arrays", replay))
+    if rows <= EVENT_PATH_MAX_ROWS:
+        cases.append(("process_signal", process_signal))
+    cases.append((f"grid_sweep_{SWEEP_STRATEGY.__name__}", grid_sweep))
+    return cases
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "numba": getattr(kernels.numba, "__version__", None),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_benchmarks(sizes=("10k", "100k", "1M"), repeat=3, only=None, seed=42):
+    """
+    Runs every benchmark on a fixed synthetic dataset per size, in a scratch working
+    directory with the result cache off.
+
+    :param only: substrings; run only benchmarks whose name contains one of them
+    :return: report dict, see write_report
+    """
+    results = []
+    cwd = os.getcwd()
+    cache_path = getattr(config, "RESULT_CACHE_PATH", None)
+    config.RESULT_CACHE_PATH = None
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            os.chdir(scratch)
+            for rows in [parse_size(size) for size in sizes]:
+                df = synthetic_candles(rows, seed)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    save_candles_to_csv(df, SYMBOL, INTERVAL)
+                fingerprint = data_fingerprint(df)
+                for name, fn in benchmark_cases(df):
+                    if only and not any(part in name for part in only):
+                        continue
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        timings, peak_mb = measure(fn, repeat)
+                    result = {
+                        "name": name,
+                        "size": size_label(rows),
+                        "rows": rows,
+                        "data": fingerprint,
+                        "repeat": repeat,
+                        "min_s": min(timings),
+                        "median_s": statistics.median(timings),
+                        "rows_per_s": rows / min(timings) if min(timings) > 0 else None,
+                        "peak_mb": peak_mb,
+                    }
+                    results.append(result)
+                    print(f"⏱️ {name:<40} {size_label(rows):>5}  {result['median_s'] * 1000:10.1f} ms  "
+                          f"{peak_mb:8.1f} MB")
+                shutil.rmtree("data", ignore_errors=True)
+                INDICATOR_CACHE.clear()
+    finally:
+        os.chdir(cwd)
+        config.RESULT_CACHE_PATH = cache_path
+    return {"environment": environment(), "results": results}
+
+
+def write_report(report, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"🧾 Benchmark report saved to {path}")
+
+
+def compare_reports(baseline, current, threshold=1.2):
+    """
+    Rows of (name, size, baseline time, current time, ratio) for benchmarks in both
+    reports on the same data, and the names that got more than `threshold` times
+    slower. Compares the fastest run, the least noisy of the timings.
+    """
+    before = {(r["name"], r["size"], r["data"]): r for r in baseline["results"]}
+    rows, regressions = [], []
+    for result in current["results"]:
+        old = before.get((result["name"], result["size"], result["data"]))
+        if old is None or old["min_s"] <= 0:
+            continue
+        ratio = result["min_s"] / old["min_s"]
+        rows.append((result["name"], result["size"], old["min_s"], result["min_s"], ratio))
+        if ratio > threshold:
+            regressions.append(f"{result['name']}[{result['size']}]")
+    return rows, regressions
+
+
+def default_report_path(report) -> str:
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    commit = report["environment"]["commit"] or "nogit"
+    return os.path.join("results", "benchmarks", f"{stamp}-{commit}.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the loader, indicators, strategies, engine and optimizer.")
+    parser.add_argument("--sizes", default="10k,100k,1M", help="comma-separated dataset sizes (default: 10k,100k,1M)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark (default: 3)")
+    parser.add_argument("--only", default=None, help="comma-separated name filters, e.g. replay,signals")
+    parser.add_argument("--output", default=None, help="report path (default: results/benchmarks/<time>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="slowdown ratio reported as a regression (default: 1.2)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes.split(","), args.repeat, args.only.split(",") if args.only else None)
+    write_report(report, args.output or default_report_path(report))
+    if not args.compare:
+        return 0
+
+    with open(args.compare, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows, regressions = compare_reports(baseline, report, args.threshold)
+    print(f"\nAgainst {args.compare} ({baseline['environment'].get('commit')}):")
+    for name, size, old, new, ratio in rows:
+        flag = "⚠️" if ratio > args.threshold else "  "
+        print(f"{flag} {name:<40} {size:>5}  {old * 1000:10.1f} → {new * 1000:10.1f} ms  x{ratio:.2f}")
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
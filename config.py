@@ -21,3 +21,75 @@ SLIPPAGE_PCT = 0.001  # 0.05%
 POSITION_MODE = "fixed"  # "fixed" or "percent"
 FIXED_TRADE_AMOUNT = 10  # Used if POSITION_MODE is "fixed"
 RISK_PCT = 0.01          # Used if POSITION_MODE is "percent" percent of available balance
+
+# Optimizer parallelism
+OPTIMIZER_WORKERS = 1  # Worker processes for parameter sweeps; 0 = one per CPU core
+
+# Indicator cache
+INDICATOR_CACHE_MB = 256  # Memory cap for cached indicator series, per process
+
+# Concurrent downloader (engine/async_downloader.py)
+DOWNLOAD_REQUESTS_PER_SECOND = 10  # Request budget shared by all downloads
+DOWNLOAD_CONCURRENCY = 8           # Requests in flight / pooled HTTP connections
+
+# Higher intervals are resampled from 1m candles, so only 1m data is downloaded
+RESAMPLE_FROM_1M = True
+
+# Streaming backtests (engine/streaming.py)
+STREAM_CHUNK_ROWS = 100_000  # Candles per chunk; bounds memory per streamed symbol
+
+# Equity curve sampling: "every" event, on balance "change", or one per "resolution" bucket
+EQUITY_CURVE_MODE = "change"
+EQUITY_CURVE_RESOLUTION = None  # e.g. "1h", required by "resolution"
+
+# TP/SL fills between signals: "close" checks candle closes only; "pessimistic" /
+# "optimistic" check each candle's high/low and, when both levels are inside one
+# candle, fill at the stop-loss / take-profit
+FILL_MODEL = "close"
+
+# Optimizer pruning (off when None / empty)
+PRUNE_MAX_DRAWDOWN_PCT = None  # Stop a train run once drawdown exceeds this percent, e.g. 20
+PRUNE_MIN_EQUITY = None        # Stop a train run once the balance drops below this, e.g. 9000
+PRUNE_HALVING_RUNGS = []       # Successive-halving train prefixes, e.g. [0.25, 0.5]
+PRUNE_HALVING_ETA = 2          # Keep the best 1/eta configs at each rung
+
+# Optimizer search: "grid" tries every param_grid combination; "random", "tpe" or
+# "halving" sample the strategy's param_ranges within a budget (engine/param_search.py)
+OPTIMIZER_SEARCH = "grid"
+OPTIMIZER_SEARCH_BUDGET = 50     # Parameter sets evaluated per search
+OPTIMIZER_SEARCH_SECONDS = None  # Optional wall-clock limit for a search
+OPTIMIZER_SEARCH_SEED = None     # Fix for reproducible searches
+
+# Walk-forward folds (walk_forward_optimizer.py)
+WALK_FORWARD_FOLDS = 1          # Back-to-back test windows ending at the last candle
+WALK_FORWARD_TRAIN_DAYS = None  # None: 2 x test window
+WALK_FORWARD_TEST_DAYS = None   # None: HISTORICAL_DAYS / (folds + 2)
+WALK_FORWARD_ANCHORED = False   # True: every fold trains from the first candle
+
+# Optimizer results store (engine/results_store.py): every result is appended as it finishes
+OPTIMIZER_RESULTS_STORE = "results/optimizer_store"  # Directory of .jsonl shards; None disables
+OPTIMIZER_RESULTS_SHARD = None  # Shard file name for this machine, default the host name
+OPTIMIZER_RESUME = False        # Skip configs already in the store (continue an interrupted sweep)
+OPTIMIZER_PARTITION = None      # (index, count): run every count-th config, to split a sweep across machines
+
+# Backtest result cache (engine/result_cache.py): identical runs restore the stored end state
+RESULT_CACHE_PATH = "data/result_cache.sqlite"  # None disables
+RESULT_CACHE_MB = 512                           # Least recently used results are evicted beyond this
+
+# Compiled kernels (engine/kernels.py): use Numba when it is installed
+USE_NUMBA = True
+
+# Per-stage timing of optimizer / strategy runs (engine/instrumentation.py)
+INSTRUMENTATION = False
+INSTRUMENTATION_DIR = "results/instrumentation"
+# cProfile the evaluation of the parameter set matching these values, e.g. {"entry_interval": 10}
+PROFILE_PARAMS = None
+PROFILE_DIR = "results/profiles"
+
+# Candle data quality (engine/data_quality.py): reports are cached per store file here
+QUALITY_INDEX_PATH = "data/store/quality_index.json"
+FILL_GAPS = False  # load_csv fills missing candles forward onto a dense grid
+
+# Gap checker CLI (engine/gap_checker.py)
+GAP_CHECK_WORKERS = 0             # Files checked in parallel; 0 = one worker per CPU core
+GAP_CHECK_CHUNK_ROWS = 1_000_000  # CSV rows read at a time; bounds memory per file
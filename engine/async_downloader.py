@@ -0,0 +1,235 @@
+# async_downloader.py
+import asyncio
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+from engine import data_handler
+from engine.candle_store import load_columns
+from engine.data_handler import apply_sync, interval_to_timedelta, parse_klines, plan_sync, save_candles
+from engine.data_loader import source_interval
+
+PAGE_CANDLES = 1000  # Bybit kline limit per request
+
+
+class RateLimited(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average with bursts of up to
+    `capacity`. Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def drain(self):
+        """Empties the bucket, e.g. after the server answered 429."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+
+
+class AsyncCandleDownloader:
+    """
+    Downloads kline pages for many symbol/interval pairs concurrently.
+
+    Page ranges are known up front, so every page of every pair is scheduled at
+    once; `concurrency` bounds requests in flight over one pooled HTTP session and
+    a token bucket keeps the request rate under `requests_per_second`. Failed
+    requests back off exponentially with jitter, and a 429 also drains the bucket.
+
+    Requests are made with requests.Session in worker threads, which keeps the
+    repo on its existing HTTP dependency.
+    """
+
+    def __init__(self, requests_per_second=None, concurrency=None, max_retries=5,
+                 backoff_base=0.5, backoff_max=30.0, endpoint=None, timeout=10):
+        if requests_per_second is None:
+            requests_per_second = getattr(config, "DOWNLOAD_REQUESTS_PER_SECOND", 10)
+        if concurrency is None:
+            concurrency = getattr(config, "DOWNLOAD_CONCURRENCY", 8)
+        self.requests_per_second = requests_per_second
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.endpoint = endpoint or data_handler.BYBIT_ENDPOINT
+        self.timeout = timeout
+
+        self.requests = 0
+        self.retries = 0
+        self.failed_pages = 0
+        self.candles = 0
+        self.elapsed = 0.0
+
+    def _get(self, session, params):
+        response = session.get(self.endpoint, params=params, timeout=self.timeout)
+        if response.status_code == 429:
+            raise RateLimited("HTTP 429")
+        response.raise_for_status()
+        data = response.json()
+        if data["retCode"] == 10006:
+            raise RateLimited(data.get("retMsg"))
+        if data["retCode"] != 0:
+            raise Exception(f"Bybit API error: {data.get('retMsg')}")
+        return data["result"]["list"]
+
+    async def fetch_page(self, symbol: str, interval: str, start: datetime, end: datetime):
+        """One page of candles in [start, end]; None if every attempt failed."""
+        params = {
+            "category": "linear",
+            "symbol": symbol,
+            "interval": interval,
+            "start": int(start.timestamp() * 1000),
+            "end": int(end.timestamp() * 1000),
+            "limit": PAGE_CANDLES,
+        }
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries):
+            await self._bucket.acquire()
+            async with self._slots:
+                self.requests += 1
+                try:
+                    rows = await loop.run_in_executor(self._executor, self._get, self._session, params)
+                    df = parse_klines(rows)
+                    self.candles += len(df)
+                    return df
+                except Exception as e:
+                    if isinstance(e, RateLimited):
+                        self._bucket.drain()
+                    error = e
+
+            if attempt + 1 < self.max_retries:
+                self.retries += 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+                print(f"⚠️ Error fetching {symbol} {interval}m: {error} (attempt {attempt + 1}/{self.max_retries}, retry in {delay:.2f}s)")
+                await asyncio.sleep(delay)
+
+        print(f"❌ Failed fetching {symbol} {interval}m page from {start} after retries.")
+        self.failed_pages += 1
+        return None
+
+    async def fetch_range(self, symbol: str, interval: str, start: datetime, end: datetime):
+        """All candles in [start, end], pages fetched concurrently; None if a page failed."""
+        step = interval_to_timedelta(interval)
+        # Pages start on the candle grid so each one holds exactly PAGE_CANDLES slots
+        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        page_start = epoch - (epoch - start) // step * step
+        pages = []
+        while page_start <= end:
+            pages.append((page_start, min(page_start + step * (PAGE_CANDLES - 1), end)))
+            page_start += step * PAGE_CANDLES
+
+        dfs = await asyncio.gather(*(self.fetch_page(symbol, interval, s, e) for s, e in pages))
+        if any(df is None for df in dfs):
+            return None
+        dfs = [df for df in dfs if not df.empty]
+        if not dfs:
+            return pd.DataFrame()
+        return pd.concat(dfs).drop_duplicates("timestamp").sort_values("timestamp").reset_index(drop=True)
+
+    async def sync_pair(self, symbol: str, interval: str, days: int, backfill_gaps: bool = True) -> bool:
+        """Async counterpart of data_handler.sync_candles."""
+        try:
+            columns = load_columns(symbol, interval)
+            if columns is None or len(columns["timestamp"]) == 0:
+                end_time = datetime.now(timezone.utc)
+                full_df = await self.fetch_range(symbol, interval, end_time - timedelta(days=days), end_time)
+                if full_df is None or full_df.empty:
+                    print(f"❌ No data for {symbol} {interval}m")
+                    return False
+                save_candles(full_df, symbol, interval)
+                return True
+
+            missing, tail = plan_sync(columns, interval, days, backfill_gaps)
+            ranges = missing + ([tail] if tail else [])
+            dfs = await asyncio.gather(*(self.fetch_range(symbol, interval, s, e) for s, e in ranges))
+            if any(df is None for df in dfs):
+                print(f"❌ Incomplete download for {symbol} {interval}m, store left unchanged")
+                return False
+            tail_df = dfs.pop() if tail else pd.DataFrame()
+            return apply_sync(symbol, interval, columns, dfs, tail_df)
+
+        except Exception as e:
+            print(f"❌ Exception syncing {symbol} {interval}m: {e}")
+            return False
+
+    async def sync(self, pairs, days: int, backfill_gaps: bool = True) -> dict:
+        """Syncs every (symbol, interval) pair concurrently; returns {pair: success}."""
+        self._bucket = TokenBucket(self.requests_per_second)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+            self._executor = executor
+
+            pairs = list(pairs)
+            outcomes = await asyncio.gather(*(self.sync_pair(s, i, days, backfill_gaps) for s, i in pairs))
+
+        self.elapsed += time.perf_counter() - started
+        return dict(zip(pairs, outcomes))
+
+    def report(self) -> dict:
+        elapsed = max(self.elapsed, 1e-9)
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failed_pages": self.failed_pages,
+            "candles": self.candles,
+            "seconds": round(self.elapsed, 3),
+            "requests_per_sec": round(self.requests / elapsed, 2),
+            "candles_per_sec": round(self.candles / elapsed, 1),
+        }
+
+
+def download_candles(pairs, days: int, backfill_gaps: bool = True, **kwargs):
+    """
+    Syncs (symbol, interval) pairs with an AsyncCandleDownloader and prints throughput.
+
+    :param kwargs: AsyncCandleDownloader options (requests_per_second, concurrency, ...)
+    :return: ({pair: success}, throughput report dict)
+    """
+    downloader = AsyncCandleDownloader(**kwargs)
+    results = asyncio.run(downloader.sync(pairs, days, backfill_gaps))
+    report = downloader.report()
+    print(f"⬇️ {report['candles']} candles in {report['requests']} requests over {report['seconds']}s "
+          f"({report['candles_per_sec']} candles/s, {report['requests_per_sec']} req/s, {report['retries']} retries)")
+    return results, report
+
+
+if __name__ == "__main__":
+    intervals = sorted({source_interval(interval) for interval in config.INTERVAL}, key=int)
+    pairs = [(symbol, interval) for symbol in config.SYMBOLS for interval in intervals]
+    results, _ = download_candles(pairs, config.HISTORICAL_DAYS)
+    for (symbol, interval), success in results.items():
+        print(f"{'✅ Finished' if success else '❌ Failed'} {symbol} {interval}m")
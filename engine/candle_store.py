@@ -0,0 +1,232 @@
+# candle_store.py
+import json
+import os
+import numpy as np
+import pandas as pd
+
+STORE_DIR = os.path.join("data", "store")
+COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+STORE_VERSION = 1
+# Intervals resampled from the 1m store (data_loader.load_resampled) live here
+DERIVED_DIR = os.path.join(STORE_DIR, "derived")
+
+
+def csv_path(symbol: str, interval: str) -> str:
+    return os.path.join("data", f"{symbol}_{interval}m.csv")
+
+
+def store_path(symbol: str, interval: str, root: str = STORE_DIR) -> str:
+    return os.path.join(root, f"{symbol}_{interval}m")
+
+
+def _file_stat(filename):
+    try:
+        st = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def read_meta(symbol: str, interval: str, root: str = STORE_DIR):
+    try:
+        with open(os.path.join(store_path(symbol, interval, root), "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_store(df, symbol: str, interval: str, root: str = STORE_DIR, extra_meta: dict = None):
+    """
+    Writes candles as one .npy file per column: int64 epoch-nanosecond timestamps
+    and float64 OHLCV. meta.json is written last, so a store without it is ignored.
+
+    :param df: DataFrame with REQUIRED columns sorted by timestamp, or a dict of
+        column arrays as returned by load_columns
+    :param extra_meta: additional fields recorded in meta.json
+    """
+    path = store_path(symbol, interval, root)
+    os.makedirs(path, exist_ok=True)
+
+    meta_file = os.path.join(path, "meta.json")
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+
+    if isinstance(df, dict):
+        arrays = {col: np.asarray(df[col]) for col in COLUMNS}
+        timestamps = arrays["timestamp"]
+    else:
+        timestamps = pd.DatetimeIndex(pd.to_datetime(df["timestamp"], utc=True)).as_unit("ns").asi8
+        arrays = {"timestamp": timestamps}
+        for col in COLUMNS[1:]:
+            arrays[col] = df[col].to_numpy(dtype=np.float64)
+
+    for col, values in arrays.items():
+        tmp_file = os.path.join(path, f"{col}.tmp.npy")
+        np.save(tmp_file, np.ascontiguousarray(values))
+        os.replace(tmp_file, os.path.join(path, f"{col}.npy"))
+
+    meta = {
+        "version": STORE_VERSION,
+        "rows": len(timestamps),
+        "source_csv": _file_stat(csv_path(symbol, interval)),
+        **(extra_meta or {}),
+    }
+    with open(meta_file, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def append_store(df: pd.DataFrame, symbol: str, interval: str) -> bool:
+    """
+    Appends candles newer than the last stored one to each column file in place.
+
+    .npy headers reserve room for the row count to grow, so only the header and the
+    new rows are written. meta.json is updated last; readers never see more rows
+    than it records. Returns False (nothing written) if the store is missing or
+    `df` overlaps it, in which case write_store must be used.
+    """
+    meta = read_meta(symbol, interval)
+    if meta is None or meta.get("version") != STORE_VERSION or df.empty:
+        return False
+
+    path = store_path(symbol, interval)
+    rows = meta["rows"]
+    timestamps = pd.DatetimeIndex(pd.to_datetime(df["timestamp"], utc=True)).as_unit("ns").asi8
+    if rows:
+        stored = np.load(os.path.join(path, "timestamp.npy"), mmap_mode="r")
+        if timestamps[0] <= stored[rows - 1]:
+            return False
+
+    arrays = {"timestamp": timestamps}
+    for col in COLUMNS[1:]:
+        arrays[col] = df[col].to_numpy(dtype=np.float64)
+
+    for col, values in arrays.items():
+        with open(os.path.join(path, f"{col}.npy"), "r+b") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            data_offset = f.tell()
+
+            # Drop rows left behind by an interrupted append
+            f.seek(data_offset + rows * dtype.itemsize)
+            f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            f.truncate()
+
+            f.seek(0)
+            header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": fortran_order,
+                      "shape": (rows + len(values),)}
+            if version == (1, 0):
+                np.lib.format.write_array_header_1_0(f, header)
+            else:
+                np.lib.format.write_array_header_2_0(f, header)
+            if f.tell() != data_offset:
+                raise IOError(f"Cannot grow {col}.npy header in place")
+
+    meta["rows"] = rows + len(timestamps)
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return True
+
+
+def update_source_stat(symbol: str, interval: str):
+    """Records the CSV currently on disk as the one the store matches."""
+    meta = read_meta(symbol, interval)
+    if meta is None:
+        return
+    meta["source_csv"] = _file_stat(csv_path(symbol, interval))
+    with open(os.path.join(store_path(symbol, interval), "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def is_current(symbol: str, interval: str) -> bool:
+    """True if the store exists and was built from the CSV currently on disk (if any)."""
+    meta = read_meta(symbol, interval)
+    if meta is None or meta.get("version") != STORE_VERSION:
+        return False
+    csv_stat = _file_stat(csv_path(symbol, interval))
+    return csv_stat is None or csv_stat == meta.get("source_csv")
+
+
+def convert_csv(symbol: str, interval: str) -> bool:
+    """One-time conversion of data/{symbol}_{interval}m.csv into the columnar store."""
+    filename = csv_path(symbol, interval)
+    if not os.path.exists(filename):
+        return False
+    df = pd.read_csv(filename)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    write_store(df, symbol, interval)
+    print(f"✅ Converted {filename} to columnar store ({len(df)} rows)")
+    return True
+
+
+def load_columns(symbol: str, interval: str, mmap_mode: str = "r"):
+    """
+    Returns a dict of memory-mapped column arrays, converting the CSV first if the
+    store is missing or older than it.
+
+    :param mmap_mode: "r" for read-only views, "c" for private copy-on-write pages
+    :return: dict of column name -> ndarray, or None if no data exists
+    """
+    if not is_current(symbol, interval) and not convert_csv(symbol, interval):
+        return None
+    return read_store(symbol, interval, mmap_mode)
+
+
+def read_store(symbol: str, interval: str, mmap_mode: str = "r", root: str = STORE_DIR):
+    """Maps the columns of an existing store without any freshness check."""
+    path = store_path(symbol, interval, root)
+    rows = read_meta(symbol, interval, root)["rows"]
+    return {col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode=mmap_mode)[:rows] for col in COLUMNS}
+
+
+def to_epoch_ns(value) -> int:
+    """Epoch nanoseconds of a timestamp (str, datetime, Timestamp or int ns); naive times are UTC."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return ts.as_unit("ns").value
+
+
+def frame_timestamps(df: pd.DataFrame) -> np.ndarray:
+    """int64 epoch-ns view of a candle frame's timestamp column."""
+    return pd.DatetimeIndex(df["timestamp"]).as_unit("ns").asi8
+
+
+def range_rows(timestamps, start=None, end=None):
+    """
+    (lo, hi) rows of the sorted epoch-ns `timestamps` with start <= t < end, found
+    by binary search; None leaves that side open.
+    """
+    lo = 0 if start is None else int(np.searchsorted(timestamps, to_epoch_ns(start), side="left"))
+    hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, to_epoch_ns(end), side="left"))
+    return lo, max(lo, hi)
+
+
+def select_range(columns, start=None, end=None) -> dict:
+    """Column arrays limited to start <= timestamp < end; slices of memory maps stay views."""
+    lo, hi = range_rows(columns["timestamp"], start, end)
+    return {col: values[lo:hi] for col, values in columns.items()}
+
+
+def load_range(symbol: str, interval: str, start=None, end=None, mmap_mode: str = "r"):
+    """
+    load_columns limited to start <= timestamp < end. Only the pages of the
+    timestamp file touched by the binary search are read; the returned arrays are
+    views into the memory maps.
+
+    :return: dict of column name -> ndarray, or None if no data exists
+    """
+    columns = load_columns(symbol, interval, mmap_mode)
+    if columns is None:
+        return None
+    return select_range(columns, start, end)
+
+
+def columns_to_frame(columns) -> pd.DataFrame:
+    """Wraps column arrays in a DataFrame without copying them."""
+    data = {"timestamp": pd.to_datetime(columns["timestamp"].view("M8[ns]"), utc=True)}
+    for col in COLUMNS[1:]:
+        data[col] = columns[col]
+    return pd.DataFrame(data, copy=False)
@@ -1,8 +1,14 @@
 import requests
 import pandas as pd
 import os
+import sys
 import time
 from datetime import datetime, timedelta, timezone
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from engine.candle_store import (
+    append_store, columns_to_frame, csv_path, load_columns, update_source_stat, write_store
+)
+from engine.data_quality import find_gaps
 
 BYBIT_ENDPOINT = "https://api.bybit.com/v5/market/kline"
 
@@ -36,22 +42,7 @@ def fetch_bybit_candles(symbol: str, interval: str, start: datetime, end: dateti
             if data["retCode"] != 0:
                 raise Exception(f"Bybit API error: {data.get('retMsg')}")
 
-            candles = data["result"]["list"]
-            if not candles:
-                return pd.DataFrame()
-
-            parsed = [{
-                "timestamp": int(c[0]) // 1000,
-                "open": float(c[1]),
-                "high": float(c[2]),
-                "low": float(c[3]),
-                "close": float(c[4]),
-                "volume": float(c[5])
-            } for c in candles]
-
-            df = pd.DataFrame(parsed)
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", utc=True)
-            return df.sort_values("timestamp").reset_index(drop=True)
+            return parse_klines(data["result"]["list"])
 
         except Exception as e:
             print(f"⚠️ Error fetching {symbol} {interval}m: {e} (attempt {attempt + 1}/{max_retries})")
@@ -60,43 +51,162 @@ def fetch_bybit_candles(symbol: str, interval: str, start: datetime, end: dateti
     print(f"❌ Failed fetching {symbol} {interval}m candles after retries.")
     return pd.DataFrame()
 
+def parse_klines(candles: list) -> pd.DataFrame:
+    """Bybit kline rows (newest first, string fields) to a timestamp-sorted DataFrame."""
+    if not candles:
+        return pd.DataFrame()
+
+    parsed = [{
+        "timestamp": int(c[0]) // 1000,
+        "open": float(c[1]),
+        "high": float(c[2]),
+        "low": float(c[3]),
+        "close": float(c[4]),
+        "volume": float(c[5])
+    } for c in candles]
+
+    df = pd.DataFrame(parsed)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", utc=True)
+    return df.sort_values("timestamp").reset_index(drop=True)
+
+def fetch_candles_range(symbol: str, interval: str, start_time: datetime, end_time: datetime) -> pd.DataFrame:
+    """Pages through Bybit for all candles from start_time to end_time inclusive (UTC)."""
+    all_dfs = []
+    fetch_start = start_time
+
+    # Inclusive: a one-candle range has start_time == end_time
+    while fetch_start <= end_time:
+        chunk = interval_to_timedelta(interval) * 999
+        fetch_end = fetch_start + chunk
+        if fetch_end > end_time:
+            fetch_end = end_time
+
+        df = fetch_bybit_candles(symbol, interval, fetch_start, fetch_end)
+        if df.empty:
+            print(f"❌ No data for {symbol} {interval}m from {fetch_start} to {fetch_end}")
+            break
+
+        all_dfs.append(df)
+
+        last_ts = df["timestamp"].iloc[-1]
+        if last_ts.tzinfo is None:
+            last_ts = last_ts.replace(tzinfo=timezone.utc)
+
+        fetch_start = last_ts + interval_to_timedelta(interval)
+
+    if not all_dfs:
+        return pd.DataFrame()
+    return pd.concat(all_dfs).drop_duplicates("timestamp").reset_index(drop=True)
+
 def fetch_and_save_candles(symbol: str, interval: str, days: int) -> bool:
     try:
         end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(days=days)
 
-        all_dfs = []
-        fetch_start = start_time
+        full_df = fetch_candles_range(symbol, interval, start_time, end_time)
+        if full_df.empty:
+            return False
 
-        while fetch_start < end_time:
-            chunk = interval_to_timedelta(interval) * 999
-            fetch_end = fetch_start + chunk
-            if fetch_end > end_time:
-                fetch_end = end_time
+        save_candles(full_df, symbol, interval)
+        return True
 
-            df = fetch_bybit_candles(symbol, interval, fetch_start, fetch_end)
-            if df.empty:
-                print(f"❌ No data for {symbol} {interval}m from {fetch_start} to {fetch_end}")
-                break
+    except Exception as e:
+        print(f"❌ Exception in fetch_and_save_candles: {e}")
+        return False
 
-            all_dfs.append(df)
+def sync_candles(symbol: str, interval: str, days: int, backfill_gaps: bool = True) -> bool:
+    """
+    Incremental version of fetch_and_save_candles: downloads only the candles missing
+    from the stored data for the last `days` days - the head before the first
+    stored candle, the tail after the last one and, optionally, the gaps reported
+    by gap_checker. A new tail alone is appended to the store in place.
 
-            last_ts = df["timestamp"].iloc[-1]
-            if last_ts.tzinfo is None:
-                last_ts = last_ts.replace(tzinfo=timezone.utc)
+    Falls back to a full download if nothing is stored yet.
+    """
+    columns = load_columns(symbol, interval)
+    if columns is None or len(columns["timestamp"]) == 0:
+        return fetch_and_save_candles(symbol, interval, days)
 
-            fetch_start = last_ts + interval_to_timedelta(interval)
+    try:
+        missing, tail = plan_sync(columns, interval, days, backfill_gaps)
+        head_dfs = [fetch_candles_range(symbol, interval, s, e) for s, e in missing]
+        tail_df = fetch_candles_range(symbol, interval, *tail) if tail else pd.DataFrame()
+        return apply_sync(symbol, interval, columns, head_dfs, tail_df)
 
-        if not all_dfs:
-            return False
+    except Exception as e:
+        print(f"❌ Exception in sync_candles: {e}")
+        return False
 
-        full_df = pd.concat(all_dfs).drop_duplicates("timestamp").reset_index(drop=True)
-        save_candles_to_csv(full_df, symbol, interval)
+def plan_sync(columns: dict, interval: str, days: int, backfill_gaps: bool = True):
+    """
+    Ranges sync_candles has to download for stored `columns`: a list of (start, end)
+    ranges before and inside the stored data, and the (start, end) tail after it
+    or None when the store is up to date.
+    """
+    step = interval_to_timedelta(interval)
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(days=days)
+    timestamps = columns["timestamp"]
+    first_ts = pd.Timestamp(int(timestamps[0]), tz="UTC").to_pydatetime()
+    last_ts = pd.Timestamp(int(timestamps[-1]), tz="UTC").to_pydatetime()
+
+    missing = []
+    if first_ts - step >= start_time:
+        missing.append((start_time, first_ts - step))
+    if backfill_gaps:
+        for gap_start, gap_end in find_gaps(timestamps, int(interval)):
+            if gap_end >= start_time:
+                missing.append((max(gap_start + step, start_time), gap_end - step))
+    missing = [(s, e) for s, e in missing if s <= e]
+
+    tail = (last_ts + step, end_time) if last_ts + step <= end_time else None
+    return missing, tail
+
+def apply_sync(symbol: str, interval: str, columns: dict, head_dfs: list, tail_df: pd.DataFrame) -> bool:
+    """
+    Stores candles downloaded for a plan_sync plan: a new tail alone is appended in
+    place, anything else is merged with the stored candles and rewritten.
+    """
+    head_dfs = [df for df in head_dfs if not df.empty]
+    if not tail_df.empty:
+        last_ts = pd.Timestamp(int(columns["timestamp"][-1]), tz="UTC")
+        tail_df = tail_df[tail_df["timestamp"] > last_ts].reset_index(drop=True)
+
+    fetched = sum(len(df) for df in head_dfs) + len(tail_df)
+    print(f"⬇️ {symbol} {interval}m: fetched {fetched} missing candles")
+    if fetched == 0:
         return True
 
-    except Exception as e:
-        print(f"❌ Exception in fetch_and_save_candles: {e}")
-        return False
+    if not head_dfs:
+        append_candles(tail_df, symbol, interval)
+        return True
+
+    full_df = pd.concat([columns_to_frame(columns), *head_dfs, tail_df])
+    full_df = full_df.drop_duplicates("timestamp").sort_values("timestamp").reset_index(drop=True)
+    save_candles(full_df, symbol, interval)
+    return True
+
+def append_candles(df: pd.DataFrame, symbol: str, interval: str):
+    """Appends candles newer than the stored ones to the store and its CSV mirror."""
+    if not append_store(df, symbol, interval):
+        full_df = pd.concat([columns_to_frame(load_columns(symbol, interval)), df])
+        save_candles(full_df.drop_duplicates("timestamp").reset_index(drop=True), symbol, interval)
+        return
+
+    filename = csv_path(symbol, interval)
+    if os.path.exists(filename):
+        df.to_csv(filename, mode="a", header=False, index=False)
+        update_source_stat(symbol, interval)
+    print(f"✅ Appended {len(df)} rows to {symbol} {interval}m")
+
+def save_candles(df: pd.DataFrame, symbol: str, interval: str, write_csv: bool = True):
+    """
+    Saves candles to the columnar store read by load_csv. The CSV copy is kept
+    by default for tools that read it directly (gap_checker, backtrader runner).
+    """
+    if write_csv:
+        save_candles_to_csv(df, symbol, interval)
+    write_store(df, symbol, interval)
 
 def save_candles_to_csv(df: pd.DataFrame, symbol: str, interval: str):
     os.makedirs("data", exist_ok=True)
@@ -106,13 +216,14 @@ def save_candles_to_csv(df: pd.DataFrame, symbol: str, interval: str):
 
 if __name__ == "__main__":
     SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
-    INTERVALS = ["1", "5", "15", "30", "60", "240"]
+    # 5m, 15m, 30m, 60m and 240m are resampled from 1m by data_loader.load_csv
+    INTERVALS = ["1"]
     HISTORICAL_DAYS = 30
 
     for symbol in SYMBOLS:
         for interval in INTERVALS:
-            print(f"⬇️ Downloading {symbol} {interval}m candles for {HISTORICAL_DAYS} days...")
-            success = fetch_and_save_candles(symbol, interval, HISTORICAL_DAYS)
+            print(f"⬇️ Syncing {symbol} {interval}m candles for {HISTORICAL_DAYS} days...")
+            success = sync_candles(symbol, interval, HISTORICAL_DAYS)
             if success:
                 print(f"✅ Finished {symbol} {interval}m")
             else:
@@ -1,30 +1,130 @@
 # data_loader.py
-import pandas as pd
 import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+from engine.data_quality import check_quality, describe, file_signature, fill_gaps, indexed_quality
+from engine.instrumentation import timed
+from engine.candle_store import (
+    COLUMNS, DERIVED_DIR, STORE_VERSION, csv_path, load_columns, columns_to_frame, read_meta, read_store,
+    select_range, write_store
+)
 
 REQUIRED_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+BASE_INTERVAL = "1"
+
+def source_interval(interval: str) -> str:
+    """Interval that has to be downloaded to serve `interval`."""
+    if getattr(config, "RESAMPLE_FROM_1M", True):
+        return BASE_INTERVAL
+    return str(interval)
+
+def resample_columns(columns: dict, interval_minutes: int) -> dict:
+    """
+    Aggregates sorted 1m column arrays into interval_minutes candles on the
+    epoch-aligned grid the exchange uses (4h candles open at 00:00, 04:00, ... UTC).
 
-def load_csv(symbol: str, interval: str) -> pd.DataFrame:
+    Gap-aware: only bins holding at least one 1m candle are produced, so a gap in
+    the 1m data stays a gap instead of becoming a flat candle. A bin with missing
+    minutes aggregates the ones it has.
     """
-    Loads a CSV file for the given symbol and interval into a DataFrame.
+    timestamps = np.asarray(columns["timestamp"])
+    if len(timestamps) == 0:
+        return {col: np.asarray(columns[col])[:0] for col in COLUMNS}
+
+    step = interval_minutes * 60 * 10**9
+    bins = timestamps // step
+    starts = np.flatnonzero(np.diff(bins, prepend=bins[0] - 1))
+    ends = np.append(starts[1:], len(timestamps)) - 1
+    return {
+        "timestamp": bins[starts] * step,
+        "open": np.asarray(columns["open"])[starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": np.asarray(columns["close"])[ends],
+        "volume": np.add.reduceat(columns["volume"], starts),
+    }
+
+def load_resampled(symbol: str, interval: str, mmap_mode: str = "r"):
+    """
+    Column arrays for `interval` derived from the 1m store. The result is cached
+    as a store under data/store/derived and rebuilt when the 1m data changes.
+
+    :return: dict of column name -> ndarray, or None if there is no 1m data
+    """
+    base = load_columns(symbol, BASE_INTERVAL)
+    if base is None or len(base["timestamp"]) == 0:
+        return None
+
+    # Identity of the 1m files, so corrected interior candles rebuild the derived store too
+    signature = file_signature(base)
+    source = {"interval": BASE_INTERVAL, "rows": len(base["timestamp"]), "files": signature}
+    meta = read_meta(symbol, interval, DERIVED_DIR)
+    if (signature is None or meta is None or meta.get("version") != STORE_VERSION
+            or meta.get("derived_from") != source):
+        write_store(resample_columns(base, int(interval)), symbol, interval, root=DERIVED_DIR,
+                    extra_meta={"source_csv": None, "derived_from": source})
+    return read_store(symbol, interval, mmap_mode, DERIVED_DIR)
+
+def load_candle_columns(symbol: str, interval: str, mmap_mode: str = "r"):
+    """
+    Memory-mapped column arrays behind load_csv: resampled from 1m when possible,
+    else the interval's own store. None if neither exists.
+    """
+    columns = None
+    if str(interval) != BASE_INTERVAL and source_interval(interval) == BASE_INTERVAL:
+        columns = load_resampled(symbol, str(interval), mmap_mode)
+    if columns is None:
+        columns = load_columns(symbol, interval, mmap_mode)
+    return columns
+
+@timed("load_csv")
+def load_csv(symbol: str, interval: str, start=None, end=None) -> pd.DataFrame:
+    """
+    Loads candles for the given symbol and interval into a DataFrame.
+
+    Reads the memory-mapped columnar store; the CSV is only parsed once, when the
+    store is missing or older than it. Intervals above 1m are resampled from the
+    1m data when it exists (config.RESAMPLE_FROM_1M), otherwise read from their
+    own file.
+
+    The data-quality report of the candles (data_quality.check_quality, kept in the
+    quality index while the store is unchanged) is attached as df.attrs["quality"]
+    for validate_candles. With config.FILL_GAPS, gaps and duplicates are repaired
+    onto a dense grid first (data_quality.fill_gaps).
 
     :param symbol: e.g. BTCUSDT
     :param interval: e.g. 1 (for 1m)
+    :param start, end: only candles with start <= timestamp < end (binary search,
+        the rest of the store is not read)
     :return: DataFrame with candle data or None if not found/invalid
     """
-    filename = f"data/{symbol}_{interval}m.csv"
-    if not os.path.exists(filename):
-        print(f"❌ File not found: {filename}")
-        return None
-
+    filename = csv_path(symbol, interval)
     try:
-        df = pd.read_csv(filename, parse_dates=["timestamp"])
-        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+        # Copy-on-write pages: callers may modify the frame without touching the store
+        columns = load_candle_columns(symbol, interval, mmap_mode="c")
+        if columns is None:
+            print(f"❌ File not found: {filename}")
+            return None
+        if start is None and end is None:
+            report = indexed_quality(f"{symbol}_{interval}m", columns, int(interval))
+        else:
+            columns = select_range(columns, start, end)
+            report = check_quality(columns, int(interval))
+        if getattr(config, "FILL_GAPS", False) and (report["gaps"] or report["duplicates"] or report["out_of_order"]):
+            columns = fill_gaps(columns, int(interval))
+            print(f"✅ Filled {report['missing_candles']} missing candles in {symbol} {interval}m")
+            report = check_quality(columns, int(interval))
+        df = columns_to_frame(columns)
+        df.attrs["quality"] = report
         return df
     except Exception as e:
         print(f"❌ Error loading {filename}: {e}")
         return None
 
+@timed("validate_candles")
 def validate_candles(df: pd.DataFrame, interval: int) -> bool:
     """
     Validates the structure and consistency of candle data.
@@ -43,32 +143,64 @@ def validate_candles(df: pd.DataFrame, interval: int) -> bool:
         print(f"❌ Missing columns: {missing_cols}")
         return False
 
+    # Make sure timestamps are timezone-aware UTC
+    if df["timestamp"].dt.tz is None:
+        df["timestamp"] = df["timestamp"].dt.tz_localize("UTC")
+
+    # load_csv attaches the report of the stored candles; anything else is checked here
+    report = df.attrs.get("quality")
+    if not _report_matches(report, df, interval):
+        report = check_quality(df, interval)
+
     # Ensure sorted by timestamp
-    if not df["timestamp"].is_monotonic_increasing:
+    if report["out_of_order"]:
         print("⚠️ Data not sorted by timestamp. Fixing...")
-        df.sort_values("timestamp", inplace=True)
+        df.sort_values("timestamp", inplace=True, kind="stable")
         df.reset_index(drop=True, inplace=True)
+        report = check_quality(df, interval)
+    df.attrs["quality"] = report
 
-    # Make sure timestamps are timezone-aware UTC
-    if df["timestamp"].dt.tz is None:
-        df["timestamp"] = df["timestamp"].dt.tz_localize("UTC")
+    if report["ohlc_errors"] or report["nan_rows"]:
+        print(f"❌ Invalid candles: {'; '.join(describe(report))}")
+        return False
+    for problem in describe(report):
+        print(f"⚠️ {problem}")
 
-    # Check for missing timestamps based on the interval
-    expected_delta = pd.Timedelta(minutes=interval)
-    actual_deltas = df["timestamp"].diff().dropna()
+    print("✅ Candle data validated successfully.")
+    return True
+
+@timed("validate_candles")
+def validate_columns(columns, symbol: str, interval: str) -> bool:
+    """
+    validate_candles for memory-mapped store columns that are streamed as they are
+    (see streaming.stream_portfolio): they cannot be sorted on the way, so
+    out-of-order timestamps are rejected along with inconsistent OHLC and NaN prices.
+    The quality report comes from the quality index while the store is unchanged.
 
-    tolerance = expected_delta * 1.1  # 10% tolerance for slight timing inaccuracies
-    gaps = actual_deltas[actual_deltas > tolerance]
+    :param columns: dict of column arrays, e.g. from load_candle_columns
+    :return: True if the candles can be backtested
+    """
+    if columns is None or len(columns["timestamp"]) == 0:
+        print(f"❌ No candles for {symbol} {interval}m.")
+        return False
 
-    if not gaps.empty:
-        print(f"⚠️ Missing candles detected: {len(gaps)} gaps")
-        # Optionally, print gap details here
-        # for idx in gaps.index:
-        #     print(f"Gap between {df['timestamp'].iloc[idx-1]} and {df['timestamp'].iloc[idx]} (diff={actual_deltas.loc[idx]})")
+    report = indexed_quality(f"{symbol}_{interval}m", columns, int(interval))
+    if report["out_of_order"] or report["ohlc_errors"] or report["nan_rows"]:
+        print(f"❌ Invalid candles: {'; '.join(describe(report))}")
+        return False
+    for problem in describe(report):
+        print(f"⚠️ {problem}")
 
     print("✅ Candle data validated successfully.")
     return True
 
+def _report_matches(report, df, interval) -> bool:
+    if report is None or report["rows"] != len(df) or report["interval"] != int(interval):
+        return False
+    if len(df) == 0:
+        return True
+    ts = df["timestamp"]
+    return report["first"] == ts.iloc[0].value and report["last"] == ts.iloc[-1].value
 
 
 # ----------- Minimal test -------------
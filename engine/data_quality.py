@@ -0,0 +1,207 @@
+# data_quality.py
+import json
+import os
+import numpy as np
+import pandas as pd
+import config
+
+PRICE_COLUMNS = ["open", "high", "low", "close"]
+GAP_TOLERANCE = 1.1  # a step over 110% of the interval is a gap
+
+# Report fields that make a series unusable as it is; gaps are only warnings
+ERROR_FIELDS = ["out_of_order", "duplicates", "ohlc_errors", "nan_rows"]
+
+
+def _epoch_ns(timestamps):
+    ts = np.asarray(timestamps)
+    if np.issubdtype(ts.dtype, np.integer):
+        return ts.astype(np.int64, copy=False)
+    return pd.DatetimeIndex(timestamps).as_unit("ns").asi8
+
+
+def _columns(data) -> dict:
+    """Column arrays of a candle DataFrame or column dict, timestamps as epoch ns."""
+    columns = {"timestamp": _epoch_ns(data["timestamp"])}
+    for col in PRICE_COLUMNS + ["volume"]:
+        if col in data:
+            columns[col] = np.asarray(data[col], dtype=np.float64)
+    return columns
+
+
+def find_gaps(timestamps, expected_interval_minutes):
+    """
+    Candles bounding each gap longer than the expected interval (10% tolerance).
+
+    :param timestamps: sorted candle times, datetime-like or int64 epoch nanoseconds
+    :return: list of (last candle before, first candle after) UTC Timestamps
+    """
+    starts, ends = gap_bounds(timestamps, expected_interval_minutes)
+    return [(pd.Timestamp(int(s), tz="UTC"), pd.Timestamp(int(e), tz="UTC")) for s, e in zip(starts, ends)]
+
+
+def gap_bounds(timestamps, expected_interval_minutes):
+    """(start, end) epoch-ns arrays of the candles bounding each gap, see find_gaps."""
+    ts = _epoch_ns(timestamps)
+    step = pd.Timedelta(minutes=expected_interval_minutes).value
+    idx = np.flatnonzero(np.diff(ts) > step * GAP_TOLERANCE)
+    return ts[idx], ts[idx + 1]
+
+
+def check_quality(data, interval_minutes) -> dict:
+    """
+    Data-quality report of a candle series in one vectorized pass: gaps (count,
+    missing candles, largest), duplicate and out-of-order timestamps, candles off
+    the interval grid, OHLC inconsistencies (high < low, open/close outside the
+    range) and rows with NaN prices.
+
+    :param data: candle DataFrame or dict of column arrays
+    :return: JSON-serialisable dict; "ok" is False if any ERROR_FIELDS count is non-zero
+    """
+    columns = _columns(data)
+    ts = columns["timestamp"]
+    step = pd.Timedelta(minutes=interval_minutes).value
+    report = {"rows": len(ts), "interval": int(interval_minutes), "first": None, "last": None,
+              "expected_rows": 0, "gaps": 0, "missing_candles": 0, "largest_gap_minutes": 0.0,
+              "duplicates": 0, "out_of_order": 0, "misaligned": 0, "ohlc_errors": 0, "nan_rows": 0}
+    if len(ts):
+        deltas = np.diff(ts)
+        gap_deltas = deltas[deltas > step * GAP_TOLERANCE]
+        report.update({
+            "first": int(ts[0]),
+            "last": int(ts[-1]),
+            "expected_rows": int((ts.max() - ts.min()) // step) + 1,
+            "gaps": len(gap_deltas),
+            "missing_candles": int(np.sum(np.round(gap_deltas / step) - 1)) if len(gap_deltas) else 0,
+            "largest_gap_minutes": float(gap_deltas.max() / 60e9) if len(gap_deltas) else 0.0,
+            "duplicates": int(np.count_nonzero(deltas == 0)),
+            "out_of_order": int(np.count_nonzero(deltas < 0)),
+            "misaligned": int(np.count_nonzero(ts % step)),
+        })
+
+    if all(col in columns for col in PRICE_COLUMNS):
+        o, h, l, c = (columns[col] for col in PRICE_COLUMNS)
+        nan = np.isnan(o) | np.isnan(h) | np.isnan(l) | np.isnan(c)
+        bad = (h < l) | (c > h) | (c < l) | (o > h) | (o < l)
+        report["nan_rows"] = int(np.count_nonzero(nan))
+        report["ohlc_errors"] = int(np.count_nonzero(bad & ~nan))
+
+    report["ok"] = not any(report[field] for field in ERROR_FIELDS)
+    return report
+
+
+def describe(report, gaps=True) -> list:
+    """Human-readable problems of a check_quality report, worst first (gaps: include the gap summary)."""
+    lines = []
+    if report["out_of_order"]:
+        lines.append(f"{report['out_of_order']} out-of-order timestamps")
+    if report["duplicates"]:
+        lines.append(f"{report['duplicates']} duplicate timestamps")
+    if report["ohlc_errors"]:
+        lines.append(f"{report['ohlc_errors']} candles with inconsistent OHLC")
+    if report["nan_rows"]:
+        lines.append(f"{report['nan_rows']} candles with missing prices")
+    if gaps and report["gaps"]:
+        lines.append(f"{report['gaps']} gaps, {report['missing_candles']} missing candles "
+                     f"(largest {report['largest_gap_minutes']:g} minutes)")
+    if report["misaligned"]:
+        lines.append(f"{report['misaligned']} candles off the {report['interval']}m grid")
+    return lines
+
+
+def fill_gaps(data, interval_minutes) -> dict:
+    """
+    Candles on a dense interval grid from the first to the last candle: sorted,
+    duplicates dropped (last one kept) and every missing candle filled forward as a
+    flat candle at the previous close with zero volume. Candles off the grid of
+    the first candle are dropped.
+
+    :param data: candle DataFrame or dict of column arrays
+    :return: dict of column arrays with int64 epoch-ns timestamps
+    """
+    columns = _columns(data)
+    ts = columns["timestamp"]
+    if len(ts) == 0:
+        return columns
+
+    order = np.argsort(ts, kind="stable")
+    ts = ts[order]
+    # Last row of each run of equal timestamps
+    keep = np.append(ts[1:] != ts[:-1], True)
+    rows = order[keep]
+    ts = ts[keep]
+
+    step = pd.Timedelta(minutes=interval_minutes).value
+    grid = np.arange(ts[0], ts[-1] + 1, step, dtype=np.int64)
+    src = np.searchsorted(ts, grid, side="right") - 1
+    present = ts[src] == grid
+    out = {"timestamp": grid}
+    close = columns["close"][rows][src]
+    for col in PRICE_COLUMNS:
+        out[col] = np.where(present, columns[col][rows][src], close)
+    if "volume" in columns:
+        out["volume"] = np.where(present, columns["volume"][rows][src], 0.0)
+    return out
+
+
+def file_signature(columns):
+    """
+    Identity of the files behind memory-mapped column arrays (path, size, mtime and
+    rows of each), or None when the arrays are not file-backed.
+    """
+    signature = []
+    for col in sorted(columns):
+        filename = getattr(columns[col], "filename", None)
+        if filename is None:
+            return None
+        st = os.stat(filename)
+        signature.append([os.path.abspath(filename), st.st_size, st.st_mtime_ns, len(columns[col])])
+    return signature
+
+
+class QualityIndex:
+    """
+    Small JSON file of check_quality reports keyed by symbol/interval, each stored
+    with the file_signature it was computed for, so unchanged files are not checked
+    again.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = getattr(config, "QUALITY_INDEX_PATH", os.path.join("data", "store", "quality_index.json"))
+        self.path = path
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get(self, key, signature):
+        entry = self._read().get(key)
+        if signature is None or entry is None or entry["signature"] != signature:
+            return None
+        return entry["report"]
+
+    def put(self, key, signature, report):
+        if signature is None:
+            return
+        index = self._read()
+        index[key] = {"signature": signature, "report": report}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, self.path)
+
+
+def indexed_quality(key, columns, interval_minutes, index=None) -> dict:
+    """check_quality of file-backed columns, served from the QualityIndex while the files are unchanged."""
+    if index is None:
+        index = QualityIndex()
+    signature = file_signature(columns)
+    report = index.get(key, signature)
+    if report is None or report["interval"] != int(interval_minutes):
+        report = check_quality(columns, interval_minutes)
+        index.put(key, signature, report)
+    return report
@@ -0,0 +1,99 @@
+# equity_curve.py
+import numpy as np
+import pandas as pd
+
+MODES = ("every", "change", "resolution")
+
+
+def _to_ns(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return pd.Timedelta(value).value
+
+
+class EquityCurve:
+    """
+    Equity samples kept in typed arrays (int64 epoch-ns timestamps, float64 balance)
+    that grow by doubling instead of one dict per sample.
+
+    :param mode: "every" records every call, "change" only when the balance differs
+        from the last sample, "resolution" keeps the last balance per
+        `resolution`-wide time bucket
+    :param resolution: bucket width for "resolution" mode, e.g. "1h" or nanoseconds
+    :param capacity: initial number of preallocated samples
+    """
+
+    def __init__(self, mode="every", resolution=None, capacity=1024):
+        if mode not in MODES:
+            raise ValueError(f"Unknown equity curve mode: {mode}")
+        if mode == "resolution" and resolution is None:
+            raise ValueError("Equity curve mode 'resolution' needs a resolution")
+        self.mode = mode
+        self.resolution = _to_ns(resolution) if resolution is not None else None
+        self._timestamps = np.empty(max(capacity, 1), dtype=np.int64)
+        self._balances = np.empty(max(capacity, 1), dtype=np.float64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[:self._size]
+
+    @property
+    def balances(self) -> np.ndarray:
+        return self._balances[:self._size]
+
+    def record(self, timestamp, balance):
+        """Adds a sample; timestamp is epoch nanoseconds or anything pd.Timestamp accepts."""
+        if not isinstance(timestamp, (int, np.integer)):
+            timestamp = pd.Timestamp(timestamp).value
+        n = self._size
+
+        if n and self.mode == "change" and self._balances[n - 1] == balance:
+            return
+        if n and self.mode == "resolution" and timestamp // self.resolution == self._timestamps[n - 1] // self.resolution:
+            self._timestamps[n - 1] = timestamp
+            self._balances[n - 1] = balance
+            return
+
+        if n == len(self._timestamps):
+            self._timestamps = np.resize(self._timestamps, 2 * n)
+            self._balances = np.resize(self._balances, 2 * n)
+        self._timestamps[n] = timestamp
+        self._balances[n] = balance
+        self._size = n + 1
+
+    def downsample(self, resolution) -> "EquityCurve":
+        """New curve holding the last sample of every `resolution`-wide bucket."""
+        resolution = _to_ns(resolution)
+        timestamps = self.timestamps
+        curve = EquityCurve("resolution", resolution, capacity=1)
+        if len(timestamps) == 0:
+            return curve
+        buckets = timestamps // resolution
+        last = np.flatnonzero(np.diff(buckets, append=buckets[-1] + 1))
+        curve._timestamps = timestamps[last].copy()
+        curve._balances = self.balances[last].copy()
+        curve._size = len(last)
+        return curve
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "timestamp": pd.to_datetime(self.timestamps.view("M8[ns]"), utc=True),
+            "balance": self.balances,
+        })
+
+    def save(self, filename: str):
+        """Writes the samples as an uncompressed .npz (16 bytes per sample)."""
+        np.savez(filename, timestamp=self.timestamps, balance=self.balances)
+
+    @classmethod
+    def load(cls, filename: str) -> "EquityCurve":
+        with np.load(filename) as data:
+            curve = cls(capacity=1)
+            curve._timestamps = data["timestamp"].astype(np.int64)
+            curve._balances = data["balance"].astype(np.float64)
+        curve._size = len(curve._timestamps)
+        return curve
@@ -1,33 +1,122 @@
+import argparse
+import csv
+import json
+import os
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 # Fix: Add project root to Python path
 sys.path.append(str(Path(__file__).parent.parent))
-from config import SYMBOLS, INTERVAL
+import config
+from engine.data_loader import source_interval
+from engine.data_quality import ERROR_FIELDS, check_quality, describe, gap_bounds
+from engine.parallel import run_tasks
+
+# Report fields added up over the chunks of a file and over all files
+SUM_FIELDS = ["rows", "expected_rows", "gaps", "missing_candles", "duplicates", "out_of_order",
+              "misaligned", "ohlc_errors", "nan_rows"]
+# Per-row fields: a chunk's one-row overlap with the previous chunk is counted once
+ROW_FIELDS = ["rows", "misaligned", "ohlc_errors", "nan_rows"]
+CSV_FIELDS = ["file", "symbol", "interval", "status"] + SUM_FIELDS + ["largest_gap_minutes", "error"]
+
+
+def _read_chunks(filename, chunk_rows):
+    """Candle columns of a CSV, chunk_rows at a time, timestamps as int64 epoch ns."""
+    reader = pd.read_csv(filename, usecols=["timestamp", "open", "high", "low", "close"],
+                         dtype={col: np.float64 for col in ["open", "high", "low", "close"]},
+                         chunksize=chunk_rows)
+    with reader:
+        for chunk in reader:
+            columns = {col: chunk[col].to_numpy() for col in ["open", "high", "low", "close"]}
+            columns["timestamp"] = pd.DatetimeIndex(pd.to_datetime(chunk["timestamp"], utc=True)).as_unit("ns").asi8
+            yield columns
+
+
+def scan_file(filename, interval_minutes, chunk_rows=None) -> dict:
+    """
+    check_quality of a candle CSV read in chunks, so files of any size are checked in
+    bounded memory, plus the bounds of every gap. Each chunk is checked together with
+    the last row of the previous one, which catches gaps and disorder across chunk
+    boundaries. Gaps of out-of-order files are counted on the sorted timestamps.
+
+    :param chunk_rows: rows per chunk (default config.GAP_CHECK_CHUNK_ROWS)
+    :return: check_quality fields plus "gap_list" of (start, end) epoch-ns pairs
+    """
+    if chunk_rows is None:
+        chunk_rows = getattr(config, "GAP_CHECK_CHUNK_ROWS", 1_000_000)
+    totals = dict.fromkeys(SUM_FIELDS, 0)
+    largest = 0.0
+    first = lo = hi = None
+    last = None
+    starts, ends = [], []
+    for columns in _read_chunks(filename, chunk_rows):
+        if not len(columns["timestamp"]):
+            continue
+        tail = {col: values[-1:] for col, values in columns.items()}
+        if last is not None:
+            overlap = check_quality(last, interval_minutes)
+            columns = {col: np.concatenate((last[col], values)) for col, values in columns.items()}
+        report = check_quality(columns, interval_minutes)
+        for field in SUM_FIELDS:
+            totals[field] += report[field]
+        if last is not None:
+            for field in ROW_FIELDS:
+                totals[field] -= overlap[field]
+        largest = max(largest, report["largest_gap_minutes"])
+        chunk_starts, chunk_ends = gap_bounds(columns["timestamp"], interval_minutes)
+        starts.append(chunk_starts)
+        ends.append(chunk_ends)
+
+        ts = columns["timestamp"]
+        first = ts[0] if first is None else first
+        lo = ts.min() if lo is None else min(lo, ts.min())
+        hi = ts.max() if hi is None else max(hi, ts.max())
+        last = tail
+
+    step = pd.Timedelta(minutes=interval_minutes).value
+    totals.update({
+        "interval": int(interval_minutes),
+        "first": None if first is None else int(first),
+        "last": None if last is None else int(last["timestamp"][0]),
+        "expected_rows": 0 if lo is None else int((hi - lo) // step) + 1,
+        "largest_gap_minutes": largest,
+    })
+    totals["ok"] = not any(totals[field] for field in ERROR_FIELDS)
+    if totals["out_of_order"]:
+        # Gaps of unsorted data are those of the sorted candles, which takes the
+        # whole timestamp column (8 bytes a row)
+        ts = np.sort(np.concatenate([columns["timestamp"] for columns in _read_chunks(filename, chunk_rows)]))
+        sorted_report = check_quality({"timestamp": ts}, interval_minutes)
+        for field in ["gaps", "missing_candles", "largest_gap_minutes"]:
+            totals[field] = sorted_report[field]
+        chunk_starts, chunk_ends = gap_bounds(ts, interval_minutes)
+        starts, ends = [chunk_starts], [chunk_ends]
+    starts = np.concatenate(starts) if starts else np.empty(0, dtype=np.int64)
+    ends = np.concatenate(ends) if ends else np.empty(0, dtype=np.int64)
+    totals["gap_list"] = list(zip(starts.tolist(), ends.tolist()))
+    return totals
+
 
 def check_gaps(filename, expected_interval_minutes):
     print(f"\nChecking gaps in {filename} (expected interval: {expected_interval_minutes}m)")
     try:
-        df = pd.read_csv(filename, parse_dates=["timestamp"])
-        df = df.sort_values("timestamp").reset_index(drop=True)
-        
-        expected_delta = pd.Timedelta(minutes=expected_interval_minutes)
-        deltas = df["timestamp"].diff().dropna()
-
-        gaps = deltas[deltas > expected_delta * 1.1]  # 10% tolerance
-        
-        if gaps.empty:
+        report = scan_file(filename, expected_interval_minutes)
+        gap_list = report.pop("gap_list")
+
+        if not gap_list:
             print("✅ No gaps found.")
         else:
-            print(f"⚠️ Found {len(gaps)} gaps:")
-            for idx, delta in gaps.items():
-                gap_start = df.loc[idx - 1, "timestamp"]
-                gap_end = df.loc[idx, "timestamp"]
-                gap_minutes = delta / pd.Timedelta(minutes=1)
-                print(f"  Gap {idx}: {gap_start} -> {gap_end} = {gap_minutes:.2f} minutes")
-        return len(gaps)
-    
+            print(f"⚠️ Found {len(gap_list)} gaps:")
+            for n, (start, end) in enumerate(sorted(gap_list), 1):
+                gap_start, gap_end = pd.Timestamp(start, tz="UTC"), pd.Timestamp(end, tz="UTC")
+                print(f"  Gap {n}: {gap_start} -> {gap_end} = {(end - start) / 60e9:.2f} minutes")
+        for problem in describe(report, gaps=False):
+            print(f"⚠️ {problem}")
+        return len(gap_list)
+
     except FileNotFoundError:
         print(f"❌ File not found: {filename}")
         return 0
@@ -35,20 +124,168 @@ def check_gaps(filename, expected_interval_minutes):
         print(f"❌ Failed to check {filename}: {str(e)}")
         return 0
 
-if __name__ == "__main__":
-    total_gaps = 0
-    missing_files = 0
-    
-    for symbol in SYMBOLS:
-        for interval in INTERVAL:
-            filename = f"data/{symbol}_{interval}m.csv"
-            gaps_found = check_gaps(filename, expected_interval_minutes=int(interval))
-            total_gaps += gaps_found
-            if gaps_found == 0 and not Path(filename).exists():
-                missing_files += 1
-    
+
+def _scan_task(context, target):
+    filename, symbol, interval = target
+    entry = {"file": filename, "symbol": symbol, "interval": interval, "status": "ok", "error": None}
+    if not os.path.exists(filename):
+        entry.update(status="missing", error="file not found")
+        return entry
+    try:
+        report = scan_file(filename, int(interval), context["chunk_rows"])
+    except Exception as e:
+        entry.update(status="error", error=str(e))
+        return entry
+    gap_list = report.pop("gap_list")
+    ok = report.pop("ok")
+    entry.update({field: value for field, value in report.items() if field != "interval"})
+    entry["problems"] = describe(report, gaps=False)
+    entry["gap_list"] = [{"start": pd.Timestamp(start, tz="UTC").isoformat(),
+                          "end": pd.Timestamp(end, tz="UTC").isoformat(),
+                          "minutes": (end - start) / 60e9} for start, end in sorted(gap_list)]
+    if not ok:
+        entry["status"] = "error"
+    elif gap_list:
+        entry["status"] = "gaps"
+    return entry
+
+
+def default_targets(symbols=None, intervals=None, data_dir="data"):
+    """
+    (file, symbol, interval) of the files behind every configured symbol and
+    interval, once each. As in load_csv, intervals resampled from 1m
+    (config.RESAMPLE_FROM_1M) map to the 1m file unless only their own file exists.
+    """
+    symbols = config.SYMBOLS if symbols is None else symbols
+    intervals = config.INTERVAL if intervals is None else intervals
+    targets = []
+    for symbol in symbols:
+        for interval in map(str, intervals):
+            source = source_interval(interval)
+            filename = os.path.join(data_dir, f"{symbol}_{source}m.csv")
+            native = os.path.join(data_dir, f"{symbol}_{interval}m.csv")
+            if source != interval and not os.path.exists(filename) and os.path.exists(native):
+                filename, source = native, interval
+            if (filename, symbol, source) not in targets:
+                targets.append((filename, symbol, source))
+    return targets
+
+
+def file_target(filename):
+    """(file, symbol, interval) of a path named like data/BTCUSDT_15m.csv."""
+    stem = Path(filename).stem
+    symbol, _, interval = stem.rpartition("_")
+    if not symbol or not interval.endswith("m") or not interval[:-1].isdigit():
+        raise ValueError(f"Cannot tell symbol and interval from {filename} (expected SYMBOL_<n>m.csv)")
+    return filename, symbol, interval[:-1]
+
+
+def scan_files(targets, workers=None, chunk_rows=None, fail_on_gaps=False) -> dict:
+    """
+    Checks every (file, symbol, interval) target, one file per worker process (see
+    parallel.resolve_workers; default config.GAP_CHECK_WORKERS).
+
+    :param fail_on_gaps: count files with gaps as failed, not only unreadable,
+        missing or inconsistent ones
+    :return: report dict with per-file entries (in target order) and totals
+    """
+    if workers is None:
+        workers = getattr(config, "GAP_CHECK_WORKERS", 0)
+    if chunk_rows is None:
+        chunk_rows = getattr(config, "GAP_CHECK_CHUNK_ROWS", 1_000_000)
+    files = [None] * len(targets)
+    for idx, entry in run_tasks(_scan_task, list(targets), {"chunk_rows": chunk_rows}, workers):
+        files[idx] = entry
+
+    failing = {"missing", "error"} | ({"gaps"} if fail_on_gaps else set())
+    totals = {"files": len(files)}
+    for status in ["ok", "gaps", "error", "missing"]:
+        totals[status] = sum(entry["status"] == status for entry in files)
+    for field in SUM_FIELDS:
+        totals[field] = sum(entry.get(field, 0) for entry in files)
+    totals["largest_gap_minutes"] = max([entry.get("largest_gap_minutes", 0.0) for entry in files], default=0.0)
+    totals["failed"] = sum(entry["status"] in failing for entry in files)
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "fail_on_gaps": fail_on_gaps,
+        "ok": totals["failed"] == 0,
+        "totals": totals,
+        "files": files,
+    }
+
+
+def write_json(report, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"🧾 Gap report saved to {path}")
+
+
+def write_csv(report, path):
+    """One row per file and a TOTAL row; the gap bounds are only in the JSON report."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(report["files"])
+        writer.writerow({"file": "TOTAL", "status": "ok" if report["ok"] else "failed", **report["totals"]})
+    print(f"🧾 Gap summary saved to {path}")
+
+
+def print_summary(report):
+    for entry in report["files"]:
+        label = f"{entry['symbol']} {entry['interval']}m"
+        if entry["status"] == "missing":
+            print(f"❌ {label}: file not found ({entry['file']})")
+        elif entry["status"] == "error" and "rows" not in entry:
+            print(f"❌ {label}: failed to read {entry['file']}: {entry['error']}")
+        else:
+            icon = {"ok": "✅", "gaps": "⚠️", "error": "❌"}[entry["status"]]
+            problems = describe(entry)
+            print(f"{icon} {label}: {entry['rows']} candles" + (f", {'; '.join(problems)}" if problems else ""))
+
+    totals = report["totals"]
     print("\n=== Summary ===")
-    print(f"Total symbols checked: {len(SYMBOLS)}")
-    print(f"Total intervals checked per symbol: {len(INTERVAL)}")
-    print(f"Total files missing: {missing_files}")
-    print(f"Total gaps found: {total_gaps}")
\ No newline at end of file
+    print(f"Total files checked: {totals['files']}")
+    print(f"Total files missing: {totals['missing']}")
+    print(f"Total files with errors: {totals['error']}")
+    print(f"Total gaps found: {totals['gaps']} ({totals['missing_candles']} missing candles)")
+    print("✅ Data check passed" if report["ok"] else f"❌ Data check failed for {totals['failed']} file(s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check candle CSVs for gaps and inconsistencies.")
+    parser.add_argument("files", nargs="*",
+                        help="CSV files named SYMBOL_<n>m.csv (default: the files behind config.SYMBOLS x config.INTERVAL)")
+    parser.add_argument("--symbols", default=None, help="comma-separated symbols (default: config.SYMBOLS)")
+    parser.add_argument("--intervals", default=None, help="comma-separated intervals in minutes (default: config.INTERVAL)")
+    parser.add_argument("--data-dir", default="data", help="directory of the candle CSVs (default: data)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes; 0 = one per CPU core (default: config.GAP_CHECK_WORKERS)")
+    parser.add_argument("--chunk-rows", type=int, default=None,
+                        help="rows read at a time (default: config.GAP_CHECK_CHUNK_ROWS)")
+    parser.add_argument("--json", default=os.path.join("results", "gap_report.json"),
+                        help="JSON report path (default: results/gap_report.json)")
+    parser.add_argument("--csv", default=None, help="also write a per-file CSV summary here")
+    parser.add_argument("--fail-on-gaps", action="store_true", help="exit 1 when any file has gaps")
+    args = parser.parse_args(argv)
+
+    if args.files:
+        try:
+            targets = [file_target(filename) for filename in args.files]
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        targets = default_targets(args.symbols.split(",") if args.symbols else None,
+                                  args.intervals.split(",") if args.intervals else None, args.data_dir)
+
+    report = scan_files(targets, args.workers, args.chunk_rows, args.fail_on_gaps)
+    print_summary(report)
+    write_json(report, args.json)
+    if args.csv:
+        write_csv(report, args.csv)
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# indicators.py
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import config
+
+
+def sma(df: pd.DataFrame, period: int, column: str = "close") -> pd.Series:
+    return df[column].rolling(window=period).mean()
+
+
+def ema(df: pd.DataFrame, period: int, column: str = "close") -> pd.Series:
+    return df[column].ewm(span=period, adjust=False, min_periods=period).mean()
+
+
+def rsi(df: pd.DataFrame, period: int, column: str = "close") -> pd.Series:
+    # Simple moving average RSI, as used by the bundled strategies
+    delta = df[column].diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    avg_gain = gain.rolling(window=period).mean()
+    avg_loss = loss.rolling(window=period).mean()
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def atr(df: pd.DataFrame, period: int) -> pd.Series:
+    prev_close = df["close"].shift(1)
+    true_range = pd.concat([
+        df["high"] - df["low"],
+        (df["high"] - prev_close).abs(),
+        (df["low"] - prev_close).abs(),
+    ], axis=1).max(axis=1)
+    return true_range.rolling(window=period).mean()
+
+
+INDICATORS = {
+    "sma": sma,
+    "ema": ema,
+    "rsi": rsi,
+    "atr": atr,
+}
+
+
+# Candle columns each indicator reads besides the timestamps; others read `column`
+INDICATOR_COLUMNS = {
+    "atr": ("high", "low", "close"),
+}
+
+
+def _column_bytes(values: pd.Series) -> np.ndarray:
+    # Datetime columns as their int64 ticks, without converting tz-aware values to objects
+    if isinstance(values.dtype, pd.DatetimeTZDtype) or np.issubdtype(values.dtype, np.datetime64):
+        return np.ascontiguousarray(values.array.asi8)
+    return np.ascontiguousarray(values.to_numpy())
+
+
+def data_fingerprint(df: pd.DataFrame, columns=("close",)):
+    """
+    Identity of a candle slice: length, index bounds and a hash of every timestamp
+    and of every value in `columns`, so copies edited in place get their own key.
+    """
+    n = len(df)
+    if n == 0:
+        return (0,)
+    digest = hashlib.blake2b(digest_size=16)
+    for col in ("timestamp",) + tuple(columns):
+        values = df[col]
+        digest.update(str(values.dtype).encode())
+        digest.update(_column_bytes(values))
+    return n, df.index[0], df.index[-1], digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator series keyed by (symbol, interval, data slice, indicator, params).
+
+    In a grid sweep every parameter set asks for the same few indicators on the
+    same slice; each is computed once and evicted least-recently-used when the
+    cached series exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = getattr(config, "INDICATOR_CACHE_MB", 256) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, df, name, symbol=None, interval=None, **params) -> pd.Series:
+        """Returns the cached series; callers must not modify it in place."""
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}")
+
+        columns = INDICATOR_COLUMNS.get(name, (params.get("column", "close"),))
+        key = (symbol, interval, data_fingerprint(df, columns), name, tuple(sorted(params.items())))
+        series = self._entries.get(key)
+        if series is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return series
+
+        self.misses += 1
+        series = INDICATORS[name](df, **params)
+        size = series.memory_usage(index=False)
+        if size <= self.max_bytes:
+            self._entries[key] = series
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.memory_usage(index=False)
+        return series
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+# Process-wide cache used by BaseStrategy.indicator
+INDICATOR_CACHE = IndicatorCache()
@@ -0,0 +1,231 @@
+# instrumentation.py
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+import config
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Off by default; timers and counters cost one flag check while off
+_enabled = bool(getattr(config, "INSTRUMENTATION", False))
+_stages = {}    # name -> [calls, seconds, items]
+_counters = {}
+_active_run = None
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+
+def reset():
+    _stages.clear()
+    _counters.clear()
+
+
+def _record(name, seconds, items):
+    stage = _stages.get(name)
+    if stage is None:
+        stage = _stages[name] = [0, 0.0, 0]
+    stage[0] += 1
+    stage[1] += seconds
+    stage[2] += items
+
+
+class _Timer:
+    __slots__ = ("name", "items", "start")
+
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, time.perf_counter() - self.start, self.items)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name, items=0):
+    """
+    Context manager adding the time of its block to stage `name`.
+
+    :param items: units of work done in the block (candles, events), for items/s
+    """
+    return _Timer(name, items) if _enabled else _NULL_TIMER
+
+
+def timed(name):
+    """Decorator form of timer(name)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - start, 0)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def snapshot() -> dict:
+    """Stages and counters collected so far, in a picklable form (see merge)."""
+    return {"stages": {name: list(stage) for name, stage in _stages.items()}, "counters": dict(_counters)}
+
+
+def merge(stats):
+    """Adds a snapshot() taken in another process, e.g. an optimizer worker."""
+    for name, (calls, seconds, items) in stats["stages"].items():
+        stage = _stages.setdefault(name, [0, 0.0, 0])
+        stage[0] += calls
+        stage[1] += seconds
+        stage[2] += items
+    for name, n in stats["counters"].items():
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def peak_rss_mb():
+    """(this process, finished child processes) peak resident memory in MB, or Nones."""
+    if resource is None:
+        return None, None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit)
+
+
+def report(name, wall_seconds) -> dict:
+    """
+    Per-stage breakdown of a run. Stage times are inclusive (a stage timed inside
+    another counts in both) and add up over worker processes, so they can exceed
+    the wall time.
+    """
+    rss, children_rss = peak_rss_mb()
+    stages = {}
+    for stage, (calls, seconds, items) in sorted(_stages.items(), key=lambda kv: -kv[1][1]):
+        stages[stage] = {
+            "calls": calls,
+            "seconds": round(seconds, 6),
+            "share_pct": round(100 * seconds / wall_seconds, 2) if wall_seconds > 0 else None,
+            "items": items,
+            "items_per_s": round(items / seconds, 1) if items and seconds > 0 else None,
+            "calls_per_s": round(calls / seconds, 1) if seconds > 0 else None,
+        }
+    return {
+        "run": name,
+        "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "wall_s": round(wall_seconds, 6),
+        "peak_rss_mb": rss,
+        "peak_rss_children_mb": children_rss,
+        "stages": stages,
+        "counters": dict(_counters),
+    }
+
+
+def print_report(data):
+    print(f"\n⏱️ {data['run']}: {data['wall_s']:.2f}s wall, peak RSS {data['peak_rss_mb'] or 0:.0f} MB")
+    for stage, row in data["stages"].items():
+        rate = f"  {row['items_per_s']:,.0f} items/s" if row["items_per_s"] else ""
+        print(f"   {stage:<24} {row['seconds']:9.3f}s  {row['calls']:>8} calls{rate}")
+    for counter, n in data["counters"].items():
+        print(f"   {counter:<24} {n:>10}")
+
+
+def write_report(data, directory=None) -> str:
+    if directory is None:
+        directory = getattr(config, "INSTRUMENTATION_DIR", os.path.join("results", "instrumentation"))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{data['run']}_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print(f"🧾 Timing report saved to {path}")
+    return path
+
+
+@contextlib.contextmanager
+def run(name):
+    """
+    Context manager / decorator around a whole runner call: when instrumentation is
+    on, collects from scratch and prints and saves the breakdown at the end. Runs
+    nested in another run add to the outer one.
+    """
+    global _active_run
+    if not _enabled or _active_run is not None:
+        yield
+        return
+    reset()
+    _active_run = name
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _active_run = None
+        data = report(name, time.perf_counter() - start)
+        print_report(data)
+        write_report(data)
+
+
+def _profile_selected(params) -> bool:
+    selected = getattr(config, "PROFILE_PARAMS", None)
+    if not selected or not isinstance(params, dict):
+        return False
+    return all(key in params and params[key] == value for key, value in selected.items())
+
+
+@contextlib.contextmanager
+def profile_params(params, label):
+    """
+    Runs its block under cProfile when `params` matches config.PROFILE_PARAMS (every
+    key given there has the same value) and dumps the stats to config.PROFILE_DIR,
+    to be read with pstats / snakeviz.
+    """
+    if not _profile_selected(params):
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        directory = getattr(config, "PROFILE_DIR", os.path.join("results", "profiles"))
+        os.makedirs(directory, exist_ok=True)
+        suffix = "_".join(f"{key}-{value}" for key, value in sorted(params.items()))
+        path = os.path.join(directory, f"{label}_{suffix}_{os.getpid()}.pstats")
+        profiler.dump_stats(path)
+        print(f"🧾 Profile of {params} saved to {path}")
@@ -0,0 +1,166 @@
+# kernels.py
+import math
+import numpy as np
+import config
+
+try:
+    import numba
+except ImportError:  # optional dependency
+    numba = None
+
+LONG = 1
+SHORT = -1
+
+
+def _set(value) -> bool:
+    # Position treats None and 0 as "not set"
+    return value == value and value != 0
+
+
+def _fill(tp_hit, sl_hit, tp, sl, intrabar, pessimistic):
+    # A candle that reaches both levels fills at the stop under the pessimistic
+    # model; on a close-only candle the take-profit is checked first, as in Position
+    if sl_hit and (not tp_hit or (intrabar and pessimistic)):
+        return sl
+    return tp
+
+
+def find_exit_numpy(close, start, stop, direction, entry_price, tp=math.nan, sl=math.nan,
+                    trailing_pct=math.nan, trailing_active=False, high=None, low=None,
+                    intrabar_from=0, pessimistic=True):
+    """
+    First candle in close[start:stop] at which a position exits, with the same rules
+    as Position.should_exit. Searches in growing chunks with array operations; a
+    trailing take-profit is a running max (long) / min (short) of the candidates.
+
+    With high/low, candles from intrabar_from on are checked against their range
+    instead of their close: the favourable extreme for the take-profit (and to move
+    a trailing TP), the adverse one for the stop-loss. Candles before intrabar_from
+    (e.g. the entry candle, whose range precedes the entry) use the close.
+
+    :param direction: LONG (1) or SHORT (-1)
+    :param tp, sl: NaN (or 0) when not set
+    :param trailing_pct: NaN for a position without a trailing TP
+    :param trailing_active: whether the trailing TP was already initialised
+    :param pessimistic: fill at the stop-loss when a candle's range holds both levels
+    :return: (bar or -1, exit price or NaN, take-profit after the scan, trailing_active)
+    """
+    trailing = trailing_pct == trailing_pct
+    if not trailing and not _set(tp) and not _set(sl):
+        return -1, math.nan, tp, trailing_active
+    if high is None or low is None:
+        high = low = close
+        intrabar_from = stop
+
+    is_long = direction == LONG
+    factor = 1 + trailing_pct if is_long else 1 - trailing_pct
+    chunk = 256
+    while start < stop:
+        end = min(stop, start + chunk)
+        seg = close[start:end]
+        favourable = (high if is_long else low)[start:end]
+        adverse = (low if is_long else high)[start:end]
+        close_only = min(max(intrabar_from - start, 0), end - start)
+        if close_only:
+            favourable = np.concatenate((seg[:close_only], favourable[close_only:]))
+            adverse = np.concatenate((seg[:close_only], adverse[close_only:]))
+
+        seg_tp = None
+        if trailing:
+            if is_long:
+                candidates = np.where(favourable > entry_price, favourable * factor, -np.inf)
+            else:
+                candidates = np.where(favourable < entry_price, favourable * factor, np.inf)
+            if not trailing_active:
+                # The first candle only initialises the trailing TP
+                candidates[0] = favourable[0] * factor
+                trailing_active = True
+            else:
+                candidates[0] = max(tp, candidates[0]) if is_long else min(tp, candidates[0])
+            seg_tp = np.maximum.accumulate(candidates) if is_long else np.minimum.accumulate(candidates)
+        elif _set(tp):
+            seg_tp = np.full(len(seg), tp)
+
+        hit_tp = np.zeros(len(seg), dtype=bool)
+        hit_sl = np.zeros(len(seg), dtype=bool)
+        if seg_tp is not None:
+            hit_tp = (seg_tp != 0) & ((favourable >= seg_tp) if is_long else (favourable <= seg_tp))
+        if _set(sl):
+            hit_sl = adverse <= sl if is_long else adverse >= sl
+        hit = hit_tp | hit_sl
+        if hit.any():
+            i = int(np.argmax(hit))
+            bar_tp = float(seg_tp[i]) if seg_tp is not None else tp
+            if trailing:
+                tp = bar_tp
+            price = _fill(bool(hit_tp[i]), bool(hit_sl[i]), bar_tp, float(sl), i >= close_only, pessimistic)
+            return start + i, price, tp, trailing_active
+        if trailing:
+            tp = float(seg_tp[-1])
+        start = end
+        chunk *= 4
+    return -1, math.nan, tp, trailing_active
+
+
+def _find_exit_loop(close, high, low, start, stop, intrabar_from, direction, entry_price, tp, sl,
+                    trailing_pct, trailing_active, pessimistic):
+    # Candle-by-candle form of find_exit_numpy, compiled by Numba when it is installed
+    trailing = trailing_pct == trailing_pct
+    has_sl = sl == sl and sl != 0
+    is_long = direction == 1
+    factor = 1 + trailing_pct if is_long else 1 - trailing_pct
+    for i in range(start, stop):
+        intrabar = i >= intrabar_from
+        if not intrabar:
+            favourable = adverse = close[i]
+        elif is_long:
+            favourable, adverse = high[i], low[i]
+        else:
+            favourable, adverse = low[i], high[i]
+        if trailing:
+            if not trailing_active:
+                tp = favourable * factor
+                trailing_active = True
+            elif is_long and favourable > entry_price:
+                new_tp = favourable * factor
+                if new_tp > tp:
+                    tp = new_tp
+            elif not is_long and favourable < entry_price:
+                new_tp = favourable * factor
+                if new_tp < tp:
+                    tp = new_tp
+        has_tp = tp == tp and tp != 0
+        if is_long:
+            tp_hit = has_tp and favourable >= tp
+            sl_hit = has_sl and adverse <= sl
+        else:
+            tp_hit = has_tp and favourable <= tp
+            sl_hit = has_sl and adverse >= sl
+        if tp_hit or sl_hit:
+            if sl_hit and (not tp_hit or (intrabar and pessimistic)):
+                return i, sl, tp, trailing_active
+            return i, tp, tp, trailing_active
+    return -1, math.nan, tp, trailing_active
+
+
+find_exit_numba = numba.njit(cache=True, nogil=True)(_find_exit_loop) if numba is not None else None
+
+
+def find_exit(close, start, stop, direction, entry_price, tp=math.nan, sl=math.nan,
+              trailing_pct=math.nan, trailing_active=False, high=None, low=None,
+              intrabar_from=0, pessimistic=True):
+    """
+    Exit search used by TradeEngine's batch replay: the Numba kernel when Numba is
+    installed and config.USE_NUMBA is on, find_exit_numpy otherwise. Same arguments
+    and result as find_exit_numpy.
+    """
+    if find_exit_numba is not None and getattr(config, "USE_NUMBA", True):
+        if high is None or low is None:
+            high = low = close
+            intrabar_from = stop
+        bar, price, tp, trailing_active = find_exit_numba(
+            close, high, low, start, stop, intrabar_from, direction, float(entry_price), float(tp),
+            float(sl), float(trailing_pct), bool(trailing_active), bool(pessimistic))
+        return int(bar), float(price), float(tp), bool(trailing_active)
+    return find_exit_numpy(close, start, stop, direction, entry_price, tp, sl, trailing_pct, trailing_active,
+                           high, low, intrabar_from, pessimistic)
@@ -1,23 +1,32 @@
 import os
 import sys
 import csv
+import time
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # Add project root to sys.path
 import config
 from utils import load_class_from_string
+from engine import instrumentation
+from engine.candle_store import frame_timestamps, range_rows
 from engine.data_loader import load_csv, validate_candles
+from engine.instrumentation import profile_params, timer
+from engine.parallel import resolve_workers, run_tasks
+from engine.param_search import SEARCHERS, ParamSpace, RandomSearch
+from engine.result_cache import run_strategy_cached
+from engine.pruning import new_engine, print_prune_report, pruned_info, run_prefix, screen_params
+from engine.shared_candles import SharedCandleCache, row_range
 
 def split_train_test(df, train_days=20, test_days=10):
-    """Split DataFrame into train and test by date."""
+    """Split DataFrame into train and test by date, by binary search on the sorted timestamps."""
     if df.empty:
         return None, None
-    end_date = pd.to_datetime(df["timestamp"].iloc[-1], utc=True)
-    train_start = end_date - pd.Timedelta(days=train_days + test_days)
-    train_end = end_date - pd.Timedelta(days=test_days)
-    train_df = df[(df["timestamp"] >= train_start.isoformat()) & (df["timestamp"] < train_end.isoformat())]
-    test_df = df[(df["timestamp"] >= train_end.isoformat()) & (df["timestamp"] <= end_date.isoformat())]
-    return train_df.reset_index(drop=True), test_df.reset_index(drop=True)
+    timestamps = frame_timestamps(df)
+    end = int(timestamps[-1])
+    train_start = end - pd.Timedelta(days=train_days + test_days).value
+    train_end = end - pd.Timedelta(days=test_days).value
+    lo, mid = range_rows(timestamps, train_start, train_end)
+    return df.iloc[lo:mid].reset_index(drop=True), df.iloc[mid:].reset_index(drop=True)
 
 def evaluate_results(trades, starting_balance):
     """Calculate final balance after trades."""
@@ -38,8 +47,105 @@ def save_results(results, filename="optimizer_results.csv"):
         dict_writer.writerows(results)
     print(f"Saved optimizer results to {filename}")
 
-def main():
+def _evaluate_task(context, params):
+    with profile_params(params, f"optimizer_{context['symbol']}_{context['interval']}m"), timer("evaluate"):
+        return _evaluate(context, params)
+
+def _evaluate(context, params):
+    StrategyClass = context["strategy"]
+    symbol = context["symbol"]
+    interval = context["interval"]
+
+    train_df = context["train"].frame()
+    engine_train = new_engine()
+    run_strategy_cached(engine_train, StrategyClass(symbol, interval, train_df, params))
+    if engine_train.halted:
+        return {**params, **pruned_info(engine_train, train_df, "train")}
+    train_final_balance = evaluate_results(engine_train.get_trades(), config.START_BALANCE)
+
+    engine_test = new_engine(rules={})
+    run_strategy_cached(engine_test, StrategyClass(symbol, interval, context["test"].frame(), params))
+    test_final_balance = evaluate_results(engine_test.get_trades(), config.START_BALANCE)
+
+    return {
+        **params,
+        "train_final_balance": train_final_balance,
+        "test_final_balance": test_final_balance
+    }
+
+def _screen_task(context, task):
+    params, fraction = task
+    return run_prefix(context["strategy"], context["symbol"], context["interval"], context["train"], params, fraction)
+
+def search_params(evaluate, space, context, method="tpe", budget=None, time_budget=None,
+                  seed=None, workers=None, screen=None, score_key="train_final_balance"):
+    """
+    Adaptive alternative to evaluating a full grid: parameter sets are proposed from
+    `space` (see param_search.ParamSpace) and evaluated batch by batch until `budget`
+    sets or `time_budget` seconds are used up. Yields (params, result) as they finish.
+
+    :param evaluate: module-level fn(context, params) returning a result dict
+    :param method: "random", "tpe" (proposals learn from the scores so far) or
+        "halving" (`budget` random sets screened with pruning.screen_params; the
+        time budget does not apply)
+    :param budget: evaluations, default config.OPTIMIZER_SEARCH_BUDGET
+    :param time_budget: seconds, default config.OPTIMIZER_SEARCH_SECONDS (None = no limit)
+    :param screen: screening fn for screen_params, required by "halving"
+    :param score_key: result field to maximize; pruned results score -inf
+    """
+    if budget is None:
+        budget = getattr(config, "OPTIMIZER_SEARCH_BUDGET", 50)
+    if time_budget is None:
+        time_budget = getattr(config, "OPTIMIZER_SEARCH_SECONDS", None)
+    if space.size() is not None:
+        budget = min(budget, space.size())
+
+    if method == "halving":
+        searcher = RandomSearch(space, seed)
+        param_sets = [p for p in (searcher.ask() for _ in range(budget)) if p is not None]
+        eta = getattr(config, "PRUNE_HALVING_ETA", 2)
+        rungs = getattr(config, "PRUNE_HALVING_RUNGS", []) or [1 / eta ** 2, 1 / eta]
+        surviving, pruned = screen_params(screen, param_sets, context, workers, rungs, eta)
+        for idx, info in sorted(pruned.items()):
+            yield param_sets[idx], {**param_sets[idx], **info}
+        run = [param_sets[idx] for idx in surviving]
+        for j, result in run_tasks(evaluate, run, context, workers):
+            yield run[j], result
+        return
+
+    if method not in SEARCHERS:
+        raise ValueError(f"Unknown search method: {method}")
+    searcher = SEARCHERS[method](space, seed)
+    batch_size = resolve_workers(workers)
+    started = time.perf_counter()
+    done = 0
+    while done < budget:
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            print(f"⏱️ Search time budget of {time_budget}s used up after {done} evaluations")
+            break
+        batch = []
+        for _ in range(min(batch_size, budget - done)):
+            params = searcher.ask()
+            if params is None:
+                break
+            batch.append(params)
+        if not batch:
+            break
+        for j, result in run_tasks(evaluate, batch, context, workers):
+            score = float("-inf") if "pruned_by" in result else result[score_key]
+            searcher.tell(batch[j], score)
+            yield batch[j], result
+        done += len(batch)
+
+@instrumentation.run("optimizer")
+def main(workers=None, method=None, budget=None, time_budget=None):
+    """
+    :param method: "grid" (every param_grid combination) or a search_params method,
+        default config.OPTIMIZER_SEARCH
+    """
     StrategyClass = load_class_from_string(config.STRATEGY_CLASS)
+    if method is None:
+        method = getattr(config, "OPTIMIZER_SEARCH", "grid")
 
     symbol = config.SYMBOLS[0]
     interval = config.INTERVAL[0]
@@ -59,30 +165,43 @@ def main():
         print("Train/test split failed, aborting.")
         return
 
-    param_sets = list(StrategyClass.generate_param_combinations())
-    print(f"Running optimization with {len(param_sets)} parameter sets...")
-
     results = []
-
-    for idx, params in enumerate(param_sets, 1):
-        strat_train = StrategyClass(symbol, interval, train_df, params)
-        strat_train.run()
-        train_trades = strat_train.get_results()
-        train_final_balance = evaluate_results(train_trades, config.START_BALANCE)
-
-        strat_test = StrategyClass(symbol, interval, test_df, params)
-        strat_test.run()
-        test_trades = strat_test.get_results()
-        test_final_balance = evaluate_results(test_trades, config.START_BALANCE)
-
-        results.append({
-            **params,
-            "train_final_balance": train_final_balance,
-            "test_final_balance": test_final_balance
-        })
-
-        print(f"[{idx}/{len(param_sets)}] Params: {params} | Train Bal: {train_final_balance:.2f} | Test Bal: {test_final_balance:.2f}")
-
+    pruned_rows = []
+
+    with SharedCandleCache() as cache:
+        candles = cache.publish((symbol, interval), df)
+        context = {
+            "strategy": StrategyClass,
+            "symbol": symbol,
+            "interval": interval,
+            "train": candles.slice(*row_range(df, train_df)),
+            "test": candles.slice(*row_range(df, test_df)),
+        }
+
+        if method == "grid":
+            param_sets = list(StrategyClass.generate_param_combinations())
+            print(f"Running optimization with {len(param_sets)} parameter sets...")
+            surviving, pruned = screen_params(_screen_task, param_sets, context, workers)
+            pruned_rows = [{**param_sets[idx], **info} for idx, info in sorted(pruned.items())]
+            run = [param_sets[idx] for idx in surviving]
+            total = len(run)
+            finished = ((run[j], result) for j, result in run_tasks(_evaluate_task, run, context, workers))
+        else:
+            space = ParamSpace.from_strategy(StrategyClass)
+            total = budget or getattr(config, "OPTIMIZER_SEARCH_BUDGET", 50)
+            print(f"Running {method} search with a budget of {total} parameter sets...")
+            finished = search_params(_evaluate_task, space, context, method, budget, time_budget,
+                                     getattr(config, "OPTIMIZER_SEARCH_SEED", None), workers, _screen_task)
+
+        for done, (params, result) in enumerate(finished, 1):
+            if "pruned_by" in result:
+                pruned_rows.append(result)
+                print(f"[{done}/{total}] Params: {params} | Pruned: {result['pruned_reason']}")
+                continue
+            results.append(result)
+            print(f"[{done}/{total}] Params: {params} | Train Bal: {result['train_final_balance']:.2f} | Test Bal: {result['test_final_balance']:.2f}")
+
+    print_prune_report(pruned_rows, len(results) + len(pruned_rows))
     results.sort(key=lambda x: x["test_final_balance"], reverse=True)
 
     print("\nTop 10 parameter sets by test final balance:")
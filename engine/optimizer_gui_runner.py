@@ -1,108 +1,187 @@
 # engine/optimizer_gui_runner.py
+import itertools
 import os
 import config
+from engine import instrumentation
 from engine.data_loader import load_csv, validate_candles
+from engine.instrumentation import profile_params, timer
 from engine.optimizer import split_train_test, evaluate_results
+from engine.parallel import run_tasks
+from engine.result_cache import run_strategy_cached, strategy_version
+from engine.results_store import ResultsStore, data_fingerprint, result_key, settings_fingerprint, strategy_id
+from engine.pruning import kill_rules, print_prune_report, pruned_info, run_prefix, screen_params
+from engine.shared_candles import SharedCandleCache, row_range
 from engine.trade_engine import TradeEngine
-import pandas as pd
 from engine.export_utils import save_results, export_optimizer_top_configs
 from utils import calculate_drawdown_and_winrate
 
-def run_optimizer_with_params(StrategyClass, progress_callback=None, per_result_callback=None):
-    results = []
-    test_id = 1
-
-    for symbol in config.SYMBOLS:
-        for interval in config.INTERVAL:
-            df = load_csv(symbol, interval)
-            if df is None or df.empty:
-                continue
-
-            if not validate_candles(df, interval=int(interval)):
-                continue
-
-            train_df, test_df = split_train_test(df, train_days=20, test_days=10)
-            param_sets = list(StrategyClass.generate_param_combinations())
-
-            for params in param_sets:
-                # Train
-                strat_train = StrategyClass(symbol, interval, train_df, params)
-                strat_train.run()
-                train_signals = strat_train.get_results()
-
-                price_updates_train = [{
-                    "timestamp": pd.to_datetime(row["timestamp"]),
-                    "symbol": symbol,
-                    "action": "price_update",
-                    "price": row["close"],
-                } for _, row in train_df.iterrows()]
-
-                all_events_train = train_signals + price_updates_train
-                all_events_train.sort(key=lambda x: x["timestamp"])
-
-                trade_engine_train = TradeEngine(
-                    starting_balance=config.START_BALANCE,
-                    fee_pct=config.FEE_PCT,
-                    slippage_pct=config.SLIPPAGE_PCT,
-                    risk_per_trade=config.RISK_PCT
-                )
-                for event in all_events_train:
-                    trade_engine_train.process_signal(event)
-                train_trades = trade_engine_train.get_trades()
-                train_balance = evaluate_results(train_trades, config.START_BALANCE)
-
-                # Test
-                strat_test = StrategyClass(symbol, interval, test_df, params)
-                strat_test.run()
-                test_signals = strat_test.get_results()
-
-                price_updates_test = [{
-                    "timestamp": pd.to_datetime(row["timestamp"]),
-                    "symbol": symbol,
-                    "action": "price_update",
-                    "price": row["close"],
-                } for _, row in test_df.iterrows()]
-
-                all_events_test = test_signals + price_updates_test
-                all_events_test.sort(key=lambda x: x["timestamp"])
-
-                trade_engine_test = TradeEngine(
-                    starting_balance=config.START_BALANCE,
-                    fee_pct=config.FEE_PCT,
-                    slippage_pct=config.SLIPPAGE_PCT,
-                    risk_per_trade=config.RISK_PCT
-                )
-                for event in all_events_test:
-                    trade_engine_test.process_signal(event)
-                test_trades = trade_engine_test.get_trades()
-                test_balance = evaluate_results(test_trades, config.START_BALANCE)
-
-                max_drawdown, win_rate = calculate_drawdown_and_winrate(test_trades)
-
-                result = {
-                    "test_id": test_id,
-                    "symbol": symbol,
-                    "interval": interval,
-                    **params,
-                    "train_final_balance": round(train_balance, 2),
-                    "test_final_balance": round(test_balance, 2),
-                    "max_drawdown_pct": round(max_drawdown, 2),
-                    "win_rate_pct": round(win_rate, 2)
-                }
-
+def evaluate_params(StrategyClass, symbol, interval, train_df, test_df, params):
+    # Train
+    strat_train = StrategyClass(symbol, interval, train_df, params)
+    trade_engine_train = TradeEngine(
+        starting_balance=config.START_BALANCE,
+        fee_pct=config.FEE_PCT,
+        slippage_pct=config.SLIPPAGE_PCT,
+        risk_per_trade=config.RISK_PCT
+    )
+    trade_engine_train.set_kill_rules(**kill_rules())
+    run_strategy_cached(trade_engine_train, strat_train)
+    if trade_engine_train.halted:
+        return {"symbol": symbol, "interval": interval, **params, **pruned_info(trade_engine_train, train_df, "train")}
+    train_trades = trade_engine_train.get_trades()
+    train_balance = evaluate_results(train_trades, config.START_BALANCE)
+
+    # Test
+    strat_test = StrategyClass(symbol, interval, test_df, params)
+    trade_engine_test = TradeEngine(
+        starting_balance=config.START_BALANCE,
+        fee_pct=config.FEE_PCT,
+        slippage_pct=config.SLIPPAGE_PCT,
+        risk_per_trade=config.RISK_PCT
+    )
+    run_strategy_cached(trade_engine_test, strat_test)
+    test_trades = trade_engine_test.get_trades()
+    test_balance = evaluate_results(test_trades, config.START_BALANCE)
+
+    max_drawdown, win_rate = calculate_drawdown_and_winrate(test_trades)
+
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        **params,
+        "train_final_balance": round(train_balance, 2),
+        "test_final_balance": round(test_balance, 2),
+        "max_drawdown_pct": round(max_drawdown, 2),
+        "win_rate_pct": round(win_rate, 2)
+    }
+
+def _evaluate_task(context, task):
+    symbol, interval, params = task
+    train, test = context["datasets"][(symbol, interval)]
+    with profile_params(params, f"optimizer_gui_{symbol}_{interval}m"), timer("evaluate"):
+        return evaluate_params(context["strategy"], symbol, interval, train.frame(), test.frame(), params)
+
+def _screen_task(context, task):
+    (symbol, interval, params), fraction = task
+    train, _ = context["datasets"][(symbol, interval)]
+    return run_prefix(context["strategy"], symbol, interval, train, params, fraction)
+
+@instrumentation.run("optimizer_gui")
+def run_optimizer_with_params(StrategyClass, progress_callback=None, per_result_callback=None, workers=None,
+                              store=None, resume=None, partition=None):
+    """
+    Optimizes StrategyClass over every symbol/interval in config.
+
+    :param workers: worker processes (default config.OPTIMIZER_WORKERS); results and
+        test_ids are identical to a serial run, callbacks fire in completion order
+    :param store: ResultsStore every result is appended to as it finishes, default one
+        in config.OPTIMIZER_RESULTS_STORE (None there disables it)
+    :param resume: reuse results already in the store for the same strategy code, symbol,
+        interval, params, candles and settings, default config.OPTIMIZER_RESUME;
+        reused results are passed to the callbacks first
+    :param partition: (index, count) to run only every count-th task starting at
+        index, for splitting one sweep across machines; default config.OPTIMIZER_PARTITION
+    """
+    if store is None and getattr(config, "OPTIMIZER_RESULTS_STORE", None):
+        store = ResultsStore(config.OPTIMIZER_RESULTS_STORE)
+    if store:
+        store.compact()
+    if resume is None:
+        resume = getattr(config, "OPTIMIZER_RESUME", False)
+    if partition is None:
+        partition = getattr(config, "OPTIMIZER_PARTITION", None)
+
+    datasets = {}
+    tasks = []
+    keys = []
+    strategy = strategy_id(StrategyClass)
+    version = strategy_version(StrategyClass) if store else None
+    settings = settings_fingerprint(train_days=20, test_days=10)
+
+    with SharedCandleCache() as cache:
+        for symbol in config.SYMBOLS:
+            for interval in config.INTERVAL:
+                df = load_csv(symbol, interval)
+                if df is None or df.empty:
+                    continue
+
+                if not validate_candles(df, interval=int(interval)):
+                    continue
+
+                # Workers get row ranges into one shared copy of the candles
+                train_df, test_df = split_train_test(df, train_days=20, test_days=10)
+                candles = cache.publish((symbol, interval), df)
+                train_rows, test_rows = row_range(df, train_df), row_range(df, test_df)
+                datasets[(symbol, interval)] = (candles.slice(*train_rows), candles.slice(*test_rows))
+                data = data_fingerprint(candles.slice(train_rows[0], test_rows[1]).columns()) if store else None
+                param_sets = list(StrategyClass.generate_param_combinations())
+                tasks.extend((symbol, interval, params) for params in param_sets)
+                keys.extend(result_key(strategy, version, symbol, interval, params, data, settings) for params in param_sets)
+
+        context = {"strategy": StrategyClass, "datasets": datasets}
+
+        todo = list(range(len(tasks)))
+        if partition is not None:
+            index, count = partition
+            todo = [idx for idx in todo if idx % count == index]
+        assigned = len(todo)
+
+        reused = {}
+        if store and resume:
+            stored = store.load()
+            reused = {idx: stored[keys[idx]]["result"] for idx in todo if keys[idx] in stored}
+            if reused:
+                print(f"⏩ Resuming: {len(reused)}/{len(todo)} configs already in {store.directory}")
+            todo = [idx for idx in todo if idx not in reused]
+
+        def save(idx, result):
+            if store:
+                symbol, interval, params = tasks[idx]
+                store.append(keys[idx], {"strategy": strategy, "symbol": symbol, "interval": interval,
+                                         "params": params, "result": result})
+
+        # Successive halving within each symbol/interval, then full runs for the survivors
+        pruned = {}
+        surviving = []
+        for key in datasets:
+            group = [idx for idx in todo if tasks[idx][:2] == key]
+            alive, group_pruned = screen_params(_screen_task, [tasks[idx] for idx in group], context, workers)
+            surviving.extend(group[i] for i in alive)
+            for i, info in group_pruned.items():
+                pruned[group[i]] = {"symbol": key[0], "interval": key[1], **tasks[group[i]][2], **info}
+                save(group[i], pruned[group[i]])
+
+        results = []
+        total = len(reused) + len(surviving)
+        run = [tasks[idx] for idx in surviving]
+        finished = ((surviving[j], result) for j, result in run_tasks(_evaluate_task, run, context, workers))
+        for done, (idx, result) in enumerate(itertools.chain(sorted(reused.items()), finished), 1):
+            if idx not in reused:
+                save(idx, result)
+            if "pruned_by" in result:
+                pruned[idx] = result
+            else:
+                result = {"test_id": idx + 1, **result}
                 results.append(result)
-                test_id += 1
-
-                if progress_callback:
-                    progress_callback(test_id, len(param_sets))
-
                 if per_result_callback:
                     per_result_callback(result)
 
-    results.sort(key=lambda x: x["test_final_balance"], reverse=True)
-    if results:
+            if progress_callback:
+                progress_callback(done, total)
+
+    if store:
+        store.close()
+
+    pruned_rows = [{"test_id": idx + 1, **info} for idx, info in sorted(pruned.items())]
+    print_prune_report(pruned_rows, assigned)
+
+    results.sort(key=lambda x: (-x["test_final_balance"], x["test_id"]))
+    if results or pruned_rows:
         os.makedirs("results", exist_ok=True)
+    if results:
         save_results(results, "results/optimizer_results.csv")
         export_optimizer_top_configs(results, "results/top_optimizer_configs.csv", top_n=10)
+    if pruned_rows:
+        save_results(pruned_rows, "results/pruned_configs.csv")
 
     return results
@@ -0,0 +1,98 @@
+# parallel.py
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import config
+from engine import instrumentation, strategy_registry
+
+# Per-process context installed by _init_worker
+_worker_context = None
+
+
+def resolve_workers(workers=None) -> int:
+    """None falls back to config.OPTIMIZER_WORKERS; 0 or less means one worker per CPU."""
+    if workers is None:
+        workers = getattr(config, "OPTIMIZER_WORKERS", 1)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def _class_file(cls):
+    module = sys.modules.get(cls.__module__)
+    if getattr(module, "__file__", None):
+        return module.__file__
+    # Modules loaded with spec_from_file_location (GUI) are not registered in sys.modules
+    for attr in vars(cls).values():
+        code = getattr(getattr(attr, "__func__", attr), "__code__", None)
+        if code is not None:
+            return code.co_filename
+    raise ValueError(f"Cannot locate source file of {cls.__name__}")
+
+
+def strategy_ref(StrategyClass):
+    """Picklable reference to a strategy class, including classes loaded from a file path."""
+    return (StrategyClass.__module__, os.path.abspath(_class_file(StrategyClass)), StrategyClass.__name__)
+
+
+def load_strategy(ref):
+    module_name, filepath, class_name = ref
+    module = sys.modules.get(module_name)
+    if module is not None and os.path.abspath(getattr(module, "__file__", "") or "") != filepath:
+        module = None
+    if module is None:
+        if module_name == "__main__":
+            module_name = "__strategy_main__"
+        module = strategy_registry.load_module(filepath, module_name)
+    return getattr(module, class_name)
+
+
+def _init_worker(context):
+    global _worker_context
+    context = dict(context)
+    instrumentation.enable(context.pop("instrumentation", False))
+    if "strategy" in context:
+        context["strategy"] = load_strategy(context["strategy"])
+    _worker_context = context
+
+
+def _run_task(fn, task):
+    # With instrumentation on, the task's timings travel back with its result
+    if not instrumentation.enabled():
+        return fn(_worker_context, task), None
+    instrumentation.reset()
+    result = fn(_worker_context, task)
+    return result, instrumentation.snapshot()
+
+
+def run_tasks(fn, tasks, context, workers=None):
+    """
+    Runs fn(context, task) for every task and yields (task_index, result) as each finishes.
+
+    The context (strategy class, candle data) is handed to each worker process once
+    through the pool initializer rather than pickled with every task. With a single
+    worker the tasks run in-process, in order.
+
+    :param fn: module-level function so it can be sent to worker processes
+    :param tasks: list of picklable task arguments
+    :param context: dict shared by all tasks; "strategy" may hold a strategy class
+    :param workers: worker process count, see resolve_workers
+    """
+    workers = min(resolve_workers(workers), len(tasks))
+    if workers <= 1:
+        for idx, task in enumerate(tasks):
+            yield idx, fn(context, task)
+        return
+
+    worker_context = dict(context)
+    if "strategy" in worker_context:
+        worker_context["strategy"] = strategy_ref(worker_context["strategy"])
+    worker_context["instrumentation"] = instrumentation.enabled()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(worker_context,)) as pool:
+        futures = {pool.submit(_run_task, fn, task): idx for idx, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            result, stats = future.result()
+            if stats:
+                instrumentation.merge(stats)
+            yield futures[future], result
@@ -0,0 +1,184 @@
+# param_search.py
+import math
+import random
+import numpy as np
+
+
+class ParamSpace:
+    """
+    Search space built from a strategy's `param_ranges`:
+
+        (low, high)          int or float range, uniform
+        (low, high, "log")   range sampled on a log scale
+        [a, b, ...]          categorical choices
+
+    Strategies without param_ranges fall back to their param_grid lists as
+    categorical choices. valid(params) applies the strategy's valid_params().
+    """
+
+    def __init__(self, ranges, valid=None):
+        self.names = list(ranges)
+        self.dims = []
+        for name, spec in ranges.items():
+            if isinstance(spec, list):
+                self.dims.append(("cat", list(spec)))
+            else:
+                low, high = spec[0], spec[1]
+                log = len(spec) > 2 and spec[2] == "log"
+                kind = "int" if isinstance(low, int) and isinstance(high, int) else "float"
+                self.dims.append((kind, (low, high, log)))
+        self.valid = valid or (lambda params: True)
+
+    @classmethod
+    def from_strategy(cls, StrategyClass):
+        ranges = getattr(StrategyClass, "param_ranges", None) or {
+            name: list(values) for name, values in StrategyClass.param_grid.items()
+        }
+        valid = getattr(StrategyClass, "valid_params", None)
+        return cls(ranges, valid)
+
+    def decode(self, u):
+        """Params for a point of the unit cube (one coordinate per parameter)."""
+        params = {}
+        for name, (kind, spec), x in zip(self.names, self.dims, u):
+            x = min(max(x, 0.0), 1.0)
+            if kind == "cat":
+                params[name] = spec[min(int(x * len(spec)), len(spec) - 1)]
+                continue
+            low, high, log = spec
+            if log:
+                value = math.exp(math.log(low) + x * (math.log(high) - math.log(low)))
+            else:
+                value = low + x * (high - low)
+            params[name] = int(round(value)) if kind == "int" else float(value)
+        return params
+
+    def encode(self, params):
+        u = []
+        for name, (kind, spec) in zip(self.names, self.dims):
+            value = params[name]
+            if kind == "cat":
+                u.append((spec.index(value) + 0.5) / len(spec))
+                continue
+            low, high, log = spec
+            if high == low:
+                u.append(0.5)
+            elif log:
+                u.append((math.log(value) - math.log(low)) / (math.log(high) - math.log(low)))
+            else:
+                u.append((value - low) / (high - low))
+        return u
+
+    def size(self):
+        """Number of distinct parameter sets, or None if a dimension is continuous."""
+        total = 1
+        for kind, spec in self.dims:
+            if kind == "cat":
+                total *= len(spec)
+            elif kind == "int" and not spec[2]:
+                total *= spec[1] - spec[0] + 1
+            else:
+                return None
+        return total
+
+
+class RandomSearch:
+    """Uniform sampling of the space without repeating a parameter set."""
+
+    def __init__(self, space, seed=None, max_tries=200):
+        self.space = space
+        self.rng = random.Random(seed)
+        self.max_tries = max_tries
+        self.seen = set()
+        self.history = []  # (params, score)
+
+    def _key(self, params):
+        return tuple(params[name] for name in self.space.names)
+
+    def _take(self, params):
+        key = self._key(params)
+        if key in self.seen or not self.space.valid(params):
+            return False
+        self.seen.add(key)
+        return True
+
+    def _random_params(self):
+        return self.space.decode([self.rng.random() for _ in self.space.names])
+
+    def ask(self):
+        """Next parameter set to evaluate, or None once no new valid one can be found."""
+        for _ in range(self.max_tries):
+            params = self._random_params()
+            if self._take(params):
+                return params
+        return None
+
+    def tell(self, params, score):
+        self.history.append((params, score))
+
+
+class TPESearch(RandomSearch):
+    """
+    Tree-structured Parzen estimator. After n_startup random sets, the scored sets
+    are split into the best `gamma` share and the rest; candidates are drawn around
+    the good ones and the one maximizing l(x) / g(x), the ratio of the two Parzen
+    densities, is proposed next. Dimensions are modelled independently.
+    """
+
+    def __init__(self, space, seed=None, n_startup=10, gamma=0.25, n_candidates=24, max_tries=200):
+        super().__init__(space, seed, max_tries)
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self._encoded = []  # history params as unit-cube points
+
+    def tell(self, params, score):
+        super().tell(params, score)
+        self._encoded.append(self.space.encode(params))
+
+    def ask(self):
+        if len(self.history) < self.n_startup:
+            return super().ask()
+
+        order = sorted(range(len(self.history)), key=lambda i: -self.history[i][1])
+        n_good = max(1, math.ceil(self.gamma * len(order)))
+        encoded = np.array(self._encoded)
+        good = encoded[order[:n_good]]
+        bad = encoded[order[n_good:]] if len(order) > n_good else good
+
+        widths = [self._bandwidth(good[:, d], kind, spec) for d, (kind, spec) in enumerate(self.space.dims)]
+        picks = [self.rng.randrange(len(good)) for _ in range(self.n_candidates * len(widths))]
+        noise = [self.rng.gauss(0.0, 1.0) for _ in picks]
+        candidates = np.clip(
+            good[np.reshape(picks, (self.n_candidates, -1)), np.arange(len(widths))]
+            + np.reshape(noise, (self.n_candidates, -1)) * widths,
+            0.0, 1.0,
+        )
+
+        scores = np.zeros(self.n_candidates)
+        for d, (kind, spec) in enumerate(self.space.dims):
+            scores += np.log(self._density(candidates[:, d], good[:, d], kind, spec))
+            scores -= np.log(self._density(candidates[:, d], bad[:, d], kind, spec))
+        for i in np.argsort(-scores, kind="stable"):
+            params = self.space.decode(candidates[i].tolist())
+            if self._take(params):
+                return params
+        return super().ask()
+
+    def _bandwidth(self, values, kind, spec):
+        if kind == "cat":
+            return 0.5 / len(spec)
+        return max(1.06 * float(np.std(values)) * len(values) ** -0.2, 0.05)
+
+    def _density(self, x, values, kind, spec):
+        # Parzen mixture plus a uniform prior component, so no density is ever zero
+        width = self._bandwidth(values, kind, spec)
+        z = (x[:, None] - values[None, :]) / width
+        kernels = np.exp(-0.5 * z ** 2) / (width * math.sqrt(2 * math.pi))
+        return (kernels.sum(axis=1) + 1.0) / (len(values) + 1)
+
+
+SEARCHERS = {
+    "random": RandomSearch,
+    "tpe": TPESearch,
+}
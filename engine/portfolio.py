@@ -0,0 +1,52 @@
+# portfolio.py
+import heapq
+from engine.trade_engine import bar_ranges, strategy_signal_arrays
+
+
+def run_portfolio(trade_engine, strategies):
+    """
+    Replays several strategies, one per symbol, through one TradeEngine in a single
+    chronological pass, so the shared balance, equity curve and drawdown see every
+    symbol's trades in time order.
+
+    :return: the engine's trade list
+    """
+    symbols = [strategy.symbol for strategy in strategies]
+    check_unique_symbols(symbols)
+    merge_steps(trade_engine.replay_steps(strategy.symbol, *strategy_signal_arrays(strategy), **bar_ranges(strategy.data))
+                for strategy in strategies)
+    return trade_engine.trades
+
+
+def check_unique_symbols(symbols):
+    # Positions are keyed by symbol, so one engine can only replay each symbol once
+    seen = set()
+    for symbol in symbols:
+        if symbol in seen:
+            raise ValueError(f"Duplicate symbol in portfolio: {symbol}")
+        seen.add(symbol)
+
+
+def merge_steps(streams):
+    """
+    Drives TradeEngine.replay_steps generators in time order.
+
+    Each generator yields the key of its next step before performing it. A heap
+    holds one pending step per stream; the earliest is resumed and re-queued with
+    the step after it, so memory stays at one entry per stream however long the
+    data is. At equal keys streams keep their order in `streams`.
+    """
+    heap = []
+    for order, steps in enumerate(streams):
+        key = next(steps, None)
+        if key is not None:
+            heap.append((key, order, steps))
+    heapq.heapify(heap)
+
+    while heap:
+        _, order, steps = heap[0]
+        key = next(steps, None)  # performs the step at the top of the heap
+        if key is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (key, order, steps))
@@ -0,0 +1,122 @@
+# pruning.py
+import math
+import pandas as pd
+import config
+from engine.instrumentation import timed
+from engine.parallel import run_tasks
+from engine.result_cache import run_strategy_cached
+from engine.trade_engine import TradeEngine
+
+
+def kill_rules() -> dict:
+    """TradeEngine.set_kill_rules arguments from config; empty when pruning by rule is off."""
+    rules = {}
+    if getattr(config, "PRUNE_MAX_DRAWDOWN_PCT", None) is not None:
+        rules["max_drawdown_pct"] = config.PRUNE_MAX_DRAWDOWN_PCT
+    if getattr(config, "PRUNE_MIN_EQUITY", None) is not None:
+        rules["min_equity"] = config.PRUNE_MIN_EQUITY
+    return rules
+
+
+def new_engine(rules=None) -> TradeEngine:
+    """TradeEngine with config settings and kill rules (default: kill_rules())."""
+    engine = TradeEngine(
+        starting_balance=config.START_BALANCE,
+        fee_pct=config.FEE_PCT,
+        slippage_pct=config.SLIPPAGE_PCT,
+        risk_per_trade=config.RISK_PCT
+    )
+    engine.set_kill_rules(**(kill_rules() if rules is None else rules))
+    return engine
+
+
+def halt_progress(engine, df) -> float:
+    """Fraction of df's time span replayed before the engine halted (1.0 if it did not)."""
+    if not engine.halted or df is None or len(df) < 2:
+        return 1.0
+    first = pd.Timestamp(df["timestamp"].iloc[0]).value
+    last = pd.Timestamp(df["timestamp"].iloc[-1]).value
+    return min(max((pd.Timestamp(engine.halted_at).value - first) / (last - first), 0.0), 1.0)
+
+
+def pruned_info(engine, df, stage, fraction=1.0) -> dict:
+    """Result fields for a run stopped by a kill rule."""
+    return {
+        "pruned_by": "kill_rule",
+        "pruned_stage": stage,
+        "pruned_at_pct": round(fraction * halt_progress(engine, df) * 100, 1),
+        "pruned_reason": engine.halt_reason,
+    }
+
+
+def run_prefix(StrategyClass, symbol, interval, candles, params, fraction) -> dict:
+    """
+    Screening run of params on the first `fraction` of the train candles
+    (a SharedCandles handle) with the kill rules on.
+
+    :return: {"score": final balance, "pruned": pruned_info or None}
+    """
+    part = candles.slice(0, max(int(len(candles) * fraction), 1))
+    df = part.frame()
+    engine = new_engine()
+    run_strategy_cached(engine, StrategyClass(symbol, interval, df, params))
+    pruned = pruned_info(engine, df, f"{fraction:.0%} of train", fraction) if engine.halted else None
+    return {"score": engine.balance, "pruned": pruned}
+
+
+@timed("screen")
+def screen_params(fn, tasks, context, workers=None, rungs=None, eta=None):
+    """
+    Successive halving: every task is run on a short prefix of the train data, the
+    best 1/eta go on to the next, longer prefix, and so on. Tasks stopped by a kill
+    rule drop out at once.
+
+    :param fn: module-level fn(context, (task, fraction)) returning a run_prefix dict
+    :param rungs: increasing train fractions, default config.PRUNE_HALVING_RUNGS;
+        empty means no screening
+    :param eta: keep 1/eta of the tasks per rung, default config.PRUNE_HALVING_ETA
+    :return: (indices of surviving tasks, {task index: pruning info})
+    """
+    if rungs is None:
+        rungs = getattr(config, "PRUNE_HALVING_RUNGS", [])
+    if eta is None:
+        eta = getattr(config, "PRUNE_HALVING_ETA", 2)
+
+    alive = list(range(len(tasks)))
+    pruned = {}
+    for fraction in rungs:
+        if len(alive) <= 1:
+            break
+        scores = {}
+        for j, result in run_tasks(fn, [(tasks[i], fraction) for i in alive], context, workers):
+            if result["pruned"]:
+                pruned[alive[j]] = result["pruned"]
+            else:
+                scores[alive[j]] = result["score"]
+
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))
+        keep = max(1, math.ceil(len(ranked) / eta))
+        for i in ranked[keep:]:
+            pruned[i] = {
+                "pruned_by": "halving",
+                "pruned_stage": f"{fraction:.0%} of train",
+                "pruned_at_pct": round(fraction * 100, 1),
+                "pruned_reason": f"train balance {scores[i]:.2f} outside top {keep}/{len(ranked)}",
+            }
+        alive = sorted(ranked[:keep])
+
+    return alive, pruned
+
+
+def print_prune_report(pruned, total):
+    """Prints how many of `total` configs were pruned, by which rule and where."""
+    if not pruned:
+        return
+    by_stage = {}
+    for info in pruned:
+        key = (info["pruned_by"], info["pruned_stage"])
+        by_stage[key] = by_stage.get(key, 0) + 1
+    print(f"✂️ Pruned {len(pruned)}/{total} configs:")
+    for (rule, stage), count in by_stage.items():
+        at = [info["pruned_at_pct"] for info in pruned if (info["pruned_by"], info["pruned_stage"]) == (rule, stage)]
+        print(f"   {count} by {rule} during {stage} (stopped at {sum(at) / len(at):.1f}% of train on average)")
@@ -0,0 +1,221 @@
+# result_cache.py
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+import numpy as np
+import config
+from engine import instrumentation, trade_engine as trade_engine_module
+from engine.parallel import strategy_ref
+from engine.results_store import CANDLE_COLUMNS, data_fingerprint
+
+# Source files whose code decides a backtest's outcome besides the strategy's own
+ENGINE_FILES = [
+    trade_engine_module.__file__,
+    os.path.join(os.path.dirname(__file__), "strategy_interface.py"),
+    os.path.join(os.path.dirname(__file__), "indicators.py"),
+    os.path.join(os.path.dirname(__file__), "kernels.py"),
+    # equity_curve is part of the stored state; streamed portfolio runs are cached whole
+    os.path.join(os.path.dirname(__file__), "equity_curve.py"),
+    os.path.join(os.path.dirname(__file__), "streaming.py"),
+    os.path.join(os.path.dirname(__file__), "portfolio.py"),
+]
+
+# Candle columns of a frame besides its timestamps
+PRICE_COLUMNS = CANDLE_COLUMNS[1:]
+
+# TradeEngine attributes that make up the result of a run
+STATE_ATTRS = [
+    "positions", "trades", "balance", "available_balance", "max_equity", "max_drawdown",
+    "equity_curve", "halted", "halt_reason", "halted_at",
+]
+
+_file_hashes = {}
+_data_hashes = {}
+_caches = {}
+
+
+def file_hash(path) -> str:
+    """Hash of a source file, recomputed only when its mtime changes."""
+    mtime = os.path.getmtime(path)
+    cached = _file_hashes.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "rb") as f:
+            cached = (mtime, hashlib.blake2b(f.read(), digest_size=16).hexdigest())
+        _file_hashes[path] = cached
+    return cached[1]
+
+
+def strategy_version(StrategyClass) -> str:
+    """Class name plus hashes of its source file and of the engine files."""
+    files = [strategy_ref(StrategyClass)[1]] + ENGINE_FILES
+    return StrategyClass.__name__ + ":" + ",".join(file_hash(path) for path in files)
+
+
+def frame_fingerprint(df) -> str:
+    """
+    data_fingerprint of a candle frame. Frames over shared candles (SharedCandles.frame)
+    whose price columns are still the read-only shared views cannot change, so they
+    are memoized per process on the shared block, row range and buffers plus a hash
+    of their own timestamp column. Any other frame, e.g. load_csv's copy-on-write
+    frames that callers may edit in place, is hashed in full.
+    """
+    source = df.attrs.get("shared_candles")
+    prices = [df[col].to_numpy() for col in PRICE_COLUMNS]
+    if source is None or any(values.flags.writeable for values in prices):
+        return data_fingerprint(df)
+
+    timestamps = hashlib.blake2b(np.ascontiguousarray(df["timestamp"].array.asi8), digest_size=16).hexdigest()
+    memo_key = (tuple(source), tuple(values.__array_interface__["data"][0] for values in prices), timestamps)
+    fingerprint = _data_hashes.get(memo_key)
+    if fingerprint is None:
+        if len(_data_hashes) >= 256:
+            _data_hashes.clear()
+        fingerprint = _data_hashes[memo_key] = data_fingerprint(df)
+    return fingerprint
+
+
+def engine_settings(engine) -> dict:
+    return {
+        "starting_balance": engine.starting_balance,
+        "fee_pct": engine.fee_pct,
+        "slippage_pct": engine.slippage_pct,
+        "risk_per_trade": engine.risk_per_trade,
+        "position_mode": trade_engine_module.POSITION_MODE,
+        "fixed_trade_amount": trade_engine_module.FIXED_TRADE_AMOUNT,
+        "kill_max_drawdown": engine.kill_max_drawdown,
+        "kill_min_equity": engine.kill_min_equity,
+        "equity_mode": engine.equity_curve.mode,
+        "equity_resolution": engine.equity_curve.resolution,
+        "fill_model": engine.fill_model,
+    }
+
+
+def cache_key(engine, **parts) -> str:
+    payload = {"engine": engine_settings(engine), **parts}
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True, default=str).encode(), digest_size=20).hexdigest()
+
+
+def is_fresh(engine) -> bool:
+    """True if nothing has been run on the engine yet."""
+    return (not engine.trades and not engine.positions and not engine.halted
+            and len(engine.equity_curve) == 0 and engine.balance == engine.starting_balance)
+
+
+class ResultCache:
+    """
+    SQLite cache of TradeEngine end states, least recently used entries evicted once
+    the stored states exceed max_mb. Safe to share between worker processes.
+    """
+
+    def __init__(self, path, max_mb=None):
+        if max_mb is None:
+            max_mb = getattr(config, "RESULT_CACHE_MB", 512)
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=60)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, state BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._db.commit()
+
+    def get(self, key):
+        row = self._db.execute("SELECT state FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self._db:
+            self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0])
+
+    def put(self, key, state):
+        blob = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, state, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time())
+            )
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            while total > self.max_bytes:
+                oldest, size = self._db.execute(
+                    "SELECT key, size FROM results ORDER BY last_used, rowid LIMIT 1").fetchone()
+                self._db.execute("DELETE FROM results WHERE key = ?", (oldest,))
+                total -= size
+
+    def size_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+def default_cache():
+    """This process's cache at config.RESULT_CACHE_PATH, or None when caching is off."""
+    path = getattr(config, "RESULT_CACHE_PATH", None)
+    if not path:
+        return None
+    key = (os.getpid(), os.path.abspath(path))
+    cache = _caches.get(key)
+    if cache is None:
+        cache = _caches[key] = ResultCache(path)
+    return cache
+
+
+def cached_run(engine, run, cache=None, **key_parts):
+    """
+    Calls run() on a fresh engine unless the cache holds the end state of an equal
+    run, in which case that state is restored instead. key_parts must identify
+    everything else the run depends on (data, strategy version, params, ...).
+    Engines that already ran something always run for real.
+    """
+    if cache is None:
+        cache = default_cache()
+    if cache is None or not is_fresh(engine):
+        return run()
+
+    key = cache_key(engine, **key_parts)
+    state = cache.get(key)
+    instrumentation.count("result_cache_hits" if state is not None else "result_cache_misses")
+    if state is not None:
+        for attr in STATE_ATTRS:
+            setattr(engine, attr, state[attr])
+        return engine.trades
+
+    result = run()
+    cache.put(key, {attr: getattr(engine, attr) for attr in STATE_ATTRS})
+    return result
+
+
+def run_strategy_cached(engine, strategy, start=None, stop=None, cache=None):
+    """
+    engine.run_strategy(strategy), or engine.run_strategy_rows(strategy, start, stop)
+    when a row range is given, through the result cache.
+    """
+    if start is None and stop is None:
+        run = lambda: engine.run_strategy(strategy)
+    else:
+        run = lambda: engine.run_strategy_rows(strategy, start or 0, stop)
+    return cached_run(
+        engine, run, cache,
+        symbol=strategy.symbol,
+        interval=strategy.interval,
+        strategy=strategy_version(type(strategy)),
+        params=getattr(strategy, "params", None),
+        data=frame_fingerprint(strategy.data),
+        rows=[start, stop],
+    )
+
@@ -0,0 +1,150 @@
+# results_store.py
+import glob
+import hashlib
+import json
+import os
+import socket
+import sys
+import numpy as np
+import config
+
+CANDLE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+# Config values that change a backtest's outcome
+SETTINGS_KEYS = [
+    "START_BALANCE", "FEE_PCT", "SLIPPAGE_PCT", "RISK_PCT", "POSITION_MODE", "FIXED_TRADE_AMOUNT", "FILL_MODEL",
+    "PRUNE_MAX_DRAWDOWN_PCT", "PRUNE_MIN_EQUITY", "PRUNE_HALVING_RUNGS", "PRUNE_HALVING_ETA",
+]
+
+
+def data_fingerprint(df) -> str:
+    """Hash of every candle value of df (a DataFrame or dict of column arrays)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for col in CANDLE_COLUMNS:
+        values = df[col]
+        if col == "timestamp" and not isinstance(values, np.ndarray):
+            values = values.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        digest.update(np.ascontiguousarray(values, dtype=np.int64 if col == "timestamp" else np.float64).tobytes())
+    digest.update(str(len(df[CANDLE_COLUMNS[0]])).encode())
+    return digest.hexdigest()
+
+
+def settings_fingerprint(**extra) -> str:
+    """Hash of the outcome-changing config values plus any run-specific `extra` settings."""
+    settings = {key: getattr(config, key, None) for key in SETTINGS_KEYS}
+    settings.update(extra)
+    return hashlib.blake2b(json.dumps(settings, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+
+
+def strategy_id(StrategyClass) -> str:
+    """Same for a strategy imported as a package module or loaded from its file (GUI)."""
+    return f"{StrategyClass.__module__.rsplit('.', 1)[-1]}.{StrategyClass.__name__}"
+
+
+def result_key(strategy, version, symbol, interval, params, data, settings) -> str:
+    """
+    :param version: hash of the strategy and engine code (result_cache.strategy_version),
+        so results of edited code are not reused
+    """
+    return json.dumps([strategy, version, symbol, interval, params, data, settings], sort_keys=True, default=str)
+
+
+class ResultsStore:
+    """
+    Append-only JSON Lines store of optimizer results, one shard file per writer in
+    `directory`. Every result is flushed and fsynced as soon as it is added, so an
+    interrupted sweep loses at most the run in flight. load() reads all shards in
+    the directory, so shards written on several machines can simply be copied
+    together (or combined with merge_shards).
+
+    :param shard: this writer's file name, default config.OPTIMIZER_RESULTS_SHARD or the host name
+    """
+
+    def __init__(self, directory, shard=None):
+        self.directory = directory
+        self.shard = shard or getattr(config, "OPTIMIZER_RESULTS_SHARD", None) or socket.gethostname()
+        self.path = os.path.join(directory, f"{self.shard}.jsonl")
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def load(self) -> dict:
+        """{key: record} over all shards; later records win, torn lines are skipped."""
+        return load_records(sorted(glob.glob(os.path.join(self.directory, "*.jsonl"))))
+
+    def append(self, key, record):
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({"key": key, **record}, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def compact(self) -> int:
+        """
+        Rewrites this writer's shard without superseded records; every run that is
+        not resumed appends all of its keys again. Returns the records dropped.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+        records = load_records([self.path])
+        if lines == len(records):
+            return 0
+        self.close()
+        write_records(records, self.path)
+        return lines - len(records)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_records(paths) -> dict:
+    records = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A writer killed mid-line leaves a torn last line
+                    print(f"⚠️ Skipping unreadable line {line_no} of {path}")
+                    continue
+                records[record["key"]] = record
+    return records
+
+
+def write_records(records, destination):
+    """Writes {key: record} to a shard file, replacing it atomically."""
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    tmp_path = destination + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for key in sorted(records):
+            f.write(json.dumps(records[key], default=str) + "\n")
+    os.replace(tmp_path, destination)
+
+
+def merge_shards(paths, destination) -> int:
+    """
+    Writes the unique records of the given shard files to `destination`, replacing
+    it atomically. Returns the number of records written.
+    """
+    records = load_records(paths)
+    write_records(records, destination)
+    print(f"✅ Merged {len(records)} results from {len(paths)} shards into {destination}")
+    return len(records)
+
+
+if __name__ == "__main__":
+    # python -m engine.results_store merged.jsonl shard1.jsonl shard2.jsonl ...
+    if len(sys.argv) < 3:
+        print("Usage: python -m engine.results_store <destination.jsonl> <shard.jsonl> [...]")
+        sys.exit(1)
+    merge_shards(sys.argv[2:], sys.argv[1])
@@ -0,0 +1,136 @@
+# shared_candles.py
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+
+COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+# Segments this process has attached to, by shared memory name
+_attached = {}
+
+
+class SharedCandles:
+    """
+    Picklable handle to candles published by SharedCandleCache. Sending it to a
+    worker costs a few bytes; frame() maps the shared block without copying.
+    """
+
+    def __init__(self, name, rows, start=0, stop=None):
+        self.name = name
+        self.rows = rows
+        self.start = start
+        self.stop = rows if stop is None else stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def slice(self, start, stop):
+        """Handle to rows [start, stop) of this handle."""
+        return SharedCandles(self.name, self.rows, self.start + start, self.start + stop)
+
+    def columns(self):
+        """Dict of read-only column arrays viewing the shared block."""
+        shm = _attached.get(self.name)
+        if shm is None:
+            shm = _attach(self.name)
+            _attached[self.name] = shm
+        block = np.ndarray((len(COLUMNS), self.rows), dtype=np.float64, buffer=shm.buf)
+        columns = {}
+        for i, col in enumerate(COLUMNS):
+            values = block[i, self.start:self.stop]
+            if col == "timestamp":
+                values = values.view(np.int64)
+            values.flags.writeable = False
+            columns[col] = values
+        return columns
+
+    def frame(self) -> pd.DataFrame:
+        """Zero-copy, read-only DataFrame over the shared rows."""
+        columns = self.columns()
+        data = {"timestamp": pd.to_datetime(columns["timestamp"].view("M8[ns]"), utc=True)}
+        for col in COLUMNS[1:]:
+            data[col] = columns[col]
+        frame = pd.DataFrame(data, copy=False)
+        # Provenance for result_cache.frame_fingerprint
+        frame.attrs["shared_candles"] = (self.name, self.start, self.stop)
+        return frame
+
+
+class SharedCandleCache:
+    """
+    Publishes candle frames into multiprocessing shared memory, one block per key.
+
+    publish() on an existing key only bumps its reference count; release() drops
+    one reference and frees the block with the last one. close() (or leaving the
+    with-block) frees everything still published.
+    """
+
+    def __init__(self):
+        self._segments = {}  # key -> [SharedMemory, handle, refcount]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def publish(self, key, df: pd.DataFrame) -> SharedCandles:
+        entry = self._segments.get(key)
+        if entry is not None:
+            entry[2] += 1
+            return entry[1]
+
+        rows = len(df)
+        shm = shared_memory.SharedMemory(create=True, size=max(len(COLUMNS) * rows * 8, 1))
+        block = np.ndarray((len(COLUMNS), rows), dtype=np.float64, buffer=shm.buf)
+        timestamps = pd.DatetimeIndex(pd.to_datetime(df["timestamp"], utc=True)).as_unit("ns").asi8
+        block[0].view(np.int64)[:] = timestamps
+        for i, col in enumerate(COLUMNS[1:], 1):
+            block[i] = df[col].to_numpy(dtype=np.float64)
+        del block
+
+        handle = SharedCandles(shm.name, rows)
+        self._segments[key] = [shm, handle, 1]
+        return handle
+
+    def release(self, key):
+        entry = self._segments.get(key)
+        if entry is None:
+            return
+        entry[2] -= 1
+        if entry[2] <= 0:
+            del self._segments[key]
+            _free(entry[0])
+
+    def close(self):
+        for shm, _, _ in self._segments.values():
+            _free(shm)
+        self._segments.clear()
+
+
+def row_range(df: pd.DataFrame, part: pd.DataFrame):
+    """
+    (start, stop) rows of the timestamp-sorted `df` covered by `part`, a contiguous
+    subset such as the frames returned by split_train_test.
+    """
+    if part is None or part.empty:
+        return 0, 0
+    start = int(df["timestamp"].searchsorted(part["timestamp"].iloc[0], side="left"))
+    return start, start + len(part)
+
+
+def _attach(name):
+    return shared_memory.SharedMemory(name=name)
+
+
+def _free(shm):
+    attached = _attached.pop(shm.name, None)
+    for segment in (attached, shm):
+        if segment is None:
+            continue
+        try:
+            segment.close()
+        except BufferError:
+            # A frame still views the block; the mapping goes away with it
+            pass
+    shm.unlink()
@@ -1,7 +1,7 @@
 # engin/strategies/MovingAverageCrossStrategy.py
 import pandas as pd
 import numpy as np
-from engine.strategy_interface import BaseStrategy
+from engine.strategy_interface import BaseStrategy, SIGNAL_LONG
 import itertools
 
 class MovingAverageCrossStrategy(BaseStrategy):
@@ -13,6 +13,14 @@ class MovingAverageCrossStrategy(BaseStrategy):
         "rsi_oversold": [30],
         "rsi_overbought": [70],
     }
+    param_ranges = {
+        "short_ma": (3, 50),
+        "long_ma": (20, 300),
+        "use_rsi_filter": [True, False],
+        "rsi_period": (7, 28),
+        "rsi_oversold": (20, 40),
+        "rsi_overbought": (60, 80),
+    }
 
     def __init__(self, symbol, interval, data, params=None):
         import config
@@ -27,69 +35,48 @@ class MovingAverageCrossStrategy(BaseStrategy):
         vals = cls.param_grid.values()
         for combo in itertools.product(*vals):
             combo_dict = dict(zip(keys, combo))
-            if combo_dict["short_ma"] >= combo_dict["long_ma"]:
+            if not cls.valid_params(combo_dict):
                 continue  # Invalid combo
             yield combo_dict
 
-    def run(self):
-        df = self.data.copy()
-        short = self.params["short_ma"]
-        long = self.params["long_ma"]
-        use_rsi = self.params["use_rsi_filter"]
-        rsi_period = self.params["rsi_period"]
+    @classmethod
+    def valid_params(cls, params):
+        return params["short_ma"] < params["long_ma"]
+
+    def stream_window(self):
+        # The slow SMA (and RSI) must be defined on the bar before start_bar
+        warmup = self.params["long_ma"]
+        if self.params["use_rsi_filter"]:
+            warmup = max(warmup, self.params["rsi_period"])
+        return warmup, 0
 
-        df["short_ma"] = df["close"].rolling(window=short).mean()
-        df["long_ma"] = df["close"].rolling(window=long).mean()
+    def generate_signals_vectorized(self):
+        close = self.data["close"].to_numpy(dtype=np.float64)
+        short_ma = self.indicator("sma", period=self.params["short_ma"]).to_numpy()
+        long_ma = self.indicator("sma", period=self.params["long_ma"]).to_numpy()
+        prev_short = np.concatenate(([np.nan], short_ma[:-1]))
+        prev_long = np.concatenate(([np.nan], long_ma[:-1]))
 
-        if use_rsi:
-            delta = df["close"].diff()
-            gain = delta.clip(lower=0)
-            loss = -delta.clip(upper=0)
-            avg_gain = gain.rolling(window=rsi_period).mean()
-            avg_loss = loss.rolling(window=rsi_period).mean()
-            rs = avg_gain / avg_loss
-            df["rsi"] = 100 - (100 / (1 + rs))
-        else:
-            df["rsi"] = np.nan  # Placeholder
+        # Comparisons against NaN are False, so warm-up rows never signal
+        cross_up = (prev_short < prev_long) & (short_ma > long_ma)
+        cross_down = (prev_short > prev_long) & (short_ma < long_ma)
 
-        in_position = False
-        for i in range(1, len(df)):
-            row = df.iloc[i]
-            prev = df.iloc[i - 1]
+        if self.params["use_rsi_filter"]:
+            rsi = self.indicator("rsi", period=self.params["rsi_period"]).to_numpy()
+            cross_up &= ~(rsi > self.params["rsi_oversold"])
 
-            if np.isnan(row["short_ma"]) or np.isnan(row["long_ma"]):
-                continue
+        entries, exits = self.alternate(cross_up, cross_down)
+        return {
+            "entries": entries,
+            "exits": exits,
+            "direction": SIGNAL_LONG,
+            "price": close,
+            "take_profit": close * 1.02,
+            "stop_loss": close * 0.98,
+        }
 
-            if not in_position:
-                # Buy condition
-                if (
-                    prev["short_ma"] < prev["long_ma"]
-                    and row["short_ma"] > row["long_ma"]
-                ):
-                    if use_rsi and not np.isnan(row["rsi"]) and row["rsi"] > self.params["rsi_oversold"]:
-                        continue
-                    self.signals.append({
-                        "timestamp": row["timestamp"],
-                        "symbol": self.symbol,
-                        "direction": "LONG",
-                        "entry_price": row["close"],
-                        "take_profit": row["close"] * 1.02,
-                        "stop_loss": row["close"] * 0.98,
-                    })
-                    in_position = True
-            else:
-                # Sell condition
-                if (
-                    prev["short_ma"] > prev["long_ma"]
-                    and row["short_ma"] < row["long_ma"]
-                ):
-                    self.signals.append({
-                        "timestamp": row["timestamp"],
-                        "symbol": self.symbol,
-                        "exit": True,
-                        "exit_price": row["close"]
-                    })
-                    in_position = False
+    def run(self):
+        self.signals = self.signals_from_vectorized(self.generate_signals_vectorized())
 
     def get_results(self):
         return self.signals
@@ -1,5 +1,5 @@
 # engine/strategies/RSIMovingAverageStrategy.py
-from engine.strategy_interface import BaseStrategy
+from engine.strategy_interface import BaseStrategy, SIGNAL_LONG
 import pandas as pd
 import numpy as np
 
@@ -10,6 +10,12 @@ class RSIMovingAverageStrategy(BaseStrategy):
         "rsi_oversold": [30],
         "ma_period": [20, 50],
     }
+    param_ranges = {
+        "rsi_period": (7, 28),
+        "rsi_overbought": (60, 85),
+        "rsi_oversold": (15, 40),
+        "ma_period": (10, 200),
+    }
 
     def __init__(self, symbol, interval, data, params=None):
         import config
@@ -17,17 +23,10 @@ class RSIMovingAverageStrategy(BaseStrategy):
         self.params = params or {}
         self.signals = []
 
-        self.data['rsi'] = self._calculate_rsi(self.data['close'], self.params["rsi_period"])
-        self.data['ma'] = self.data['close'].rolling(window=self.params["ma_period"]).mean()
-
-    def _calculate_rsi(self, series, period):
-        delta = series.diff()
-        gain = delta.clip(lower=0)
-        loss = -delta.clip(upper=0)
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        self.data = self.data.assign(
+            rsi=self.indicator("rsi", period=self.params["rsi_period"]),
+            ma=self.indicator("sma", period=self.params["ma_period"]),
+        )
 
     @classmethod
     def generate_param_combinations(cls):
@@ -37,35 +36,30 @@ class RSIMovingAverageStrategy(BaseStrategy):
         for combo in product(*values):
             yield dict(zip(keys, combo))
 
-    def run(self):
-        position = None
-        for idx, row in self.data.iterrows():
-            if np.isnan(row['rsi']) or np.isnan(row['ma']):
-                continue
+    def stream_window(self):
+        return max(self.params["rsi_period"], self.params["ma_period"]), 0
 
-            ts = pd.to_datetime(row["timestamp"])
-            price = row["close"]
+    def generate_signals_vectorized(self):
+        close = self.data["close"].to_numpy(dtype=np.float64)
+        rsi = self.data["rsi"].to_numpy(dtype=np.float64)
+        ma = self.data["ma"].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(rsi) & ~np.isnan(ma)
 
-            if position is None:
-                if row['rsi'] < self.params["rsi_oversold"] and price > row['ma']:
-                    self.signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "direction": "LONG",
-                        "entry_price": price,
-                        "take_profit": price * 1.02,
-                        "stop_loss": price * 0.98
-                    })
-                    position = "LONG"
-            else:
-                if row['rsi'] > self.params["rsi_overbought"] or price < row['ma']:
-                    self.signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "exit": True,
-                        "exit_price": price
-                    })
-                    position = None
+        entry_condition = valid & (rsi < self.params["rsi_oversold"]) & (close > ma)
+        exit_condition = valid & ((rsi > self.params["rsi_overbought"]) | (close < ma))
+
+        entries, exits = self.alternate(entry_condition, exit_condition)
+        return {
+            "entries": entries,
+            "exits": exits,
+            "direction": SIGNAL_LONG,
+            "price": close,
+            "take_profit": close * 1.02,
+            "stop_loss": close * 0.98,
+        }
+
+    def run(self):
+        self.signals = self.signals_from_vectorized(self.generate_signals_vectorized())
 
     def get_results(self):
         return self.signals
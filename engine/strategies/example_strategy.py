@@ -1,8 +1,8 @@
 # example_strategy.py
 
-from engine.strategy_interface import BaseStrategy
+from engine.strategy_interface import BaseStrategy, SIGNAL_LONG, SIGNAL_SHORT
 import itertools
-import pandas as pd
+import numpy as np
 
 class ExampleStrategy(BaseStrategy):
     # Param grid inside the strategy for optimizer use
@@ -10,6 +10,10 @@ class ExampleStrategy(BaseStrategy):
         "entry_interval": [5, 10, 15],
         "exit_offset": [3, 5, 7]
     }
+    param_ranges = {
+        "entry_interval": (2, 30),
+        "exit_offset": (1, 15),
+    }
 
     def __init__(self, symbol, interval, data, params=None):
         import config  # or pass config from outside
@@ -19,34 +23,38 @@ class ExampleStrategy(BaseStrategy):
         self.exit_offset = self.params.get("exit_offset", 5)
         self.trades = []
 
+    def stream_window(self):
+        # Entries in the warm-up still close inside the window; entries need their exit bar
+        return self.exit_offset, self.exit_offset
+
+    def generate_signals_vectorized(self):
+        close = self.data["close"].to_numpy(dtype=np.float64)
+        n = len(close)
+        # Entry bars are counted from the start of the full series
+        first = -self.bar_offset % self.entry_interval
+        starts = np.arange(first, max(n - self.exit_offset, 0), self.entry_interval)
+
+        entries = np.zeros(n, dtype=bool)
+        exits = np.zeros(n, dtype=bool)
+        entries[starts[starts >= self.start_bar]] = True
+        exits[starts + self.exit_offset] = True
+
+        # Alternate LONG / SHORT entries
+        direction = np.full(n, SIGNAL_LONG, dtype=np.int8)
+        direction[starts[(starts + self.bar_offset) // self.entry_interval % 2 == 1]] = SIGNAL_SHORT
+        is_long = direction == SIGNAL_LONG
+
+        return {
+            "entries": entries,
+            "exits": exits,
+            "direction": direction,
+            "price": close,
+            "take_profit": np.where(is_long, close * 1.02, close * 0.98),
+            "stop_loss": np.where(is_long, close * 0.98, close * 1.02),
+        }
+
     def run(self):
-        self.signals = []
-        directions = ["LONG", "SHORT"]
-        dir_idx = 0
-
-        for i in range(0, len(self.data) - self.exit_offset, self.entry_interval):
-            entry = self.data.iloc[i]
-            exit_ = self.data.iloc[i + self.exit_offset]
-            direction = directions[dir_idx % 2]
-            dir_idx += 1
-
-            # Entry signal
-            self.signals.append({
-                "timestamp": pd.to_datetime(entry["timestamp"]),
-                "symbol": self.symbol,
-                "direction": direction,
-                "entry_price": entry["close"],
-                "take_profit": entry["close"] * (1.02 if direction == "LONG" else 0.98),
-                "stop_loss": entry["close"] * (0.98 if direction == "LONG" else 1.02),
-            })
-
-            # Exit signal
-            self.signals.append({
-                "timestamp": pd.to_datetime(exit_["timestamp"]),
-                "symbol": self.symbol,
-                "exit": True,
-                "exit_price": exit_["close"],
-            })
+        self.signals = self.signals_from_vectorized(self.generate_signals_vectorized())
 
     def get_results(self):
         return self.signals  # ✅ Send signals to trade engine
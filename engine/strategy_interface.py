@@ -1,7 +1,21 @@
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
+from engine.indicators import INDICATOR_CACHE
+from engine.trade_engine import SIGNAL_LONG, SIGNAL_SHORT
 
 class BaseStrategy(ABC):
+    indicator_cache = INDICATOR_CACHE
+
+    # Set by engine.streaming when self.data is one window of a longer series
+    bar_offset = 0       # position of self.data's first row in the full series
+    start_bar = 0        # first row whose signals are kept; earlier rows are warm-up
+    in_position = False  # the strategy's own position state at start_bar
+
+    # Search space for engine.param_search: name -> (low, high), (low, high, "log")
+    # or a list of choices. None falls back to the param_grid values.
+    param_ranges = None
+
     def __init__(self, symbol: str, interval: str, data: pd.DataFrame, config: dict):
         self.symbol = symbol
         self.interval = interval
@@ -16,5 +30,130 @@ class BaseStrategy(ABC):
         """
         pass
 
+    @classmethod
+    def valid_params(cls, params) -> bool:
+        """False for parameter combinations the strategy cannot run; searches skip them."""
+        return True
+
     def get_results(self):
         return self.trades
+
+    def indicator(self, name: str, **params) -> pd.Series:
+        """
+        Indicator series for self.data (e.g. "sma", "ema", "rsi", "atr"), shared
+        with every other strategy instance running on the same data slice.
+        The returned series is cached and must not be modified in place.
+        """
+        return self.indicator_cache.get(self.data, name, self.symbol, self.interval, **params)
+
+    def stream_window(self):
+        """
+        (warmup, lookahead): rows a streamed window needs before and after the rows
+        whose signals it emits for those signals to match a run over the full series.
+        None (the default) means the strategy can only run on the full series.
+        """
+        return None
+
+    def alternate(self, entries, exits):
+        """
+        alternate_signals() over the rows from start_bar on, starting from in_position;
+        warm-up rows never signal.
+        """
+        start = self.start_bar
+        kept_entries = np.zeros(len(entries), dtype=bool)
+        kept_exits = np.zeros(len(exits), dtype=bool)
+        kept_entries[start:], kept_exits[start:] = alternate_signals(entries[start:], exits[start:], self.in_position)
+        return kept_entries, kept_exits
+
+    def generate_signals_vectorized(self) -> dict:
+        """
+        Optional array form of the strategy's signals, one element per row of self.data:
+
+            entries       bool array, open a position at this candle
+            exits         bool array, close the open position at this candle
+            direction     SIGNAL_LONG / SIGNAL_SHORT, scalar or int8 array
+            price         entry/exit price array (usually the close)
+            take_profit   float array or None (NaN = not set)
+            stop_loss     float array or None (NaN = not set)
+            trailing_pct  float array or None (NaN = not set)
+
+        At the same candle exits are processed before entries. Strategies that
+        implement it are replayed by TradeEngine.run_strategy without building
+        signal dicts.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def has_vectorized_signals(cls) -> bool:
+        return cls.generate_signals_vectorized is not BaseStrategy.generate_signals_vectorized
+
+    def signals_from_vectorized(self, vectorized: dict) -> list:
+        """Signal dicts equivalent to a generate_signals_vectorized() result."""
+        timestamps = self.data["timestamp"]
+        n = len(timestamps)
+        direction = np.broadcast_to(np.asarray(vectorized["direction"], dtype=np.int8), n)
+        price = vectorized["price"]
+        take_profit = vectorized.get("take_profit")
+        stop_loss = vectorized.get("stop_loss")
+        trailing_pct = vectorized.get("trailing_pct")
+
+        entries = set(np.flatnonzero(vectorized["entries"]).tolist())
+        exits = set(np.flatnonzero(vectorized["exits"]).tolist())
+
+        signals = []
+        for i in sorted(entries | exits):
+            if i in exits:
+                signals.append({
+                    "timestamp": timestamps.iloc[i],
+                    "symbol": self.symbol,
+                    "exit": True,
+                    "exit_price": price[i]
+                })
+            if i in entries:
+                signal = {
+                    "timestamp": timestamps.iloc[i],
+                    "symbol": self.symbol,
+                    "direction": "LONG" if direction[i] == SIGNAL_LONG else "SHORT",
+                    "entry_price": price[i],
+                }
+                if take_profit is not None and not np.isnan(take_profit[i]):
+                    signal["take_profit"] = take_profit[i]
+                if stop_loss is not None and not np.isnan(stop_loss[i]):
+                    signal["stop_loss"] = stop_loss[i]
+                if trailing_pct is not None and not np.isnan(trailing_pct[i]):
+                    signal["trailing"] = {"pct": trailing_pct[i]}
+                signals.append(signal)
+        return signals
+
+
+def alternate_signals(entries, exits, in_position=False):
+    """
+    Filters raw entry/exit conditions the way a strategy holding one position at a
+    time does bar by bar: entries only count while flat, exits only while in a
+    position, and a bar with both only acts on the one matching the state.
+
+    :param in_position: state before the first bar
+    """
+    entries = np.asarray(entries, dtype=bool)
+    exits = np.asarray(exits, dtype=bool)
+    if len(entries) == 0:
+        return entries, exits
+
+    both = entries & exits
+    if both.any():
+        kept_entries = np.zeros_like(entries)
+        kept_exits = np.zeros_like(exits)
+        for i in np.flatnonzero(entries | exits).tolist():
+            if not in_position and entries[i]:
+                kept_entries[i] = True
+                in_position = True
+            elif in_position and exits[i]:
+                kept_exits[i] = True
+                in_position = False
+        return kept_entries, kept_exits
+
+    # Position after bar i is set by the last entry/exit condition at or before it
+    last_event = np.maximum.accumulate(np.where(entries | exits, np.arange(len(entries)), -1))
+    state = np.where(last_event >= 0, entries[np.maximum(last_event, 0)], in_position)
+    before = np.concatenate(([in_position], state[:-1]))
+    return entries & ~before, exits & before
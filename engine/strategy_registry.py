@@ -0,0 +1,105 @@
+# strategy_registry.py
+import ast
+import importlib.util
+import os
+
+# Class attributes that make a class an optimizable strategy
+STRATEGY_MARKERS = {"generate_param_combinations", "param_grid"}
+
+# filepath -> ((mtime_ns, size), [class names]) of scanned sources
+_index = {}
+# filepath -> ((mtime_ns, size), module) of imported strategy modules
+_modules = {}
+
+
+def _stat_key(filepath):
+    st = os.stat(filepath)
+    return st.st_mtime_ns, st.st_size
+
+
+def _base_name(node):
+    # Name of a base class expression: Foo, module.Foo
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _defines_marker(class_node) -> bool:
+    for node in class_node.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name in STRATEGY_MARKERS:
+            return True
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target] if isinstance(node, ast.AnnAssign) else []
+        if any(isinstance(target, ast.Name) and target.id in STRATEGY_MARKERS for target in targets):
+            return True
+    return False
+
+
+def scan_source(source, filename="<strategy>") -> list:
+    """
+    Names of the top-level classes in `source` that define generate_param_combinations
+    or param_grid, or subclass such a class of the same file. The source is parsed,
+    not executed.
+    """
+    classes = [node for node in ast.parse(source, filename).body if isinstance(node, ast.ClassDef)]
+    found = {node.name for node in classes if _defines_marker(node)}
+    # Subclasses of strategies defined earlier in the file inherit the markers
+    for node in classes:
+        if node.name not in found and any(_base_name(base) in found for base in node.bases):
+            found.add(node.name)
+    return [node.name for node in classes if node.name in found]
+
+
+def scan_file(filepath) -> list:
+    """scan_source of a file, cached until its mtime or size changes."""
+    key = _stat_key(filepath)
+    cached = _index.get(filepath)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(filepath, encoding="utf-8") as f:
+        classes = scan_source(f.read(), filepath)
+    _index[filepath] = (key, classes)
+    return classes
+
+
+def discover(directory) -> list:
+    """
+    (module name, class name) of every strategy class in the .py files of `directory`,
+    by file name. Only changed files are parsed again, and nothing is imported.
+    """
+    strategies = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".py") or filename.startswith("__"):
+            continue
+        try:
+            classes = scan_file(os.path.join(directory, filename))
+        except (OSError, SyntaxError, ValueError) as e:
+            print(f"Error loading {filename}: {e}")
+            continue
+        strategies.extend((filename[:-3], class_name) for class_name in classes)
+    return strategies
+
+
+def load_module(filepath, module_name=None):
+    """
+    Imports a strategy file with spec_from_file_location (it need not be on sys.path),
+    once until the file changes.
+    """
+    filepath = os.path.abspath(filepath)
+    key = _stat_key(filepath)
+    cached = _modules.get(filepath)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    if module_name is None:
+        module_name = os.path.splitext(os.path.basename(filepath))[0]
+    spec = importlib.util.spec_from_file_location(module_name, filepath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _modules[filepath] = (key, module)
+    return module
+
+
+def load_strategy_class(directory, module_name, class_name):
+    """The strategy class `class_name` of directory/module_name.py, imported on first use."""
+    return getattr(load_module(os.path.join(directory, f"{module_name}.py"), module_name), class_name)
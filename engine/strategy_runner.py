@@ -3,10 +3,16 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from engine.data_loader import load_csv, validate_candles
-from engine.data_handler import fetch_and_save_candles
+from engine.data_loader import load_candle_columns, load_csv, source_interval, validate_candles, validate_columns
+from engine.candle_store import load_columns
+from engine.data_handler import fetch_and_save_candles, sync_candles
 from engine.strategies.example_strategy import ExampleStrategy
 from engine.trade_engine import TradeEngine  # <-- NEW
+from engine.streaming import stream_portfolio
+from engine import instrumentation
+from engine.instrumentation import profile_params
+from engine.result_cache import cached_run, run_strategy_cached, strategy_version
+from engine.results_store import data_fingerprint
 import config
 import pandas as pd
 import time
@@ -14,8 +20,12 @@ from datetime import datetime, timedelta, timezone
 
 
 def ensure_data(symbol: str, interval: str) -> bool:
+    # Higher intervals are resampled from 1m on load; only the source is downloaded
+    interval = source_interval(interval)
     filename = f"data/{symbol}_{interval}m.csv"
-    if not os.path.isfile(filename):
+    # Only the timestamp column is read here; load_csv maps the full store later
+    columns = load_columns(symbol, interval)
+    if columns is None:
         print(f"❌ File not found: {filename}")
         print(f"⬇️ Downloading missing data for {symbol} interval {interval}m...")
         success = fetch_and_save_candles(symbol, interval, config.HISTORICAL_DAYS)
@@ -23,8 +33,7 @@ def ensure_data(symbol: str, interval: str) -> bool:
             time.sleep(1)
         return success
 
-    df = load_csv(symbol, interval)
-    if df is None or df.empty:
+    if len(columns["timestamp"]) == 0:
         print(f"❌ DataFrame empty or None for {filename}")
         print(f"⬇️ Re-downloading corrupted data for {symbol} interval {interval}m...")
         success = fetch_and_save_candles(symbol, interval, config.HISTORICAL_DAYS)
@@ -33,12 +42,12 @@ def ensure_data(symbol: str, interval: str) -> bool:
         return success
 
     required_start = datetime.now(timezone.utc) - timedelta(days=config.HISTORICAL_DAYS)
-    first_timestamp = pd.to_datetime(df["timestamp"].iloc[0], utc=True)
+    first_timestamp = pd.Timestamp(int(columns["timestamp"][0]), tz="UTC")
 
     if first_timestamp > required_start:
         print(f"❌ Data too short for {symbol} interval {interval}m ({first_timestamp} > {required_start})")
         print(f"⬇️ Downloading missing data for {symbol} interval {interval}m...")
-        success = fetch_and_save_candles(symbol, interval, config.HISTORICAL_DAYS)
+        success = sync_candles(symbol, interval, config.HISTORICAL_DAYS)
         if success:
             time.sleep(1)
         return success
@@ -46,60 +55,82 @@ def ensure_data(symbol: str, interval: str) -> bool:
     return True
 
 
-def run_strategy_for_symbol_interval(symbol: str, interval: str, trade_engine: TradeEngine, config_params: dict):
+def prepare_strategy(symbol: str, interval: str, config_params: dict):
+    """ExampleStrategy on validated data for symbol/interval, or None if the data is unusable."""
     if not ensure_data(symbol, interval):
         print(f"❌ Unable to get valid data for {symbol} interval {interval}m, skipping.")
-        return
+        return None
 
     df = load_csv(symbol, interval)
     if not validate_candles(df, interval=int(interval)):
         print(f"❌ Invalid data for {symbol} interval {interval}m, skipping.")
-        return
+        return None
 
-    strategy = ExampleStrategy(symbol, interval, df, config_params)
-    strategy.run()
+    return ExampleStrategy(symbol, interval, df, config_params)
 
-    # Strategy now produces entry/exit signals in strategy.signals
-    strategy_signals = strategy.signals  # Make sure `run()` populates this list
 
-    # Create price update signals per candle
-    price_updates = [{
-        "timestamp": pd.to_datetime(row["timestamp"]),
-        "symbol": symbol,
-        "action": "price_update",
-        "price": row["close"],
-    } for _, row in df.iterrows()]
-
-    # Combine all signals and price updates
-    all_events = strategy_signals + price_updates
-
-    # Sort by timestamp
-    all_events.sort(key=lambda x: x["timestamp"])
+def run_strategy_for_symbol_interval(symbol: str, interval: str, trade_engine: TradeEngine, config_params: dict):
+    strategy = prepare_strategy(symbol, interval, config_params)
+    if strategy is None:
+        return
 
-    # Feed all events to the TradeEngine in chronological order
-    for event in all_events:
-        try:
-            trade_engine.process_signal(event)
-        except Exception as e:
-            print(f"⚠️ Error processing event: {event}\n{e}")
+    # Run the strategy and replay its signals against every candle close in chronological order
+    try:
+        with profile_params(config_params, f"strategy_runner_{symbol}_{interval}m"):
+            run_strategy_cached(trade_engine, strategy)
+    except Exception as e:
+        print(f"⚠️ Error replaying events for {symbol} interval {interval}m\n{e}")
+
+
+def run_portfolio_for_interval(symbols, interval: str, trade_engine: TradeEngine, config_params: dict):
+    """
+    Streams every symbol at one interval through trade_engine in a single time-ordered
+    pass, config.STREAM_CHUNK_ROWS candles per symbol at a time.
+    """
+    ready = []
+    for symbol in symbols:
+        print(f"▶ Running strategy for {symbol} interval {interval}m")
+        if not ensure_data(symbol, interval):
+            print(f"❌ Unable to get valid data for {symbol} interval {interval}m, skipping.")
+        elif not validate_columns(load_candle_columns(symbol, interval), symbol, interval):
+            print(f"❌ Invalid data for {symbol} interval {interval}m, skipping.")
+        else:
+            ready.append(symbol)
+
+    try:
+        # Same candles, strategy code, params and engine settings: reuse the stored end state
+        data = {symbol: data_fingerprint(load_candle_columns(symbol, interval)) for symbol in ready}
+        with profile_params(config_params, f"portfolio_{interval}m"), instrumentation.timer("portfolio"):
+            cached_run(
+                trade_engine,
+                lambda: stream_portfolio(trade_engine, ExampleStrategy, ready, interval, config_params),
+                strategy=strategy_version(ExampleStrategy),
+                params=config_params,
+                interval=interval,
+                data=data,
+            )
+    except Exception as e:
+        print(f"⚠️ Error replaying portfolio for interval {interval}m\n{e}")
 
 
 if __name__ == "__main__":
-    trade_engine = TradeEngine(
-        starting_balance=config.START_BALANCE,
-        fee_pct=config.FEE_PCT,
-        slippage_pct=config.SLIPPAGE_PCT,
-        risk_per_trade=config.RISK_PCT
-    )
-
-    for symbol in config.SYMBOLS:
+    with instrumentation.run("strategy_runner"):
+        # A symbol holds one position at a time, so each interval is its own portfolio
         for interval in config.INTERVAL:
-            print(f"▶ Running strategy for {symbol} interval {interval}m")
-            run_strategy_for_symbol_interval(symbol, interval, trade_engine, {})
-
-    summary = trade_engine.get_summary()
-    print(f"\n🧾 Portfolio summary:")
-    print(f"Starting balance: {config.START_BALANCE}")
-    print(f"Final balance: {summary['final_balance']:.2f}")
-    print(f"Total trades: {summary['total_trades']}")
-    print(f"Max drawdown: {summary['max_drawdown_pct']:.2f}%")
+            trade_engine = TradeEngine(
+                starting_balance=config.START_BALANCE,
+                fee_pct=config.FEE_PCT,
+                slippage_pct=config.SLIPPAGE_PCT,
+                risk_per_trade=config.RISK_PCT
+            )
+            run_portfolio_for_interval(config.SYMBOLS, interval, trade_engine, {})
+
+            summary = trade_engine.get_summary()
+            print(f"\n🧾 Portfolio summary ({interval}m):")
+            print(f"Starting balance: {config.START_BALANCE}")
+            print(f"Final balance: {summary['final_balance']:.2f}")
+            print(f"Total trades: {summary['total_trades']}")
+            print(f"Max drawdown: {summary['max_drawdown_pct']:.2f}%")
+
+            os.makedirs("results", exist_ok=True)
+            trade_engine.export_equity_curve(f"results/equity_curve_{interval}m.npz")
@@ -0,0 +1,104 @@
+# streaming.py
+import config
+from engine.candle_store import columns_to_frame
+from engine.data_loader import load_candle_columns
+from engine.indicators import IndicatorCache
+from engine.portfolio import check_unique_symbols, merge_steps
+from engine.trade_engine import SIGNAL_EXIT, bar_ranges, strategy_signal_arrays
+
+
+def chunk_windows(rows, chunk_rows, warmup=0, lookahead=0):
+    """
+    Yields (start, stop, lo, hi): rows [start, stop) are emitted from the window
+    [lo, hi), which adds up to `warmup` rows before and `lookahead` rows after.
+    """
+    for start in range(0, rows, chunk_rows):
+        stop = min(start + chunk_rows, rows)
+        yield start, stop, max(start - warmup, 0), min(stop + lookahead, rows)
+
+
+def stream_steps(trade_engine, StrategyClass, symbol, interval, columns, params=None, chunk_rows=None):
+    """
+    TradeEngine.replay_steps over a candle series processed one chunk at a time.
+
+    For each chunk a strategy instance sees only its window of the memory-mapped
+    columns (chunk plus the warm-up/lookahead from stream_window()), its signals
+    for the chunk rows are replayed, and the window is dropped. Open positions
+    stay in the engine and the strategy's own position state is carried into the
+    next window, so the trades match a run over the full series. Strategies whose
+    stream_window() is None get a single window.
+
+    :param columns: dict of column arrays, e.g. from load_candle_columns
+    :param chunk_rows: rows per chunk, default config.STREAM_CHUNK_ROWS
+    """
+    if chunk_rows is None:
+        chunk_rows = getattr(config, "STREAM_CHUNK_ROWS", 100_000)
+    rows = len(columns["timestamp"])
+    if rows == 0:
+        return
+
+    # Indicator series of a window are never reused by another window. Strategies
+    # may compute indicators in __init__, so the cache is bound on a per-stream
+    # subclass rather than on each instance.
+    cache = IndicatorCache()
+    StreamedStrategy = type(StrategyClass.__name__, (StrategyClass,), {
+        "indicator_cache": cache, "__module__": StrategyClass.__module__, "__qualname__": StrategyClass.__qualname__,
+    })
+
+    # The window depends on the params, which only an instance knows
+    probe = StreamedStrategy(symbol, interval, columns_to_frame({c: v[:0] for c, v in columns.items()}), params)
+    window = probe.stream_window()
+    cache.clear()
+    if window is None:
+        chunk_rows, window = rows, (0, 0)
+
+    in_position = False
+    for start, stop, lo, hi in chunk_windows(rows, chunk_rows, *window):
+        strategy = StreamedStrategy(symbol, interval, columns_to_frame({c: v[lo:hi] for c, v in columns.items()}), params)
+        strategy.bar_offset = lo
+        strategy.start_bar = start - lo
+        strategy.in_position = in_position
+
+        _, close, signals = strategy_signal_arrays(strategy)
+        signals = signals[(signals["index"] >= start - lo) & (signals["index"] < stop - lo)]
+        signals["index"] -= start - lo
+        if len(signals):
+            in_position = bool(signals["kind"][-1] != SIGNAL_EXIT)
+
+        ranges = {name: values[start:stop] for name, values in bar_ranges(columns).items()}
+        yield from trade_engine.replay_steps(symbol, columns["timestamp"][start:stop], close[start - lo:stop - lo], signals,
+                                             **ranges)
+        cache.clear()
+
+
+def stream_backtest(trade_engine, StrategyClass, symbol, interval, params=None, chunk_rows=None):
+    """
+    Backtests StrategyClass on the stored candles of symbol/interval without loading
+    them whole; memory is bounded by the chunk size.
+
+    :return: the engine's trade list, or None if there is no data
+    """
+    columns = load_candle_columns(symbol, interval)
+    if columns is None:
+        print(f"❌ No candles for {symbol} {interval}m")
+        return None
+    for _ in stream_steps(trade_engine, StrategyClass, symbol, interval, columns, params, chunk_rows):
+        pass
+    return trade_engine.trades
+
+
+def stream_portfolio(trade_engine, StrategyClass, symbols, interval, params=None, chunk_rows=None):
+    """
+    Portfolio version of stream_backtest: every symbol is streamed chunk by chunk
+    and their steps are merged in time order (see portfolio.merge_steps).
+    """
+    check_unique_symbols(symbols)
+    streams = []
+    for symbol in symbols:
+        columns = load_candle_columns(symbol, interval)
+        if columns is None:
+            print(f"❌ No candles for {symbol} {interval}m, skipping.")
+            continue
+        streams.append(stream_steps(trade_engine, StrategyClass, symbol, interval, columns, params, chunk_rows))
+    merge_steps(streams)
+    return trade_engine.trades
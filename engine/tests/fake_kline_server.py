@@ -0,0 +1,68 @@
+# Local stand-in for the Bybit v5 kline endpoint used by the downloader tests
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def candle_price(ts_ms):
+    return 100 + (ts_ms // 60000) % 50
+
+
+class FakeKlineServer:
+    """
+    Serves deterministic candles for any symbol/interval, newest first and at most
+    `limit` per request like Bybit. Records every request for assertions.
+    """
+
+    def __init__(self, fail_first=0):
+        self.requests = []
+        self.candles_served = 0
+        self.fail_first = fail_first
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                with server._lock:
+                    server.requests.append(query)
+                    fail = len(server.requests) <= server.fail_first
+                if fail:
+                    body = b"rate limited"
+                    self.send_response(429)
+                else:
+                    body = json.dumps(server._klines(query)).encode()
+                    self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v5/market/kline"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _klines(self, query):
+        step = int(query["interval"]) * 60000
+        start = -(-int(query["start"]) // step) * step
+        end = int(query["end"])
+        limit = int(query.get("limit", 200))
+        times = list(range(start, end + 1, step))[-limit:]
+        rows = [[str(t), str(candle_price(t)), str(candle_price(t) + 1), str(candle_price(t) - 1),
+                 str(candle_price(t)), "1"] for t in reversed(times)]
+        with self._lock:
+            self.candles_served += len(rows)
+        return {"retCode": 0, "retMsg": "OK", "result": {"list": rows}}
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,47 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import json
+
+import config
+from benchmarks.datasets import parse_size, synthetic_candles
+from benchmarks.run_benchmarks import compare_reports, main
+
+
+def test_synthetic_candles_are_fixed_and_consistent():
+    df = synthetic_candles(parse_size("10k"))
+    assert len(df) == 10_000
+    assert df.equals(synthetic_candles(10_000))
+    assert (df["high"] >= df[["open", "close"]].max(axis=1)).all()
+    assert (df["low"] <= df[["open", "close"]].min(axis=1)).all()
+    assert parse_size("1M") == 1_000_000 and parse_size("2.5k") == 2500
+
+
+def test_suite_writes_a_comparable_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache_path = config.RESULT_CACHE_PATH
+    assert main(["--sizes", "2000", "--repeat", "1", "--output", "first.json"]) == 0
+    assert config.RESULT_CACHE_PATH == cache_path
+    with open("first.json", encoding="utf-8") as f:
+        report = json.load(f)
+
+    names = {r["name"] for r in report["results"]}
+    assert {"load_csv_cold", "load_csv_warm", "indicators", "replay_arrays", "process_signal",
+            "grid_sweep_MovingAverageCrossStrategy"} <= names
+    assert all(r["median_s"] > 0 and r["peak_mb"] >= 0 and r["rows"] == 2000 for r in report["results"])
+    assert not os.path.exists("data")
+
+    slower = json.loads(json.dumps(report))
+    for result in slower["results"]:
+        result["min_s"] *= 2 if result["name"] == "replay_arrays" else 1
+    rows, regressions = compare_reports(report, slower)
+    assert len(rows) == len(report["results"])
+    assert regressions == ["replay_arrays[2000]"]
+
+    # Exit code 1 against a report where everything was 100x faster
+    for result in report["results"]:
+        result["min_s"] /= 100
+    with open("fast.json", "w", encoding="utf-8") as f:
+        json.dump(report, f)
+    assert main(["--sizes", "2000", "--repeat", "1", "--only", "indicators", "--output", "second.json",
+                 "--compare", "fast.json"]) == 1
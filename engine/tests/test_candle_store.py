@@ -0,0 +1,89 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+
+from engine import candle_store
+from engine.data_loader import load_csv
+from engine.data_handler import save_candles
+
+
+def write_sample_csv(n=50, start="2025-01-01"):
+    os.makedirs("data", exist_ok=True)
+    df = pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=n, freq="5min", tz="UTC"),
+        "open": np.arange(n, dtype=float),
+        "high": np.arange(n, dtype=float) + 1,
+        "low": np.arange(n, dtype=float) - 1,
+        "close": np.arange(n, dtype=float) + 0.5,
+        "volume": np.ones(n),
+    })
+    df.to_csv("data/BTCUSDT_5m.csv", index=False)
+    return df
+
+
+def test_load_csv_converts_once_and_matches_csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    expected = write_sample_csv()
+
+    df = load_csv("BTCUSDT", "5")
+    assert candle_store.is_current("BTCUSDT", "5")
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+    assert str(df["timestamp"].dtype) == "datetime64[ns, UTC]"
+
+    # Further loads map the store instead of parsing the CSV
+    columns = candle_store.load_columns("BTCUSDT", "5")
+    assert isinstance(columns["close"], np.memmap)
+    assert not columns["close"].flags.writeable
+
+    # Callers may modify the frame without touching the store
+    df.loc[0, "close"] = -1.0
+    assert load_csv("BTCUSDT", "5")["close"].iloc[0] == 0.5
+
+
+def test_store_rebuilt_when_csv_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_sample_csv(n=10)
+    assert len(load_csv("BTCUSDT", "5")) == 10
+
+    write_sample_csv(n=20)
+    os.utime("data/BTCUSDT_5m.csv", ns=(1, 1))
+    assert not candle_store.is_current("BTCUSDT", "5")
+    assert len(load_csv("BTCUSDT", "5")) == 20
+
+
+def test_save_candles_without_csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = write_sample_csv()
+    os.remove("data/BTCUSDT_5m.csv")
+
+    save_candles(df, "BTCUSDT", "5", write_csv=False)
+    assert not os.path.exists("data/BTCUSDT_5m.csv")
+    pd.testing.assert_frame_equal(load_csv("BTCUSDT", "5"), df, check_dtype=False)
+    assert load_csv("ETHUSDT", "5") is None
+
+
+def test_load_range_returns_views_of_the_window(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = write_sample_csv(n=3 * 365 * 288)  # three years of 5m candles
+    start, end = df["timestamp"][100_000], df["timestamp"][100_000] + pd.Timedelta(days=10)
+
+    columns = candle_store.load_range("BTCUSDT", "5", start, end)
+    assert len(columns["timestamp"]) == 10 * 288
+    assert columns["timestamp"][0] == start.value and columns["timestamp"][-1] < end.value
+    full = candle_store.load_columns("BTCUSDT", "5")
+    for col, values in columns.items():
+        assert isinstance(values, np.memmap) and values.filename == full[col].filename
+        assert not values.flags.owndata
+
+    # Naive and string bounds are UTC; open ends run to the edge of the data
+    assert len(candle_store.load_range("BTCUSDT", "5", "2025-01-01 01:00")["close"]) == len(df) - 12
+    assert len(candle_store.load_range("BTCUSDT", "5", end=pd.Timestamp("2025-01-01 01:00"))["close"]) == 12
+    assert len(candle_store.load_range("BTCUSDT", "5", end, start)["close"]) == 0
+    assert candle_store.load_range("ETHUSDT", "5") is None
+
+    window = load_csv("BTCUSDT", "5", start, end)
+    pd.testing.assert_frame_equal(window, df.iloc[100_000:100_000 + 10 * 288].reset_index(drop=True),
+                                  check_dtype=False)
+    assert window.attrs["quality"]["rows"] == len(window)
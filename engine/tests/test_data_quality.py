@@ -0,0 +1,165 @@
+import sys, os, json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+
+import config
+from engine import data_quality
+from engine.data_handler import save_candles
+from engine.data_loader import load_csv, validate_candles
+from engine.data_quality import check_quality, fill_gaps
+from engine.gap_checker import check_gaps, scan_file, main as gap_main
+
+MINUTE = 60 * 10**9
+
+
+def candles(minutes, close=None):
+    minutes = np.asarray(minutes)
+    close = np.arange(len(minutes), dtype=float) + 100 if close is None else np.asarray(close, dtype=float)
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(minutes * 5 * MINUTE, utc=True),
+        "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "volume": np.ones(len(minutes)),
+    })
+
+
+def test_report_counts_every_kind_of_problem():
+    df = candles([0, 1, 2, 5, 6, 6, 4, 7, 8])
+    df.loc[1, "high"] = df.loc[1, "low"] - 1
+    df.loc[2, "close"] = df.loc[2, "high"] + 1
+    df.loc[8, "open"] = np.nan
+    df.loc[7, "timestamp"] += pd.Timedelta(minutes=1)
+
+    report = check_quality(df, 5)
+    assert report["rows"] == 9
+    # 2 -> 5 and 4 -> 7 (one minute late)
+    assert report["gaps"] == 2 and report["missing_candles"] == 4
+    assert report["largest_gap_minutes"] == 16
+    assert report["duplicates"] == 1 and report["out_of_order"] == 1
+    assert report["misaligned"] == 1
+    assert report["ohlc_errors"] == 2 and report["nan_rows"] == 1
+    assert not report["ok"]
+    assert check_quality(candles(range(10)), 5)["ok"]
+
+
+def test_fill_gaps_reindexes_to_a_dense_grid():
+    df = candles([3, 0, 1, 1, 5], close=[13, 10, 11, 11.5, 15])
+    out = fill_gaps(df, 5)
+    assert list(out["timestamp"] // (5 * MINUTE)) == [0, 1, 2, 3, 4, 5]
+    assert list(out["close"]) == [10, 11.5, 11.5, 13, 13, 15]
+    # Filled candles are flat at the previous close with no volume
+    assert list(out["high"][[2, 4]]) == [11.5, 13] and list(out["low"][[2, 4]]) == [11.5, 13]
+    assert list(out["volume"]) == [1, 1, 0, 1, 0, 1]
+    assert check_quality(out, 5)["ok"] and check_quality(out, 5)["gaps"] == 0
+
+
+def test_load_reuses_the_quality_index_until_the_store_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    check = data_quality.check_quality
+    monkeypatch.setattr(data_quality, "check_quality", lambda *args: calls.append(1) or check(*args))
+
+    save_candles(candles([0, 1, 2, 6]), "BTCUSDT", "5", write_csv=False)
+    df = load_csv("BTCUSDT", "5")
+    assert df.attrs["quality"]["gaps"] == 1 and len(calls) == 1
+    assert load_csv("BTCUSDT", "5").attrs["quality"] == df.attrs["quality"]
+    assert len(calls) == 1
+    assert os.path.exists(config.QUALITY_INDEX_PATH)
+
+    save_candles(candles([0, 1, 2, 3, 4]), "BTCUSDT", "5", write_csv=False)
+    assert load_csv("BTCUSDT", "5").attrs["quality"]["gaps"] == 0
+    assert len(calls) == 2
+
+
+def test_fill_gaps_on_load(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "FILL_GAPS", True)
+    save_candles(candles([0, 1, 4]), "BTCUSDT", "5", write_csv=False)
+    df = load_csv("BTCUSDT", "5")
+    assert len(df) == 5 and list(df["close"]) == [100, 101, 101, 101, 102]
+    assert df.attrs["quality"]["gaps"] == 0
+    assert validate_candles(df, 5)
+
+
+def test_validate_candles(tmp_path, monkeypatch):
+    df = candles([2, 0, 1, 3])
+    assert validate_candles(df, 5)
+    assert df["timestamp"].is_monotonic_increasing
+    assert df.attrs["quality"]["out_of_order"] == 0
+
+    broken = candles(range(4))
+    broken.loc[2, "low"] = broken.loc[2, "high"] + 5
+    assert not validate_candles(broken, 5)
+
+    # A stale report (e.g. from before a slice) is not trusted
+    stale = candles(range(4))
+    stale.attrs["quality"] = check_quality(candles(range(6)), 5)
+    stale.loc[1, "close"] = np.nan
+    assert not validate_candles(stale, 5)
+
+
+def test_check_gaps_reads_csv(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    candles([0, 1, 4, 5, 9]).sample(frac=1, random_state=1).to_csv("gaps.csv", index=False)
+    assert check_gaps("gaps.csv", 5) == 2
+    out = capsys.readouterr().out
+    assert "Found 2 gaps" in out and "= 15.00 minutes" in out and "= 20.00 minutes" in out
+    assert "out-of-order" in out
+
+
+def test_chunked_scan_matches_whole_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = candles([0, 1, 2, 5, 6, 6, 4, 7, 8, 12, 13, 14, 20])
+    df.loc[3, "high"] = df.loc[3, "low"] - 1
+    df.to_csv("chunks.csv", index=False)
+
+    whole = check_quality(df, 5)
+    # 2 -> 4, 8 -> 12 and 14 -> 20 once sorted
+    whole.update({field: check_quality(df.sort_values("timestamp"), 5)[field]
+                  for field in ["gaps", "missing_candles", "largest_gap_minutes"]})
+    for chunk_rows in [1, 2, 3, 5, 100]:
+        report = scan_file("chunks.csv", 5, chunk_rows)
+        gap_list = report.pop("gap_list")
+        assert report == whole
+        assert len(gap_list) == whole["gaps"] == 3
+
+
+def test_gap_checker_cli_report_and_exit_code(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    candles(range(10)).to_csv("data/BTCUSDT_5m.csv", index=False)
+    candles([0, 1, 4, 5]).to_csv("data/ETHUSDT_5m.csv", index=False)
+
+    assert gap_main(["--symbols", "BTCUSDT,ETHUSDT", "--intervals", "5", "--workers", "2",
+                     "--json", "report.json", "--csv", "report.csv"]) == 0
+    with open("report.json") as f:
+        report = json.load(f)
+    assert [entry["status"] for entry in report["files"]] == ["ok", "gaps"]
+    assert report["totals"]["gaps"] == 1 and report["totals"]["missing_candles"] == 2
+    assert report["files"][1]["gap_list"][0]["minutes"] == 15
+    summary = pd.read_csv("report.csv")
+    assert list(summary["file"])[-1] == "TOTAL" and summary["rows"].iloc[-1] == 14
+
+    assert gap_main(["--symbols", "BTCUSDT,ETHUSDT", "--intervals", "5", "--workers", "1",
+                     "--json", "report.json", "--fail-on-gaps"]) == 1
+    assert gap_main(["data/BTCUSDT_5m.csv", "data/SOLUSDT_5m.csv", "--json", "report.json"]) == 1
+    assert "file not found" in capsys.readouterr().out
+
+
+def test_gap_checker_checks_the_1m_source_of_resampled_intervals(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "RESAMPLE_FROM_1M", True)
+    os.makedirs("data")
+    minutes = pd.date_range("2025-01-01", periods=300, freq="1min", tz="UTC")
+    for symbol in ["BTCUSDT", "ETHUSDT"]:
+        df = candles(np.arange(300))
+        df["timestamp"] = minutes
+        df.to_csv(f"data/{symbol}_1m.csv", index=False)
+
+    assert gap_main(["--symbols", "BTCUSDT,ETHUSDT", "--intervals", "1,5,15", "--workers", "1",
+                     "--json", "report.json"]) == 0
+    with open("report.json") as f:
+        report = json.load(f)
+    assert [(entry["symbol"], entry["interval"]) for entry in report["files"]] == [("BTCUSDT", "1"), ("ETHUSDT", "1")]
+    assert report["totals"]["missing"] == 0
@@ -0,0 +1,75 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy as np
+import pandas as pd
+
+from engine import data_handler
+from engine.candle_store import load_columns
+from engine.data_loader import load_csv
+from fake_kline_server import FakeKlineServer
+
+
+def test_sync_fetches_only_missing_head_tail_and_gaps(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with FakeKlineServer() as server:
+        monkeypatch.setattr(data_handler, "BYBIT_ENDPOINT", server.url)
+
+        assert data_handler.fetch_and_save_candles("BTCUSDT", "5", 3)
+        full = load_csv("BTCUSDT", "5")
+        expected_rows = len(full)
+
+        # Drop the first day, a gap in the middle and the last hours
+        keep = full.iloc[300:-40].drop(index=range(500, 520)).reset_index(drop=True)
+        data_handler.save_candles(keep, "BTCUSDT", "5")
+        server.candles_served = 0
+
+        assert data_handler.sync_candles("BTCUSDT", "5", 3)
+        synced = load_csv("BTCUSDT", "5")
+
+        assert synced["timestamp"].is_monotonic_increasing
+        assert synced["timestamp"].is_unique
+        assert len(synced) >= expected_rows
+        assert np.all(np.diff(synced["timestamp"].to_numpy()) == np.timedelta64(5, "m"))
+        # Only the missing ~360 candles (plus any new tail) were transferred
+        assert server.candles_served < 400
+
+
+def test_sync_appends_tail_in_place(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with FakeKlineServer() as server:
+        monkeypatch.setattr(data_handler, "BYBIT_ENDPOINT", server.url)
+
+        assert data_handler.fetch_and_save_candles("ETHUSDT", "15", 2)
+        full = load_csv("ETHUSDT", "15")
+        data_handler.save_candles(full.iloc[:-10].reset_index(drop=True), "ETHUSDT", "15")
+        server.requests.clear()
+
+        assert data_handler.sync_candles("ETHUSDT", "15", 2)
+        assert len(server.requests) == 1
+        assert len(load_columns("ETHUSDT", "15")["timestamp"]) >= len(full)
+
+        # The CSV mirror was appended too and still matches the store
+        csv = pd.read_csv("data/ETHUSDT_15m.csv")
+        assert len(csv) == len(load_csv("ETHUSDT", "15"))
+
+
+def test_sync_fetches_single_missing_candles(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with FakeKlineServer() as server:
+        monkeypatch.setattr(data_handler, "BYBIT_ENDPOINT", server.url)
+
+        assert data_handler.fetch_and_save_candles("BTCUSDT", "5", 1)
+        full = load_csv("BTCUSDT", "5")
+
+        # A one-candle gap in the middle and a one-candle tail
+        keep = full.iloc[:-1].drop(index=100).reset_index(drop=True)
+        data_handler.save_candles(keep, "BTCUSDT", "5")
+        server.candles_served = 0
+
+        assert data_handler.sync_candles("BTCUSDT", "5", 1)
+        synced = load_csv("BTCUSDT", "5")
+        assert set(full["timestamp"]) <= set(synced["timestamp"])
+        assert np.all(np.diff(synced["timestamp"].to_numpy()) == np.timedelta64(5, "m"))
+        assert server.candles_served <= 3
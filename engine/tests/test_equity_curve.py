@@ -0,0 +1,66 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.equity_curve import EquityCurve
+from engine.trade_engine import TradeEngine
+from engine.strategies.example_strategy import ExampleStrategy
+
+MINUTE = 60 * 10**9
+
+
+def test_modes_and_growth():
+    balances = [100, 100, 101, 101, 99, 99, 99, 102]
+    every = EquityCurve("every", capacity=2)
+    change = EquityCurve("change", capacity=2)
+    hourly = EquityCurve("resolution", "1h", capacity=2)
+    for i, balance in enumerate(balances):
+        for curve in (every, change, hourly):
+            curve.record(i * 20 * MINUTE, balance)
+
+    assert every.balances.tolist() == balances
+    assert change.balances.tolist() == [100, 101, 99, 102]
+    assert change.timestamps.tolist() == [0, 40 * MINUTE, 80 * MINUTE, 140 * MINUTE]
+    # 20-minute samples: last balance of each hour
+    assert hourly.balances.tolist() == [101, 99, 102]
+    assert hourly.timestamps.tolist() == [40 * MINUTE, 100 * MINUTE, 140 * MINUTE]
+    assert every.downsample("1h").balances.tolist() == hourly.balances.tolist()
+
+    with pytest.raises(ValueError):
+        EquityCurve("resolution")
+
+
+def test_save_load_and_frame(tmp_path):
+    curve = EquityCurve()
+    for ts in pd.date_range("2025-01-01", periods=5, freq="1min", tz="UTC"):
+        curve.record(ts, 100.0 + ts.minute)
+    curve.save(tmp_path / "curve.npz")
+
+    loaded = EquityCurve.load(tmp_path / "curve.npz")
+    np.testing.assert_array_equal(loaded.timestamps, curve.timestamps)
+    np.testing.assert_array_equal(loaded.balances, curve.balances)
+    frame = loaded.to_frame()
+    assert frame["timestamp"].iloc[-1] == pd.Timestamp("2025-01-01 00:04", tz="UTC")
+    assert frame["balance"].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+
+
+def test_engine_summary_does_no_io(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    n = 2000
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(4).normal(0, 0.004, n)))
+    df = pd.DataFrame({"timestamp": pd.date_range("2025-01-01", periods=n, freq="1min", tz="UTC"),
+                       "open": close, "high": close, "low": close, "close": close, "volume": np.ones(n)})
+
+    engine = TradeEngine(equity_mode="change")
+    engine.run_strategy(ExampleStrategy("BTCUSDT", "1", df, {}))
+    summary = engine.get_summary()
+    assert os.listdir(tmp_path) == []
+    assert summary["total_trades"] == len(engine.trades)
+    assert len(engine.equity_curve) <= len(engine.trades)
+    assert engine.equity_curve.balances[-1] == engine.balance
+
+    engine.export_equity_curve("curve.npz")
+    assert len(EquityCurve.load("curve.npz")) == len(engine.equity_curve)
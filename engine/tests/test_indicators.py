@@ -0,0 +1,71 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+
+from engine.indicators import IndicatorCache, INDICATOR_CACHE, rsi
+from engine.strategies.MovingAverageCrossStrategy import MovingAverageCrossStrategy
+
+
+def make_candles(n=2000, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-01", periods=n, freq="1min", tz="UTC"),
+        "open": close, "high": close * 1.001, "low": close * 0.999, "close": close,
+        "volume": np.ones(n),
+    })
+
+
+def test_grid_sweep_computes_each_indicator_once():
+    df = make_candles()
+    INDICATOR_CACHE.clear()
+
+    param_sets = list(MovingAverageCrossStrategy.generate_param_combinations())
+    for params in param_sets:
+        MovingAverageCrossStrategy("BTCUSDT", "1", df, params).run()
+
+    # 3 short + 3 long SMA windows and one RSI period
+    assert INDICATOR_CACHE.misses == 7
+    assert INDICATOR_CACHE.hits == 2 * len(param_sets) + len(param_sets) // 2 - 7
+
+
+def test_cached_values_match_direct_computation():
+    df = make_candles()
+    cache = IndicatorCache()
+    pd.testing.assert_series_equal(cache.get(df, "sma", period=20), df["close"].rolling(20).mean())
+    pd.testing.assert_series_equal(cache.get(df, "rsi", period=14), rsi(df, 14))
+
+    # A different slice of the same data is a different key
+    part = df.iloc[100:].reset_index(drop=True)
+    pd.testing.assert_series_equal(cache.get(part, "sma", period=20), part["close"].rolling(20).mean())
+    assert cache.misses == 3
+
+
+def test_lru_eviction_respects_memory_cap():
+    df = make_candles(n=1000)
+    cache = IndicatorCache(max_bytes=2 * 1000 * 8)
+    for period in (5, 10, 20):
+        cache.get(df, "sma", period=period)
+    assert len(cache._entries) == 2
+
+    cache.get(df, "sma", period=10)
+    assert cache.hits == 1
+    cache.get(df, "sma", period=5)
+    assert cache.misses == 4
+
+
+def test_edited_copy_is_not_served_from_the_cache():
+    df = make_candles()
+    cache = IndicatorCache()
+    cache.get(df, "sma", period=5)
+
+    edited = df.copy()
+    edited.loc[500:504, "close"] = 0.0
+    assert cache.get(edited, "sma", period=5).iloc[504] == 0.0
+    # atr reads high and low as well
+    cache.get(df, "atr", period=5)
+    edited.loc[800, "high"] = 1e6
+    assert cache.get(edited, "atr", period=5).iloc[800] > 1000
+    assert cache.hits == 0
@@ -0,0 +1,84 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import glob
+import json
+import pstats
+
+import pytest
+
+import config
+from engine import instrumentation
+from engine.optimizer_gui_runner import run_optimizer_with_params
+from engine.strategies.example_strategy import ExampleStrategy
+from test_parallel import write_sample_data
+
+
+@pytest.fixture
+def sample_data(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "SYMBOLS", ["BTCUSDT"])
+    monkeypatch.setattr(config, "INTERVAL", ["15"])
+    monkeypatch.setattr(config, "RESULT_CACHE_PATH", None)
+    write_sample_data(config.SYMBOLS)
+
+
+def test_disabled_timers_record_nothing(monkeypatch):
+    monkeypatch.setattr(instrumentation, "_enabled", False)
+    instrumentation.reset()
+    with instrumentation.timer("block", items=10):
+        pass
+    instrumentation.timed("call")(lambda: None)()
+    instrumentation.count("things")
+    assert instrumentation.snapshot() == {"stages": {}, "counters": {}}
+
+
+def test_timers_counters_and_merge(monkeypatch):
+    monkeypatch.setattr(instrumentation, "_enabled", True)
+    instrumentation.reset()
+    for _ in range(3):
+        with instrumentation.timer("block", items=10):
+            pass
+    assert instrumentation.timed("call")(lambda x: x * 2)(4) == 8
+    instrumentation.count("things", 2)
+    stats = instrumentation.snapshot()
+    instrumentation.merge(stats)
+    stages = instrumentation.snapshot()["stages"]
+    assert stages["block"][0] == 6 and stages["block"][2] == 60
+    assert stages["call"][0] == 2
+    assert instrumentation.snapshot()["counters"] == {"things": 4}
+    instrumentation.reset()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_optimizer_run_writes_a_stage_report(sample_data, monkeypatch, workers):
+    monkeypatch.setattr(instrumentation, "_enabled", True)
+    results = run_optimizer_with_params(ExampleStrategy, workers=workers)
+
+    reports = glob.glob(os.path.join(config.INSTRUMENTATION_DIR, "optimizer_gui_*.json"))
+    assert len(reports) == 1
+    with open(reports[0], encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["run"] == "optimizer_gui" and report["wall_s"] > 0
+    stages = report["stages"]
+    # Evaluations in the worker processes are merged into the parent's report
+    assert stages["evaluate"]["calls"] == len(results)
+    assert stages["load_csv"]["calls"] == 1 and stages["validate_candles"]["calls"] == 1
+    assert stages["replay"]["calls"] >= 2 * len(results)
+    assert stages["replay"]["items_per_s"] > 0
+    if instrumentation.resource is not None:
+        assert report["peak_rss_mb"] > 0
+    instrumentation.reset()
+
+
+def test_selected_params_are_profiled(sample_data, monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_PARAMS", {"entry_interval": 10, "exit_offset": 5})
+    run_optimizer_with_params(ExampleStrategy, workers=1)
+
+    profiles = glob.glob(os.path.join(config.PROFILE_DIR, "*.pstats"))
+    assert len(profiles) == 1
+    assert "entry_interval-10_exit_offset-5" in profiles[0]
+    stats = pstats.Stats(profiles[0])
+    assert any(func[2] == "evaluate_params" for func in stats.stats)
+    assert not os.path.exists(config.INSTRUMENTATION_DIR)  # timing report is separate
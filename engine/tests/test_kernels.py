@@ -0,0 +1,126 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import math
+
+import numpy as np
+import pytest
+
+from engine import kernels
+from engine.kernels import LONG, SHORT, find_exit, find_exit_numpy, _find_exit_loop
+from engine.trade_engine import Position
+
+
+def reference(close, start, stop, direction, entry_price, tp, sl, trailing_pct, trailing_active, tp_now=None):
+    pos = Position("BTCUSDT", "LONG" if direction == LONG else "SHORT", None, entry_price, 1,
+                   tp=tp, sl=sl, trailing={"pct": trailing_pct} if trailing_pct is not None else None)
+    if trailing_active:
+        pos.trailing_active = True
+        pos.tp = tp_now
+    for i in range(start, stop):
+        hit, price = pos.should_exit(close[i])
+        if hit:
+            return i, price, pos.tp
+    return -1, None, pos.tp
+
+
+def cases(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        length = int(rng.integers(1, 2000))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, length)))
+        start = int(rng.integers(0, length))
+        direction = LONG if rng.random() < 0.5 else SHORT
+        entry = float(close[start])
+        sign = 1 if direction == LONG else -1
+        tp = [None, 0, entry * (1 + sign * rng.uniform(0.005, 0.1))][rng.integers(3)]
+        sl = [None, 0, entry * (1 - sign * rng.uniform(0.005, 0.1))][rng.integers(3)]
+        trailing_pct = [None, float(rng.uniform(0.001, 0.03) * -sign)][rng.integers(2)]
+        active = trailing_pct is not None and rng.random() < 0.3
+        tp_now = entry * (1 + trailing_pct) if active else None
+        yield close, start, length, direction, entry, tp, sl, trailing_pct, active, tp_now
+
+
+def nan(value):
+    return math.nan if value is None else value
+
+
+def loop(close, start, stop, direction, entry_price, tp, sl, trailing_pct, trailing_active,
+         high=None, low=None, intrabar_from=0, pessimistic=True):
+    if high is None:
+        high, low, intrabar_from = close, close, stop
+    return _find_exit_loop(close, high, low, start, stop, intrabar_from, direction, entry_price, tp, sl,
+                           trailing_pct, trailing_active, pessimistic)
+
+
+@pytest.mark.parametrize("kernel", [find_exit_numpy, loop, find_exit])
+def test_kernels_match_position_should_exit(kernel):
+    for close, start, stop, direction, entry, tp, sl, pct, active, tp_now in cases():
+        expected_bar, expected_price, expected_tp = reference(close, start, stop, direction, entry, tp, sl, pct, active, tp_now)
+        bar, price, new_tp, _ = kernel(close, start, stop, direction, entry,
+                                       nan(tp_now if active else tp), nan(sl), nan(pct), active)
+        assert bar == expected_bar
+        if bar >= 0:
+            assert price == pytest.approx(expected_price, rel=1e-12)
+        if pct is not None:
+            assert new_tp == pytest.approx(expected_tp, rel=1e-12)
+
+
+def test_nothing_to_check_returns_immediately():
+    close = np.linspace(1, 2, 10)
+    assert find_exit_numpy(close, 0, 10, LONG, 1.0)[0] == -1
+    assert find_exit_numpy(close, 0, 10, LONG, 1.0, tp=0.0, sl=0.0)[0] == -1
+    assert find_exit_numpy(close, 5, 5, LONG, 1.0, tp=1.1)[0] == -1
+
+
+def test_falls_back_to_numpy_when_numba_is_off(monkeypatch):
+    import config
+    calls = []
+    monkeypatch.setattr(config, "USE_NUMBA", False)
+    monkeypatch.setattr(kernels, "find_exit_numpy", lambda *args: calls.append(args) or (-1, math.nan, math.nan, False))
+    find_exit(np.ones(3), 0, 3, LONG, 1.0, tp=2.0)
+    assert len(calls) == 1
+
+
+def test_ranges_equal_to_the_close_match_the_close_model():
+    for close, start, stop, direction, entry, tp, sl, pct, active, tp_now in cases(100):
+        args = (close, start, stop, direction, entry, nan(tp_now if active else tp), nan(sl), nan(pct), active)
+        assert find_exit_numpy(*args, high=close, low=close, intrabar_from=start) == find_exit_numpy(*args)
+
+
+@pytest.mark.parametrize("pessimistic", [True, False])
+def test_numpy_matches_the_loop_on_candle_ranges(pessimistic):
+    rng = np.random.default_rng(5)
+    for close, start, stop, direction, entry, tp, sl, pct, active, tp_now in cases(200):
+        spread = np.abs(rng.normal(0, 0.004, len(close)))
+        high, low = close * (1 + spread), close * (1 - spread)
+        args = (close, start, stop, direction, entry, nan(tp_now if active else tp), nan(sl), nan(pct), active,
+                high, low, start + int(rng.integers(0, 2)), pessimistic)
+        bar, price, new_tp, _ = find_exit_numpy(*args)
+        expected_bar, expected_price, expected_tp, _ = loop(*args)
+        assert bar == expected_bar
+        if bar >= 0:
+            assert price == pytest.approx(expected_price, rel=1e-12)
+
+
+def test_fill_order_when_a_candle_holds_both_levels():
+    close = np.array([100.0, 100.0, 100.0])
+    high = np.array([100.0, 106.0, 100.0])
+    low = np.array([100.0, 94.0, 100.0])
+    long = (close, 0, 3, LONG, 100.0, 105.0, 95.0)
+    assert find_exit_numpy(*long)[:2] == (-1, pytest.approx(math.nan, nan_ok=True))
+    assert find_exit_numpy(*long, high=high, low=low)[:2] == (1, 95.0)
+    assert find_exit_numpy(*long, high=high, low=low, pessimistic=False)[:2] == (1, 105.0)
+    short = (close, 0, 3, SHORT, 100.0, 95.0, 105.0)
+    assert find_exit_numpy(*short, high=high, low=low)[:2] == (1, 105.0)
+    assert find_exit_numpy(*short, high=high, low=low, pessimistic=False)[:2] == (1, 95.0)
+    # Candles before intrabar_from only count their close
+    assert find_exit_numpy(*long, high=high, low=low, intrabar_from=2)[0] == -1
+
+
+@pytest.mark.skipif(kernels.numba is None, reason="numba not installed")
+def test_numba_kernel_matches_the_loop():
+    for close, start, stop, direction, entry, tp, sl, pct, active, tp_now in cases(50):
+        args = (close, close * 1.002, close * 0.998, start, stop, start + 1, direction, entry,
+                nan(tp_now if active else tp), nan(sl), nan(pct), active, True)
+        assert kernels.find_exit_numba(*args)[:2] == _find_exit_loop(*args)[:2]
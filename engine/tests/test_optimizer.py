@@ -1,44 +1,13 @@
-import csv
-import pandas as pd
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))  # adds crypto_backtester root to path
 
 from engine import optimizer
+from engine.optimizer import evaluate_results, save_results, split_train_test
 from utils import load_class_from_string
 import config
 from engine.data_loader import load_csv, validate_candles
 
-def split_train_test(df, train_days=20, test_days=10):
-    """Split DataFrame into train and test by date."""
-    if df.empty:
-        return None, None
-    end_date = pd.to_datetime(df["timestamp"].iloc[-1], utc=True)
-    train_start = end_date - pd.Timedelta(days=train_days + test_days)
-    train_end = end_date - pd.Timedelta(days=test_days)
-    train_df = df[(df["timestamp"] >= train_start.isoformat()) & (df["timestamp"] < train_end.isoformat())]
-    test_df = df[(df["timestamp"] >= train_end.isoformat()) & (df["timestamp"] <= end_date.isoformat())]
-    return train_df.reset_index(drop=True), test_df.reset_index(drop=True)
-
-def evaluate_results(trades, starting_balance):
-    """Calculate final balance after trades."""
-    balance = starting_balance
-    for trade in trades:
-        balance += trade.get("net_pnl", 0)
-    return balance
-
-def save_results(results, filename="optimizer_results.csv"):
-    """Save list of dict results to CSV."""
-    if not results:
-        print("No results to save.")
-        return
-    keys = results[0].keys()
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        dict_writer = csv.DictWriter(f, fieldnames=keys)
-        dict_writer.writeheader()
-        dict_writer.writerows(results)
-    print(f"Saved optimizer results to {filename}")
-
 def main():
     StrategyClass = load_class_from_string(config.STRATEGY_CLASS)
 
@@ -92,6 +61,24 @@ def main():
 
     save_results(results)
 
+def test_split_train_test_matches_date_masks():
+    import numpy as np
+    import pandas as pd
+    # Irregular timestamps, some exactly on the split boundaries
+    minutes = np.unique(np.random.default_rng(2).integers(0, 40 * 24 * 60, 30_000))
+    minutes = np.union1d(minutes, [40 * 24 * 60, 10 * 24 * 60, 30 * 24 * 60])
+    df = pd.DataFrame({"timestamp": pd.to_datetime(minutes * 60 * 10**9, utc=True), "close": minutes * 1.0})
+
+    end_date = df["timestamp"].iloc[-1]
+    train_start = end_date - pd.Timedelta(days=30)
+    train_end = end_date - pd.Timedelta(days=10)
+    expected_train = df[(df["timestamp"] >= train_start.isoformat()) & (df["timestamp"] < train_end.isoformat())]
+    expected_test = df[(df["timestamp"] >= train_end.isoformat()) & (df["timestamp"] <= end_date.isoformat())]
+
+    train_df, test_df = split_train_test(df, train_days=20, test_days=10)
+    pd.testing.assert_frame_equal(train_df, expected_train.reset_index(drop=True))
+    pd.testing.assert_frame_equal(test_df, expected_test.reset_index(drop=True))
+    assert split_train_test(df.iloc[:0]) == (None, None)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,92 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import importlib.util
+import numpy as np
+import pandas as pd
+
+import config
+from engine.data_handler import save_candles
+from engine.optimizer_gui_runner import run_optimizer_with_params
+from engine.strategies.example_strategy import ExampleStrategy
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "strategies"))
+
+
+def write_sample_data(symbols, interval="15", days=32, seed=1):
+    rng = np.random.default_rng(seed)
+    n = days * 24 * 60 // int(interval)
+    for symbol in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+        df = pd.DataFrame({
+            "timestamp": pd.date_range("2025-01-01", periods=n, freq=f"{interval}min", tz="UTC"),
+            "open": close, "high": close, "low": close, "close": close,
+            "volume": np.ones(n),
+        })
+        save_candles(df, symbol, interval, write_csv=False)
+
+
+def test_parallel_results_identical_to_serial(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "SYMBOLS", ["BTCUSDT", "ETHUSDT"])
+    monkeypatch.setattr(config, "INTERVAL", ["15"])
+    write_sample_data(config.SYMBOLS)
+
+    serial = run_optimizer_with_params(ExampleStrategy, workers=1)
+
+    streamed = []
+    progress = []
+    parallel = run_optimizer_with_params(
+        ExampleStrategy,
+        progress_callback=lambda done, total: progress.append((done, total)),
+        per_result_callback=streamed.append,
+        workers=3,
+    )
+
+    assert len(serial) == 18
+    assert parallel == serial
+    assert sorted(r["test_id"] for r in streamed) == list(range(1, 19))
+    assert progress[-1] == (18, 18)
+
+
+def test_parallel_with_strategy_loaded_from_file(tmp_path, monkeypatch):
+    # The GUI loads strategies with spec_from_file_location, outside sys.modules
+    spec = importlib.util.spec_from_file_location(
+        "example_strategy", os.path.join(STRATEGY_DIR, "example_strategy.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "SYMBOLS", ["BTCUSDT"])
+    monkeypatch.setattr(config, "INTERVAL", ["15"])
+    write_sample_data(config.SYMBOLS)
+
+    serial = run_optimizer_with_params(ExampleStrategy, workers=1)
+    parallel = run_optimizer_with_params(module.ExampleStrategy, workers=2)
+    assert parallel == serial
+
+
+def test_shared_candle_cache_views_and_refcount():
+    from engine.shared_candles import SharedCandleCache, row_range
+
+    n = 100
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-01", periods=n, freq="1min", tz="UTC"),
+        "open": np.arange(n, dtype=float), "high": np.arange(n, dtype=float),
+        "low": np.arange(n, dtype=float), "close": np.arange(n, dtype=float),
+        "volume": np.ones(n),
+    })
+
+    with SharedCandleCache() as cache:
+        handle = cache.publish(("BTCUSDT", "1"), df)
+        assert cache.publish(("BTCUSDT", "1"), df) is handle
+
+        part = df.iloc[20:50].reset_index(drop=True)
+        view = handle.slice(*row_range(df, part)).frame()
+        pd.testing.assert_frame_equal(view, part, check_dtype=False)
+        assert not view["close"].to_numpy().flags.writeable
+
+        cache.release(("BTCUSDT", "1"))
+        assert handle.frame()["close"].iloc[-1] == n - 1
+        cache.release(("BTCUSDT", "1"))
+        assert cache._segments == {}
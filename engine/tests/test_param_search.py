@@ -0,0 +1,104 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import itertools
+import math
+
+import pytest
+
+from engine.optimizer import search_params
+from engine.param_search import ParamSpace, RandomSearch, TPESearch
+from engine.strategies.MovingAverageCrossStrategy import MovingAverageCrossStrategy
+
+
+def _bumpy(context, params):
+    # Smooth basin around (fast=17, slow=160) with ripples, maximized
+    x, y = params["fast"], params["slow"]
+    score = -((x - 17) / 10) ** 2 - ((y - 160) / 60) ** 2 + 0.1 * math.sin(x) * math.cos(y / 7)
+    if params["mode"] == "b":
+        score -= 0.3
+    return {**params, "train_final_balance": score}
+
+
+SPACE = {"fast": (1, 40), "slow": (10, 300), "mode": ["a", "b"]}  # 23,280 combinations
+
+
+def _grid_scores():
+    grid = [dict(zip(SPACE, combo)) for combo in itertools.product(range(1, 41), range(10, 301), ["a", "b"])]
+    return sorted((_bumpy(None, p)["train_final_balance"] for p in grid), reverse=True)
+
+
+def test_space_decodes_ranges_and_round_trips():
+    space = ParamSpace({"n": (2, 30), "pct": (0.001, 0.1, "log"), "flag": [True, False]})
+    assert space.decode([0.0, 0.0, 0.0]) == {"n": 2, "pct": pytest.approx(0.001), "flag": True}
+    assert space.decode([1.0, 1.0, 1.0]) == {"n": 30, "pct": pytest.approx(0.1), "flag": False}
+    params = space.decode(space.encode({"n": 11, "pct": 0.01, "flag": False}))
+    assert params == {"n": 11, "pct": pytest.approx(0.01), "flag": False}
+    assert space.size() is None
+    assert ParamSpace({"n": (2, 30), "flag": [True, False]}).size() == 58
+
+
+def test_space_falls_back_to_param_grid_and_respects_valid_params():
+    class GridOnly:
+        param_grid = {"a": [1, 2], "b": [3]}
+
+    assert ParamSpace.from_strategy(GridOnly).size() == 2
+
+    searcher = RandomSearch(ParamSpace.from_strategy(MovingAverageCrossStrategy), seed=1)
+    for _ in range(200):
+        params = searcher.ask()
+        assert params["short_ma"] < params["long_ma"]
+
+
+def test_random_search_never_repeats_and_stops_when_exhausted():
+    searcher = RandomSearch(ParamSpace({"a": [1, 2, 3], "b": (0, 1)}), seed=0)
+    seen = [searcher.ask() for _ in range(6)]
+    assert len({(p["a"], p["b"]) for p in seen}) == 6
+    assert searcher.ask() is None
+
+
+def test_tpe_finds_a_top_config_with_a_fraction_of_the_grid():
+    grid = _grid_scores()
+    budget = len(grid) // 100  # 1% of the grid's evaluations
+    top = grid[len(grid) // 1000]  # score of the top 0.1%
+
+    hits = {"tpe": 0, "random": 0}
+    for seed in range(5):
+        for method in hits:
+            results = list(search_params(_bumpy, ParamSpace(SPACE), None, method, budget, seed=seed, workers=1))
+            assert len(results) == budget
+            hits[method] += max(r["train_final_balance"] for _, r in results) >= top
+    assert hits["tpe"] >= 4
+    assert hits["tpe"] > hits["random"]
+
+
+def test_search_stops_at_time_budget():
+    results = list(search_params(_bumpy, ParamSpace(SPACE), None, "tpe", 500, time_budget=0, workers=1))
+    assert results == []
+
+
+def _screen(context, task):
+    params, fraction = task
+    context["rungs"].add(fraction)
+    return {"score": _bumpy(None, params)["train_final_balance"], "pruned": None}
+
+
+def test_halving_search_screens_then_evaluates_survivors():
+    context = {"rungs": set()}
+    results = list(search_params(_bumpy, ParamSpace(SPACE), context, "halving", 40, seed=3,
+                                 workers=1, screen=_screen))
+    assert len(results) == 40
+    assert context["rungs"] == {0.25, 0.5}  # default rungs for eta=2
+    evaluated = [r for _, r in results if "pruned_by" not in r]
+    pruned = [r for _, r in results if "pruned_by" in r]
+    assert len(evaluated) == 10 and len(pruned) == 30
+    assert min(r["train_final_balance"] for r in evaluated) >= max(_bumpy(None, r)["train_final_balance"] for r in pruned)
+
+
+def test_tpe_learns_from_scores():
+    searcher = TPESearch(ParamSpace({"x": (0, 100)}), seed=0, n_startup=10)
+    for _ in range(30):
+        params = searcher.ask()
+        searcher.tell(params, -abs(params["x"] - 80))
+    late = [p["x"] for p, _ in searcher.history[20:]]
+    assert sum(abs(x - 80) for x in late) / len(late) < 15
@@ -0,0 +1,75 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.portfolio import run_portfolio
+from engine.trade_engine import TradeEngine
+from engine.strategies.example_strategy import ExampleStrategy
+
+
+def make_candles(n, start, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=n, freq="1min", tz="UTC"),
+        "open": close,
+        "high": close * 1.001,
+        "low": close * 0.999,
+        "close": close,
+        "volume": np.ones(n),
+    })
+
+
+def make_strategies():
+    return [
+        ExampleStrategy("BTCUSDT", "1", make_candles(2000, "2025-01-01 00:00", 1), {"entry_interval": 15, "exit_offset": 9}),
+        ExampleStrategy("ETHUSDT", "1", make_candles(1500, "2025-01-01 00:07", 2), {"entry_interval": 11, "exit_offset": 20}),
+        ExampleStrategy("SOLUSDT", "1", make_candles(2500, "2024-12-31 23:30", 3), {"entry_interval": 6, "exit_offset": 5}),
+    ]
+
+
+def run_merged_dict_path(strategies, starting_balance):
+    # Reference: every symbol's signals and price updates in one list, sorted by time
+    # with signals ahead of price updates at equal timestamps
+    signals, price_updates = [], []
+    for strategy in strategies:
+        strategy.run()
+        signals.extend(strategy.get_results())
+        price_updates.extend({
+            "timestamp": ts, "symbol": strategy.symbol, "action": "price_update", "price": price,
+        } for ts, price in zip(strategy.data["timestamp"], strategy.data["close"]))
+    events = signals + price_updates
+    events.sort(key=lambda x: x["timestamp"])
+
+    engine = TradeEngine(starting_balance=starting_balance)
+    for event in events:
+        engine.process_signal(event)
+    return engine
+
+
+@pytest.mark.parametrize("starting_balance", [10000, 25])
+def test_portfolio_matches_globally_sorted_events(starting_balance):
+    # With 25 only two fixed-size positions fit, so the cross-symbol order decides which open
+    expected = run_merged_dict_path(make_strategies(), starting_balance)
+
+    actual = TradeEngine(starting_balance=starting_balance)
+    run_portfolio(actual, make_strategies())
+
+    assert len(actual.get_trades()) > 100
+    assert actual.get_trades() == expected.get_trades()
+    assert actual.balance == expected.balance
+    assert actual.available_balance == expected.available_balance
+    assert actual.max_drawdown == expected.max_drawdown
+    assert set(actual.positions) == set(expected.positions)
+
+    assert np.all(np.diff(actual.equity_curve.timestamps) >= 0)
+
+
+def test_portfolio_rejects_duplicate_symbols():
+    strategies = make_strategies()
+    strategies.append(ExampleStrategy("BTCUSDT", "5", strategies[0].data, {}))
+    with pytest.raises(ValueError):
+        run_portfolio(TradeEngine(), strategies)
@@ -0,0 +1,94 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy as np
+import pandas as pd
+
+import config
+from engine.optimizer_gui_runner import run_optimizer_with_params
+from engine.portfolio import run_portfolio
+from engine.pruning import screen_params
+from engine.trade_engine import TradeEngine
+from engine.strategies.example_strategy import ExampleStrategy
+from test_parallel import write_sample_data
+
+
+def make_candles(n=3000, seed=2, drift=-0.0005, start="2025-01-01"):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.003, n)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=n, freq="1min", tz="UTC"),
+        "open": close, "high": close, "low": close, "close": close, "volume": np.ones(n),
+    })
+
+
+def test_kill_rule_stops_replay_at_the_halting_trade():
+    df = make_candles()
+    full = TradeEngine(starting_balance=100)
+    full.run_strategy(ExampleStrategy("BTCUSDT", "1", df, {"entry_interval": 5, "exit_offset": 3}))
+
+    engine = TradeEngine(starting_balance=100)
+    engine.set_kill_rules(min_equity=99.5)
+    engine.run_strategy(ExampleStrategy("BTCUSDT", "1", df, {"entry_interval": 5, "exit_offset": 3}))
+
+    assert engine.halted and "equity" in engine.halt_reason
+    assert 0 < len(engine.trades) < len(full.trades)
+    # Identical up to the trade that broke the rule, nothing after it
+    assert engine.trades == full.trades[:len(engine.trades)]
+    assert engine.trades[-1]["balance_after"] < 99.5
+    assert all(t["balance_after"] >= 99.5 for t in engine.trades[:-1])
+    assert engine.halted_at == engine.trades[-1]["exit_time"]
+
+
+def test_kill_rule_halts_whole_portfolio():
+    engine = TradeEngine(starting_balance=100)
+    engine.set_kill_rules(max_drawdown_pct=0.3)
+    run_portfolio(engine, [
+        ExampleStrategy("BTCUSDT", "1", make_candles(seed=3), {}),
+        ExampleStrategy("ETHUSDT", "1", make_candles(seed=4), {}),
+    ])
+    assert engine.halted
+    assert engine.max_drawdown > 0.003
+    assert max(t["exit_time"] for t in engine.trades) == engine.halted_at
+
+
+def _fake_screen(context, task):
+    score, fraction = task
+    context["calls"].append((score, fraction))
+    if score < 0:
+        return {"score": score, "pruned": {"pruned_by": "kill_rule", "pruned_stage": "x",
+                                           "pruned_at_pct": 10.0, "pruned_reason": "test"}}
+    return {"score": score * fraction, "pruned": None}
+
+
+def test_successive_halving_keeps_best_fraction():
+    context = {"calls": []}
+    scores = [5, 1, -1, 9, 3, 7, 2, 8]
+    alive, pruned = screen_params(_fake_screen, scores, context, workers=1, rungs=[0.25, 0.5], eta=2)
+
+    assert [scores[i] for i in alive] == [9, 8]
+    assert pruned[2]["pruned_by"] == "kill_rule"
+    assert sorted(i for i, p in pruned.items() if p["pruned_by"] == "halving") == [0, 1, 4, 5, 6]
+    assert len([c for c in context["calls"] if c[1] == 0.25]) == 8
+    assert len([c for c in context["calls"] if c[1] == 0.5]) == 4
+
+
+def test_optimizer_prunes_and_reports(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "SYMBOLS", ["BTCUSDT"])
+    monkeypatch.setattr(config, "INTERVAL", ["15"])
+    write_sample_data(config.SYMBOLS)
+
+    baseline = run_optimizer_with_params(ExampleStrategy, workers=1)
+    assert not os.path.exists("results/pruned_configs.csv")
+
+    monkeypatch.setattr(config, "PRUNE_HALVING_RUNGS", [0.25, 0.5])
+    pruned_run = run_optimizer_with_params(ExampleStrategy, workers=1)
+
+    assert len(pruned_run) == 3  # 9 -> 5 -> 3
+    by_id = {r["test_id"]: r for r in baseline}
+    assert all(r == by_id[r["test_id"]] for r in pruned_run)
+    pruned_csv = pd.read_csv("results/pruned_configs.csv")
+    assert len(pruned_csv) == 6
+    assert set(pruned_csv["pruned_at_pct"]) == {25.0, 50.0}
@@ -0,0 +1,85 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+
+from engine import candle_store
+from engine.data_loader import load_csv, resample_columns
+from engine.data_handler import append_candles, save_candles
+
+
+def minute_candles(n=3000, start="2025-01-01 00:03", seed=1):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=n, freq="1min", tz="UTC"),
+        "open": close + rng.normal(0, 0.1, n),
+        "high": close + 1 + rng.random(n),
+        "low": close - 1 - rng.random(n),
+        "close": close,
+        "volume": rng.random(n) * 10,
+    })
+
+
+def pandas_resample(df, minutes):
+    out = df.set_index("timestamp").resample(f"{minutes}min").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+    return out.dropna(subset=["open"]).reset_index()
+
+
+def test_resample_matches_pandas_and_skips_gaps():
+    df = minute_candles()
+    # A 2h hole in the 1m data must not produce flat candles
+    df = df.drop(index=range(1000, 1120)).reset_index(drop=True)
+    columns = {
+        "timestamp": pd.DatetimeIndex(df["timestamp"]).as_unit("ns").asi8,
+        **{col: df[col].to_numpy() for col in ["open", "high", "low", "close", "volume"]},
+    }
+
+    for minutes in (5, 15, 60, 240):
+        result = candle_store.columns_to_frame(resample_columns(columns, minutes))
+        expected = pandas_resample(df, minutes)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_freq=False)
+
+    hourly = resample_columns(columns, 60)["timestamp"]
+    # 16:43-18:42 missing: the 17:00 candle is skipped, 16:00 and 18:00 are partial
+    assert np.diff(hourly).max() == 2 * 3600 * 10**9
+
+
+def test_load_csv_derives_from_1m_and_refreshes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = minute_candles()
+    save_candles(df.iloc[:2000].reset_index(drop=True), "BTCUSDT", "1")
+
+    fifteen = load_csv("BTCUSDT", "15")
+    pd.testing.assert_frame_equal(fifteen, pandas_resample(df.iloc[:2000], 15), check_dtype=False, check_freq=False)
+    assert not os.path.exists("data/BTCUSDT_15m.csv")
+    meta = candle_store.read_meta("BTCUSDT", "15", candle_store.DERIVED_DIR)
+    assert meta["derived_from"]["rows"] == 2000
+
+    # Cached: a second load does not rewrite the derived store
+    mtime = os.stat(os.path.join(candle_store.store_path("BTCUSDT", "15", candle_store.DERIVED_DIR), "meta.json")).st_mtime_ns
+    load_csv("BTCUSDT", "15")
+    assert os.stat(os.path.join(candle_store.store_path("BTCUSDT", "15", candle_store.DERIVED_DIR), "meta.json")).st_mtime_ns == mtime
+
+    # New 1m candles show up in the derived interval, including the partial last bin
+    append_candles(df.iloc[2000:].reset_index(drop=True), "BTCUSDT", "1")
+    fifteen = load_csv("BTCUSDT", "15")
+    pd.testing.assert_frame_equal(fifteen, pandas_resample(df, 15), check_dtype=False, check_freq=False)
+
+    # Corrected interior 1m candles (same rows and endpoints) rebuild it as well
+    fixed = df.copy()
+    fixed.loc[1500:1510, "high"] += 50
+    save_candles(fixed, "BTCUSDT", "1")
+    fifteen = load_csv("BTCUSDT", "15")
+    pd.testing.assert_frame_equal(fifteen, pandas_resample(fixed, 15), check_dtype=False, check_freq=False)
+
+
+def test_load_csv_falls_back_to_native_file_without_1m(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    native = pandas_resample(minute_candles(), 5)
+    save_candles(native, "ETHUSDT", "5")
+
+    pd.testing.assert_frame_equal(load_csv("ETHUSDT", "5"), native, check_dtype=False, check_freq=False)
+    assert load_csv("ETHUSDT", "15") is None
@@ -0,0 +1,165 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import importlib.util
+import shutil
+
+import numpy as np
+
+import config
+from engine import result_cache
+from engine.optimizer_gui_runner import run_optimizer_with_params
+from engine.result_cache import ResultCache, run_strategy_cached
+from engine.trade_engine import TradeEngine
+from engine.strategies.example_strategy import ExampleStrategy
+from test_parallel import write_sample_data
+from test_pruning import make_candles
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "strategies"))
+PARAMS = {"entry_interval": 5, "exit_offset": 3}
+
+
+def assert_same_state(engine, expected):
+    assert engine.trades == expected.trades
+    assert engine.balance == expected.balance
+    assert engine.max_drawdown == expected.max_drawdown
+    assert engine.positions.keys() == expected.positions.keys()
+    assert (engine.halted, engine.halt_reason, engine.halted_at) == (expected.halted, expected.halt_reason, expected.halted_at)
+    np.testing.assert_array_equal(engine.equity_curve.balances, expected.equity_curve.balances)
+
+
+def test_hit_restores_the_end_state(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    df = make_candles()
+
+    expected = TradeEngine(starting_balance=100)
+    expected.set_kill_rules(min_equity=99.5)
+    expected.run_strategy(ExampleStrategy("BTCUSDT", "1", df, PARAMS))
+    assert expected.halted
+
+    for _ in range(2):
+        engine = TradeEngine(starting_balance=100)
+        engine.set_kill_rules(min_equity=99.5)
+        run_strategy_cached(engine, ExampleStrategy("BTCUSDT", "1", df, PARAMS), cache=cache)
+        assert_same_state(engine, expected)
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    rows = TradeEngine()
+    rows.run_strategy_rows(ExampleStrategy("BTCUSDT", "1", df, PARAMS), 500, 1500)
+    for _ in range(2):
+        engine = TradeEngine()
+        run_strategy_cached(engine, ExampleStrategy("BTCUSDT", "1", df, PARAMS), 500, 1500, cache=cache)
+        assert_same_state(engine, rows)
+    assert (cache.misses, cache.hits) == (2, 2)
+
+
+def test_key_covers_data_params_settings_and_source(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    df = make_candles()
+
+    def run(engine=None, data=df, params=PARAMS, cls=ExampleStrategy):
+        run_strategy_cached(engine or TradeEngine(), cls("BTCUSDT", "1", data, params), cache=cache)
+
+    run()
+    run()
+    assert cache.hits == 1
+    run(params={"entry_interval": 7, "exit_offset": 3})
+    run(engine=TradeEngine(fee_pct=0.002))
+    changed = df.copy()
+    changed.loc[1000, "close"] *= 1.01
+    run(data=changed)
+    assert (cache.hits, cache.misses) == (1, 4)
+
+    # Editing the strategy's source file invalidates its results
+    path = tmp_path / "example_copy.py"
+    shutil.copy(os.path.join(STRATEGY_DIR, "example_strategy.py"), path)
+
+    def load():
+        spec = importlib.util.spec_from_file_location("example_copy", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.ExampleStrategy
+
+    run(cls=load())
+    assert (cache.hits, cache.misses) == (2, 4)  # identical source, same version
+    path.write_text(path.read_text() + "\n# tweak\n")
+    os.utime(path, (1, 1))
+    run(cls=load())
+    assert (cache.hits, cache.misses) == (2, 5)
+
+
+def test_used_engines_bypass_the_cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    df = make_candles()
+    engine = TradeEngine()
+    engine.run_strategy(ExampleStrategy("ETHUSDT", "1", df, PARAMS))
+    run_strategy_cached(engine, ExampleStrategy("BTCUSDT", "1", df, PARAMS), cache=cache)
+    assert len(cache) == 0 and cache.misses == 0
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"), max_mb=0.01)
+    blob = b"x" * 3000
+    for key in "abc":
+        cache.put(key, blob)
+    assert cache.get("a") == blob  # a is now the most recently used
+    cache.put("d", blob)
+    assert cache.size_bytes() <= cache.max_bytes
+    assert cache.get("b") is None
+    assert cache.get("a") == blob and cache.get("d") == blob
+
+
+def test_second_optimizer_run_is_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "SYMBOLS", ["BTCUSDT"])
+    monkeypatch.setattr(config, "INTERVAL", ["15"])
+    write_sample_data(config.SYMBOLS)
+
+    first = run_optimizer_with_params(ExampleStrategy, workers=1)
+    cache = result_cache.default_cache()
+    assert cache.path == config.RESULT_CACHE_PATH and os.path.exists(cache.path)
+    misses = cache.misses
+    second = run_optimizer_with_params(ExampleStrategy, workers=1)
+    assert second == first
+    assert cache.misses == misses
+    assert cache.hits >= 2 * len(first)  # train and test run of every config
+
+
+def test_frames_edited_in_place_get_a_new_fingerprint(tmp_path, monkeypatch):
+    from engine.data_handler import save_candles
+    from engine.data_loader import load_csv
+    from engine.shared_candles import SharedCandleCache
+
+    monkeypatch.chdir(tmp_path)
+    save_candles(make_candles(), "BTCUSDT", "1", write_csv=False)
+    df = load_csv("BTCUSDT", "1")
+    before = result_cache.frame_fingerprint(df)
+    df.loc[500:504, "close"] = 0.0
+    assert result_cache.frame_fingerprint(df) != before
+
+    with SharedCandleCache() as cache:
+        handle = cache.publish("BTCUSDT", df)
+        shared = result_cache.frame_fingerprint(handle.frame())
+        assert shared == result_cache.frame_fingerprint(df)
+        assert result_cache.frame_fingerprint(handle.slice(0, 1000).frame()) != shared
+        edited = handle.frame().copy()
+        edited.loc[10, "close"] = 1.0
+        assert result_cache.frame_fingerprint(edited) != shared
+
+
+def test_version_covers_the_portfolio_and_equity_curve_code(tmp_path, monkeypatch):
+    names = {os.path.basename(path) for path in result_cache.ENGINE_FILES}
+    assert {"equity_curve.py", "streaming.py", "portfolio.py"} <= names
+
+    copies = []
+    for path in result_cache.ENGINE_FILES:
+        copy = tmp_path / os.path.basename(path)
+        shutil.copy(path, copy)
+        copies.append(str(copy))
+    monkeypatch.setattr(result_cache, "ENGINE_FILES", copies)
+    before = result_cache.strategy_version(ExampleStrategy)
+    streaming = tmp_path / "streaming.py"
+    streaming.write_text(streaming.read_text() + "\n# tweak\n")
+    os.utime(streaming, (1, 1))
+    assert result_cache.strategy_version(ExampleStrategy) != before
@@ -0,0 +1,108 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pytest
+
+import config
+from engine import optimizer_gui_runner
+from engine.optimizer_gui_runner import run_optimizer_with_params
+from engine.results_store import ResultsStore, merge_shards
+from engine.strategies.example_strategy import ExampleStrategy
+from test_parallel import STRATEGY_DIR, write_sample_data
+
+
+@pytest.fixture
+def sweep(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "SYMBOLS", ["BTCUSDT", "ETHUSDT"])
+    monkeypatch.setattr(config, "INTERVAL", ["15"])
+    write_sample_data(config.SYMBOLS)
+
+    evaluated = []
+    evaluate = optimizer_gui_runner._evaluate_task
+
+    def counting(context, task):
+        evaluated.append(task)
+        return evaluate(context, task)
+
+    monkeypatch.setattr(optimizer_gui_runner, "_evaluate_task", counting)
+    return evaluated
+
+
+def test_interrupted_sweep_resumes_where_it_stopped(sweep):
+    full = run_optimizer_with_params(ExampleStrategy, workers=1, store=ResultsStore("full"))
+
+    def crash(result):
+        if len(seen) == 5:
+            raise KeyboardInterrupt
+        seen.append(result)
+
+    seen = []
+    with pytest.raises(KeyboardInterrupt):
+        run_optimizer_with_params(ExampleStrategy, per_result_callback=crash, workers=1, store=ResultsStore("run"))
+    assert len(ResultsStore("run").load()) == 6  # the one that crashed was stored first
+
+    sweep.clear()
+    progress = []
+    resumed = run_optimizer_with_params(ExampleStrategy, lambda done, total: progress.append((done, total)),
+                                        workers=1, store=ResultsStore("run"), resume=True)
+    assert resumed == full
+    assert len(sweep) == 18 - 6
+    assert progress[-1] == (18, 18)
+
+
+def test_torn_last_line_is_skipped(sweep):
+    run_optimizer_with_params(ExampleStrategy, workers=1, store=ResultsStore("run", shard="host"))
+    with open(os.path.join("run", "host.jsonl"), "a", encoding="utf-8") as f:
+        f.write('{"key": "[\\"example_str')
+    assert len(ResultsStore("run").load()) == 18
+
+
+def test_changed_settings_are_not_reused(sweep, monkeypatch):
+    run_optimizer_with_params(ExampleStrategy, workers=1, store=ResultsStore("run"))
+    monkeypatch.setattr(config, "FEE_PCT", 0.002)
+    sweep.clear()
+    run_optimizer_with_params(ExampleStrategy, workers=1, store=ResultsStore("run"), resume=True)
+    assert len(sweep) == 18
+
+
+def test_partitioned_shards_merge_into_one_sweep(sweep):
+    full = run_optimizer_with_params(ExampleStrategy, workers=1, store=ResultsStore("full"))
+
+    part_a = run_optimizer_with_params(ExampleStrategy, workers=1, store=ResultsStore("a", shard="a"), partition=(0, 2))
+    part_b = run_optimizer_with_params(ExampleStrategy, workers=1, store=ResultsStore("b", shard="b"), partition=(1, 2))
+    assert len(part_a) == len(part_b) == 9
+    assert sorted(r["test_id"] for r in part_a + part_b) == list(range(1, 19))
+
+    assert merge_shards(["a/a.jsonl", "b/b.jsonl"], "merged/all.jsonl") == 18
+    sweep.clear()
+    merged = run_optimizer_with_params(ExampleStrategy, workers=1, store=ResultsStore("merged"), resume=True)
+    assert sweep == []
+    assert merged == full
+
+
+def test_edited_strategy_code_is_not_reused(sweep, tmp_path):
+    from engine import strategy_registry
+
+    path = tmp_path / "edited_strategy.py"
+    with open(os.path.join(STRATEGY_DIR, "example_strategy.py"), encoding="utf-8") as f:
+        source = f.read()
+    path.write_text(source)
+    run_optimizer_with_params(strategy_registry.load_strategy_class(str(tmp_path), "edited_strategy", "ExampleStrategy"),
+                              workers=1, store=ResultsStore("run"))
+
+    path.write_text(source + "\n# tweaked\n")
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    sweep.clear()
+    run_optimizer_with_params(strategy_registry.load_strategy_class(str(tmp_path), "edited_strategy", "ExampleStrategy"),
+                              workers=1, store=ResultsStore("run"), resume=True)
+    assert len(sweep) == 18
+
+
+def test_repeated_runs_do_not_grow_the_shard(sweep):
+    for _ in range(3):
+        run_optimizer_with_params(ExampleStrategy, workers=1, store=ResultsStore("run", shard="host"))
+    assert ResultsStore("run", shard="host").compact() == 18
+    with open(os.path.join("run", "host.jsonl"), encoding="utf-8") as f:
+        assert sum(1 for _ in f) == 18
@@ -0,0 +1,57 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from engine import strategy_registry
+from engine.trade_engine import discover_strategy_classes
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "strategies"))
+
+STRATEGY_SOURCE = '''
+raise RuntimeError("strategy modules must not be imported by discovery")
+
+class Helper:
+    pass
+
+class GridStrategy(Base):
+    param_grid = {"length": [1, 2]}
+
+class TunedGridStrategy(GridStrategy):
+    pass
+
+class CustomStrategy:
+    @classmethod
+    def generate_param_combinations(cls):
+        return [{}]
+'''
+
+
+def test_discovers_strategies_without_importing(tmp_path):
+    (tmp_path / "grid.py").write_text(STRATEGY_SOURCE)
+    (tmp_path / "broken.py").write_text("class Oops(:\n")
+    (tmp_path / "__init__.py").write_text("")
+    assert discover_strategy_classes(str(tmp_path)) == [
+        ("grid", "GridStrategy"), ("grid", "TunedGridStrategy"), ("grid", "CustomStrategy")]
+
+
+def test_repo_strategies_are_found():
+    found = strategy_registry.discover(STRATEGY_DIR)
+    assert ("example_strategy", "ExampleStrategy") in found
+    assert ("MovingAverageCrossStrategy", "MovingAverageCrossStrategy") in found
+    assert ("RSIMovingAverageStrategy", "RSIMovingAverageStrategy") in found
+    assert all(module != "base_strategy" for module, _ in found)
+
+
+def test_index_and_modules_reload_only_when_the_file_changes(tmp_path):
+    path = tmp_path / "momentum.py"
+    path.write_text("class Momentum:\n    param_grid = {'n': [1]}\n    version = 1\n")
+    assert strategy_registry.discover(str(tmp_path)) == [("momentum", "Momentum")]
+
+    first = strategy_registry.load_strategy_class(str(tmp_path), "momentum", "Momentum")
+    assert first.version == 1
+    assert strategy_registry.load_strategy_class(str(tmp_path), "momentum", "Momentum") is first
+
+    path.write_text("class Momentum:\n    param_grid = {'n': [1, 2]}\n    version = 2\n\n"
+                    "class Reversal:\n    param_grid = {}\n")
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    assert strategy_registry.discover(str(tmp_path)) == [("momentum", "Momentum"), ("momentum", "Reversal")]
+    assert strategy_registry.load_strategy_class(str(tmp_path), "momentum", "Momentum").version == 2
@@ -0,0 +1,131 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.trade_engine import TradeEngine
+from engine.strategy_interface import alternate_signals
+from engine.strategies.example_strategy import ExampleStrategy
+from engine.strategies.MovingAverageCrossStrategy import MovingAverageCrossStrategy
+from engine.strategies.RSIMovingAverageStrategy import RSIMovingAverageStrategy
+
+
+def make_candles(n=4000, seed=9):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-01", periods=n, freq="1min", tz="UTC"),
+        "open": close, "high": close * 1.001, "low": close * 0.999, "close": close,
+        "volume": np.ones(n),
+    })
+
+
+# Row-by-row reference implementations the strategies used before the vectorized port
+
+def legacy_rsi(series, period):
+    delta = series.diff()
+    avg_gain = delta.clip(lower=0).rolling(window=period).mean()
+    avg_loss = (-delta.clip(upper=0)).rolling(window=period).mean()
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def legacy_ma_cross(symbol, df, params):
+    df = df.copy()
+    df["short_ma"] = df["close"].rolling(window=params["short_ma"]).mean()
+    df["long_ma"] = df["close"].rolling(window=params["long_ma"]).mean()
+    df["rsi"] = legacy_rsi(df["close"], params["rsi_period"]) if params["use_rsi_filter"] else np.nan
+    signals, in_position = [], False
+    for i in range(1, len(df)):
+        row, prev = df.iloc[i], df.iloc[i - 1]
+        if np.isnan(row["short_ma"]) or np.isnan(row["long_ma"]):
+            continue
+        if not in_position:
+            if prev["short_ma"] < prev["long_ma"] and row["short_ma"] > row["long_ma"]:
+                if params["use_rsi_filter"] and not np.isnan(row["rsi"]) and row["rsi"] > params["rsi_oversold"]:
+                    continue
+                signals.append({"timestamp": row["timestamp"], "symbol": symbol, "direction": "LONG",
+                                "entry_price": row["close"], "take_profit": row["close"] * 1.02,
+                                "stop_loss": row["close"] * 0.98})
+                in_position = True
+        elif prev["short_ma"] > prev["long_ma"] and row["short_ma"] < row["long_ma"]:
+            signals.append({"timestamp": row["timestamp"], "symbol": symbol, "exit": True,
+                            "exit_price": row["close"]})
+            in_position = False
+    return signals
+
+
+def legacy_rsi_ma(symbol, df, params):
+    df = df.copy()
+    df["rsi"] = legacy_rsi(df["close"], params["rsi_period"])
+    df["ma"] = df["close"].rolling(window=params["ma_period"]).mean()
+    signals, position = [], None
+    for _, row in df.iterrows():
+        if np.isnan(row["rsi"]) or np.isnan(row["ma"]):
+            continue
+        price = row["close"]
+        if position is None:
+            if row["rsi"] < params["rsi_oversold"] and price > row["ma"]:
+                signals.append({"timestamp": row["timestamp"], "symbol": symbol, "direction": "LONG",
+                                "entry_price": price, "take_profit": price * 1.02, "stop_loss": price * 0.98})
+                position = "LONG"
+        elif row["rsi"] > params["rsi_overbought"] or price < row["ma"]:
+            signals.append({"timestamp": row["timestamp"], "symbol": symbol, "exit": True, "exit_price": price})
+            position = None
+    return signals
+
+
+def legacy_example(symbol, df, params):
+    signals = []
+    for n, i in enumerate(range(0, len(df) - params["exit_offset"], params["entry_interval"])):
+        entry, exit_ = df.iloc[i], df.iloc[i + params["exit_offset"]]
+        direction = "LONG" if n % 2 == 0 else "SHORT"
+        signals.append({"timestamp": entry["timestamp"], "symbol": symbol, "direction": direction,
+                        "entry_price": entry["close"],
+                        "take_profit": entry["close"] * (1.02 if direction == "LONG" else 0.98),
+                        "stop_loss": entry["close"] * (0.98 if direction == "LONG" else 1.02)})
+        signals.append({"timestamp": exit_["timestamp"], "symbol": symbol, "exit": True,
+                        "exit_price": exit_["close"]})
+    return signals
+
+
+CASES = [
+    (MovingAverageCrossStrategy, legacy_ma_cross, list(MovingAverageCrossStrategy.generate_param_combinations())),
+    (RSIMovingAverageStrategy, legacy_rsi_ma, list(RSIMovingAverageStrategy.generate_param_combinations())),
+    (ExampleStrategy, legacy_example, list(ExampleStrategy.generate_param_combinations())),
+]
+
+
+def sort_like_engine(signals):
+    return sorted(signals, key=lambda s: s["timestamp"])
+
+
+@pytest.mark.parametrize("StrategyClass,legacy,param_sets", CASES)
+def test_vectorized_strategies_match_row_loops(StrategyClass, legacy, param_sets):
+    df = make_candles()
+    for params in param_sets:
+        expected = legacy("BTCUSDT", df, params)
+
+        strategy = StrategyClass("BTCUSDT", "1", df, params)
+        strategy.run()
+        assert sort_like_engine(strategy.get_results()) == sort_like_engine(expected), params
+
+        reference = TradeEngine()
+        reference.replay("BTCUSDT", df, expected)
+        vectorized = TradeEngine()
+        vectorized.run_strategy(StrategyClass("BTCUSDT", "1", df, params))
+        assert vectorized.get_trades() == reference.get_trades(), params
+        assert vectorized.balance == reference.balance
+
+
+def test_alternate_signals_with_simultaneous_conditions():
+    entries = np.array([1, 1, 0, 1, 1, 0, 1], dtype=bool)
+    exits = np.array([0, 1, 1, 1, 0, 1, 1], dtype=bool)
+    kept_entries, kept_exits = alternate_signals(entries, exits)
+    assert kept_entries.tolist() == [1, 0, 0, 1, 0, 0, 1]
+    assert kept_exits.tolist() == [0, 1, 0, 0, 0, 1, 0]
+
+    kept_entries, kept_exits = alternate_signals(entries & ~exits, exits & ~entries)
+    assert kept_entries.tolist() == [1, 0, 0, 0, 1, 0, 0]
+    assert kept_exits.tolist() == [0, 0, 1, 0, 0, 1, 0]
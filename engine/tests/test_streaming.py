@@ -0,0 +1,128 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.candle_store import COLUMNS
+from engine.data_handler import save_candles
+from engine.indicators import INDICATOR_CACHE
+from engine.portfolio import run_portfolio
+from engine.streaming import chunk_windows, stream_backtest, stream_portfolio, stream_steps
+from engine.trade_engine import TradeEngine
+from engine.strategies.example_strategy import ExampleStrategy
+from engine.strategies.MovingAverageCrossStrategy import MovingAverageCrossStrategy
+from engine.strategies.RSIMovingAverageStrategy import RSIMovingAverageStrategy
+
+
+def make_candles(n=6000, seed=5, start="2025-01-01"):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=n, freq="1min", tz="UTC"),
+        "open": close,
+        "high": close * 1.001,
+        "low": close * 0.999,
+        "close": close,
+        "volume": np.ones(n),
+    })
+
+
+def as_columns(df):
+    columns = {col: df[col].to_numpy() for col in COLUMNS[1:]}
+    columns["timestamp"] = pd.DatetimeIndex(df["timestamp"]).as_unit("ns").asi8
+    return columns
+
+
+CASES = [
+    (ExampleStrategy, {"entry_interval": 7, "exit_offset": 11}),
+    (MovingAverageCrossStrategy, {"short_ma": 5, "long_ma": 40, "use_rsi_filter": True,
+                                  "rsi_period": 14, "rsi_oversold": 60, "rsi_overbought": 70}),
+    (MovingAverageCrossStrategy, {"short_ma": 10, "long_ma": 30, "use_rsi_filter": False,
+                                  "rsi_period": 14, "rsi_oversold": 30, "rsi_overbought": 70}),
+    (RSIMovingAverageStrategy, {"rsi_period": 14, "rsi_overbought": 60, "rsi_oversold": 40, "ma_period": 20}),
+]
+
+
+@pytest.mark.parametrize("StrategyClass,params", CASES)
+@pytest.mark.parametrize("chunk_rows", [97, 1000])
+def test_streamed_backtest_matches_full_run(StrategyClass, params, chunk_rows):
+    df = make_candles()
+    expected = TradeEngine()
+    expected.run_strategy(StrategyClass("BTCUSDT", "1", df, params))
+
+    actual = TradeEngine()
+    for _ in stream_steps(actual, StrategyClass, "BTCUSDT", "1", as_columns(df), params, chunk_rows):
+        pass
+
+    assert len(expected.trades) > 10
+    assert actual.trades == expected.trades
+    assert actual.balance == expected.balance
+    assert set(actual.positions) == set(expected.positions)
+
+
+def test_windows_stay_bounded():
+    seen = []
+
+    class Spy(ExampleStrategy):
+        def generate_signals_vectorized(self):
+            seen.append(len(self.data))
+            return super().generate_signals_vectorized()
+
+    for _ in stream_steps(TradeEngine(), Spy, "BTCUSDT", "1", as_columns(make_candles()), {"exit_offset": 5}, 500):
+        pass
+    assert len(seen) == 12
+    assert max(seen) <= 500 + 2 * 5
+    assert list(chunk_windows(10, 4, 2, 1)) == [(0, 4, 0, 5), (4, 8, 2, 9), (8, 10, 6, 10)]
+
+
+def test_streamed_indicators_stay_out_of_the_global_cache():
+    # RSIMovingAverageStrategy computes its indicators in __init__
+    params = {"rsi_period": 14, "rsi_overbought": 60, "rsi_oversold": 40, "ma_period": 20}
+    INDICATOR_CACHE.clear()
+    for _ in stream_steps(TradeEngine(), RSIMovingAverageStrategy, "BTCUSDT", "1", as_columns(make_candles()),
+                          params, 500):
+        pass
+    assert len(INDICATOR_CACHE._entries) == 0 and INDICATOR_CACHE.misses == 0
+
+
+def test_stream_portfolio_from_store_matches_in_memory_portfolio(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    params = {"entry_interval": 9, "exit_offset": 4}
+    frames = {"BTCUSDT": make_candles(3000, 1), "ETHUSDT": make_candles(2000, 2, "2025-01-01 00:05")}
+    for symbol, df in frames.items():
+        save_candles(df, symbol, "1")
+
+    expected = TradeEngine(starting_balance=25)
+    run_portfolio(expected, [ExampleStrategy(s, "1", df, params) for s, df in frames.items()])
+
+    actual = TradeEngine(starting_balance=25)
+    stream_portfolio(actual, ExampleStrategy, list(frames), "1", params, chunk_rows=250)
+    assert actual.trades == expected.trades
+    assert actual.max_drawdown == expected.max_drawdown
+
+    single = TradeEngine()
+    assert stream_backtest(single, ExampleStrategy, "SOLUSDT", "1", params) is None
+
+
+def test_portfolio_runner_skips_symbols_with_invalid_candles(tmp_path, monkeypatch, capsys):
+    import config
+    from engine.strategy_runner import run_portfolio_for_interval
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "HISTORICAL_DAYS", 1)
+    monkeypatch.setattr(config, "RESULT_CACHE_PATH", None)
+    save_candles(make_candles(2000), "BTCUSDT", "1", write_csv=False)
+    unsorted = make_candles(2000, seed=6)
+    save_candles(unsorted.iloc[::-1].reset_index(drop=True), "ETHUSDT", "1", write_csv=False)
+    broken = make_candles(2000, seed=7)
+    broken.loc[100, "high"] = broken.loc[100, "low"] - 1
+    save_candles(broken, "SOLUSDT", "1", write_csv=False)
+
+    engine = TradeEngine()
+    run_portfolio_for_interval(["BTCUSDT", "ETHUSDT", "SOLUSDT"], "1", engine, {})
+    out = capsys.readouterr().out
+    assert "Invalid data for ETHUSDT" in out and "Invalid data for SOLUSDT" in out
+    assert "Invalid data for BTCUSDT" not in out
+    assert {trade["symbol"] for trade in engine.trades} == {"BTCUSDT"}
@@ -0,0 +1,164 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import numpy as np
+import pytest
+import pandas as pd
+
+from engine.trade_engine import TradeEngine
+from engine.strategies.example_strategy import ExampleStrategy
+from engine.strategies.MovingAverageCrossStrategy import MovingAverageCrossStrategy
+
+
+def make_candles(n=3000, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-01", periods=n, freq="1min", tz="UTC"),
+        "open": close,
+        "high": close * 1.001,
+        "low": close * 0.999,
+        "close": close,
+        "volume": np.ones(n),
+    })
+
+
+def run_dict_path(symbol, df, signals):
+    engine = TradeEngine()
+    price_updates = [{
+        "timestamp": pd.to_datetime(row["timestamp"]),
+        "symbol": symbol,
+        "action": "price_update",
+        "price": row["close"],
+    } for _, row in df.iterrows()]
+    all_events = signals + price_updates
+    all_events.sort(key=lambda x: x["timestamp"])
+    for event in all_events:
+        engine.process_signal(event)
+    return engine
+
+
+def assert_same_engine_state(expected, actual):
+    assert actual.get_trades() == expected.get_trades()
+    assert actual.balance == expected.balance
+    assert actual.available_balance == expected.available_balance
+    assert actual.max_drawdown == expected.max_drawdown
+    assert set(actual.positions) == set(expected.positions)
+
+
+def test_replay_matches_process_signal_example_strategy():
+    df = make_candles()
+    strategy = ExampleStrategy("BTCUSDT", "1", df, {"entry_interval": 15, "exit_offset": 7})
+    strategy.run()
+
+    expected = run_dict_path("BTCUSDT", df, strategy.get_results())
+    actual = TradeEngine()
+    actual.replay("BTCUSDT", df, strategy.get_results())
+
+    assert len(expected.get_trades()) > 0
+    assert_same_engine_state(expected, actual)
+
+
+def test_replay_matches_process_signal_ma_cross():
+    df = make_candles(n=5000, seed=3)
+    params = {"short_ma": 5, "long_ma": 30, "use_rsi_filter": False,
+              "rsi_period": 14, "rsi_oversold": 30, "rsi_overbought": 70}
+    strategy = MovingAverageCrossStrategy("ETHUSDT", "1", df, params)
+    strategy.run()
+
+    expected = run_dict_path("ETHUSDT", df, strategy.get_results())
+    actual = TradeEngine()
+    actual.replay("ETHUSDT", df, strategy.get_results())
+
+    assert len(expected.get_trades()) > 0
+    assert_same_engine_state(expected, actual)
+
+
+def test_replay_matches_process_signal_trailing_and_open_position():
+    df = make_candles(n=400, seed=11)
+    ts = df["timestamp"]
+    signals = [
+        {"timestamp": ts[10], "symbol": "SOLUSDT", "direction": "SHORT", "entry_price": df["close"][10],
+         "trailing": {"pct": 0.01}, "stop_loss": df["close"][10] * 1.03},
+        {"timestamp": ts[200], "symbol": "SOLUSDT", "direction": "LONG", "entry_price": df["close"][200],
+         "take_profit": df["close"][200] * 1.002, "stop_loss": df["close"][200] * 0.998},
+        # Between two candles: processed before the next candle's price update
+        {"timestamp": ts[250] + pd.Timedelta(seconds=30), "symbol": "SOLUSDT", "direction": "LONG",
+         "entry_price": df["close"][250]},
+        {"timestamp": ts[300], "symbol": "SOLUSDT", "direction": "LONG", "entry_price": df["close"][300]},
+    ]
+
+    expected = run_dict_path("SOLUSDT", df, signals)
+    actual = TradeEngine()
+    actual.replay("SOLUSDT", df, signals)
+
+    assert_same_engine_state(expected, actual)
+    assert "SOLUSDT" in actual.positions
+
+
+def ohlc_candles(close, high, low):
+    n = len(close)
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-01", periods=n, freq="15min", tz="UTC"),
+        "open": close, "high": high, "low": low, "close": close, "volume": np.ones(n),
+    })
+
+
+def test_fill_models_use_candle_ranges():
+    close = np.full(8, 100.0)
+    high = np.array([100, 99, 100, 104, 100, 106, 100, 100], dtype=float)
+    low = np.array([100, 90, 100, 100, 100, 94, 100, 100], dtype=float)
+    df = ohlc_candles(close, high, low)
+    # Opened on candle 1, whose range (down to 90) lies before the entry
+    signals = [{"timestamp": df["timestamp"][1], "symbol": "BTCUSDT", "direction": "LONG",
+                "entry_price": 100.0, "take_profit": 105.0, "stop_loss": 95.0}]
+
+    def exit_of(fill_model):
+        engine = TradeEngine(fill_model=fill_model)
+        engine.replay("BTCUSDT", df, signals)
+        return [(t["exit_time"], t["exit_price"]) for t in engine.trades]
+
+    assert exit_of("close") == []
+    assert exit_of("pessimistic") == [(df["timestamp"][5], 95.0)]
+    assert exit_of("optimistic") == [(df["timestamp"][5], 105.0)]
+    # Without high/low columns every model falls back to closes
+    engine = TradeEngine(fill_model="pessimistic")
+    engine.replay("BTCUSDT", df.drop(columns=["high", "low"]), signals)
+    assert engine.trades == []
+
+
+def test_unknown_fill_model_is_rejected():
+    with pytest.raises(ValueError):
+        TradeEngine(fill_model="midpoint")
+
+
+def test_ohlc_fills_on_15m_candles_track_1m_candles():
+    fine = make_candles(n=15 * 2000, seed=21)
+    close = fine["close"].to_numpy()
+    buckets = close.reshape(-1, 15)
+    coarse = ohlc_candles(buckets[:, -1], buckets.max(axis=1), buckets.min(axis=1))
+    coarse["timestamp"] = fine["timestamp"][::15].reset_index(drop=True)
+
+    def signals(df, step):
+        out = []
+        for i in range(0, len(df), step):
+            price = float(df["close"][i])
+            out.append({"timestamp": df["timestamp"][i], "symbol": "BTCUSDT", "direction": "LONG",
+                        "entry_price": price, "take_profit": price * 1.01, "stop_loss": price * 0.99})
+        return out
+
+    truth = TradeEngine()
+    # Entries at the close of each 15m candle, i.e. on its last 1m candle
+    truth.replay("BTCUSDT", fine, [dict(s, timestamp=s["timestamp"] + pd.Timedelta(minutes=14))
+                                   for s in signals(coarse, 40)])
+    expected = [(t["exit_time"].floor("15min"), t["exit_price"]) for t in truth.trades]
+
+    def matches(fill_model):
+        engine = TradeEngine(fill_model=fill_model)
+        engine.replay("BTCUSDT", coarse, signals(coarse, 40))
+        got = [(t["exit_time"], t["exit_price"]) for t in engine.trades]
+        return sum(g[0] == e[0] and g[1] == pytest.approx(e[1]) for g, e in zip(got, expected))
+
+    assert len(expected) > 20
+    assert matches("pessimistic") >= 0.9 * len(expected)
+    assert matches("pessimistic") > matches("close")
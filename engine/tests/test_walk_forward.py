@@ -0,0 +1,92 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy as np
+import pandas as pd
+
+import config
+import walk_forward_optimizer as wfo
+from engine.indicators import INDICATOR_CACHE
+from engine.trade_engine import TradeEngine
+from engine.strategies.MovingAverageCrossStrategy import MovingAverageCrossStrategy
+from test_parallel import write_sample_data
+from test_pruning import make_candles
+
+
+def test_rolling_folds_are_back_to_back_and_end_with_the_data():
+    ts = pd.Series(pd.date_range("2025-01-01", periods=30 * 24, freq="1h", tz="UTC"))
+    folds = wfo.walk_forward_folds(ts, train_days=10, test_days=5, max_folds=3)
+    assert len(folds) == 3
+    assert folds[-1][1][1] == len(ts)
+    for (train, test), (_, next_test) in zip(folds, folds[1:]):
+        assert test[1] == next_test[0]
+    for train, test in folds:
+        assert train[1] == test[0]
+        assert train[1] - train[0] == 10 * 24
+    # The newest test window includes the last candle
+    assert [test[1] - test[0] for _, test in folds] == [5 * 24, 5 * 24, 5 * 24 + 1]
+
+    # As many folds as fit; the oldest train window may be cut to half its length
+    assert len(wfo.walk_forward_folds(ts, 10, 5)) == 4
+    anchored = wfo.walk_forward_folds(ts, 10, 5, anchored=True)
+    assert [train[0] for train, _ in anchored] == [0] * len(anchored)
+
+    # No data, no folds
+    assert wfo.walk_forward_folds(ts[:0], 10, 5) == []
+
+
+def test_single_fold_split_matches_date_masks():
+    df = make_candles(n=40 * 24 * 60)
+    train_df, test_df = wfo.split_train_test(df, train_days=20, test_days=10)
+    end = df["timestamp"].iloc[-1]
+    split = end - pd.Timedelta(days=10)
+    expected_train = df[(df["timestamp"] >= split - pd.Timedelta(days=20)) & (df["timestamp"] < split)]
+    expected_test = df[df["timestamp"] >= split]
+    pd.testing.assert_frame_equal(train_df, expected_train.reset_index(drop=True))
+    pd.testing.assert_frame_equal(test_df, expected_test.reset_index(drop=True))
+
+
+def test_strategy_rows_reuse_indicators_and_stay_in_range():
+    df = make_candles(n=6000, drift=0)
+    params = {"short_ma": 10, "long_ma": 30, "use_rsi_filter": False,
+              "rsi_period": 14, "rsi_oversold": 30, "rsi_overbought": 70}
+
+    full = TradeEngine()
+    full.run_strategy(MovingAverageCrossStrategy("BTCUSDT", "1", df, params))
+    whole = TradeEngine()
+    whole.run_strategy_rows(MovingAverageCrossStrategy("BTCUSDT", "1", df, params))
+    assert whole.trades == full.trades
+
+    INDICATOR_CACHE.clear()
+    for lo, hi in [(1000, 3000), (3000, 4000), (2000, 5000)]:
+        engine = TradeEngine()
+        engine.run_strategy_rows(MovingAverageCrossStrategy("BTCUSDT", "1", df, params), lo, hi)
+        assert engine.trades
+        for trade in engine.trades:
+            assert df["timestamp"].iloc[lo] <= trade["entry_time"] <= trade["exit_time"] <= df["timestamp"].iloc[hi - 1]
+    assert INDICATOR_CACHE.misses == 2  # both SMAs, computed once for all row ranges
+
+
+def test_walk_forward_folds_in_parallel_match_serial(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "HISTORICAL_DAYS", 30)
+    monkeypatch.setattr(wfo, "ensure_data", lambda symbol, interval: True)
+    write_sample_data(["BTCUSDT"], interval="1", days=32)
+
+    serial, folds = wfo.run_walk_forward_optimization("BTCUSDT", "15", workers=1, folds=3)
+    parallel, parallel_folds = wfo.run_walk_forward_optimization("BTCUSDT", "15", workers=2, folds=3)
+
+    n_params = len(list(wfo.ExampleStrategy.generate_param_combinations()))
+    assert len(serial) == 3 * n_params
+    assert serial == parallel
+    assert folds == parallel_folds
+    assert [row["fold"] for row in folds] == [1, 2, 3]
+    for row in folds:
+        best = max((r for r in serial if r["fold"] == row["fold"]), key=lambda r: r["train_final_balance"])
+        assert row["test_final_balance"] == best["test_final_balance"]
+
+    summary = wfo.aggregate_folds(folds)
+    growth = np.prod([row["test_final_balance"] / config.START_BALANCE for row in folds])
+    assert summary["folds"] == 3
+    assert summary["oos_return_pct"] == round((growth - 1) * 100, 4)
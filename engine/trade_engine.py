@@ -1,8 +1,34 @@
 # trade_engine.py
 import pandas as pd
-import os
-import importlib.util
+import numpy as np
+import config
 from config import POSITION_MODE, FIXED_TRADE_AMOUNT, RISK_PCT
+from engine.equity_curve import EquityCurve
+from engine.instrumentation import timed, timer
+from engine.kernels import find_exit
+from engine import strategy_registry
+
+# Compact signal layout consumed by TradeEngine.replay_arrays
+SIGNAL_EXIT = 0
+SIGNAL_LONG = 1
+SIGNAL_SHORT = -1
+
+SIGNAL_DTYPE = np.dtype([
+    ("index", np.int64),          # candle index the signal is processed before
+    ("timestamp", np.int64),      # epoch nanoseconds
+    ("kind", np.int8),            # SIGNAL_EXIT, SIGNAL_LONG or SIGNAL_SHORT
+    ("price", np.float64),
+    ("entry_price", np.float64),
+    ("take_profit", np.float64),  # NaN when not set
+    ("stop_loss", np.float64),    # NaN when not set
+    ("trailing_pct", np.float64), # NaN when not set
+])
+
+# Tie-break of TradeEngine.replay_steps keys: signals go before price updates at the same time
+STEP_SIGNAL = 0
+STEP_PRICE_UPDATE = 1
+
+FILL_MODELS = ("close", "pessimistic", "optimistic")
 
 class Position:
     def __init__(self, symbol, direction, entry_time, entry_price, qty, tp=None, sl=None, trailing=None):
@@ -53,7 +79,8 @@ class Position:
 
 
 class TradeEngine:
-    def __init__(self, starting_balance=10000, fee_pct=0.001, slippage_pct=0.001, risk_per_trade=0.01):
+    def __init__(self, starting_balance=10000, fee_pct=0.001, slippage_pct=0.001, risk_per_trade=0.01,
+                 equity_mode=None, equity_resolution=None, fill_model=None):
         self.positions = {}
         self.trades = []
         self.fee_pct = fee_pct
@@ -66,9 +93,39 @@ class TradeEngine:
         # Equity tracking for max drawdown
         self.max_equity = starting_balance
         self.max_drawdown = 0.0
-        self.equity_curve = []  # list of dicts with timestamp and balance
+        # "every", "change" or "resolution" sampling, see EquityCurve
+        if equity_mode is None:
+            equity_mode = getattr(config, "EQUITY_CURVE_MODE", "change")
+        if equity_resolution is None:
+            equity_resolution = getattr(config, "EQUITY_CURVE_RESOLUTION", None)
+        self.equity_curve = EquityCurve(equity_mode, equity_resolution)
+
+        # How replays fill TP/SL between signals, see config.FILL_MODEL
+        if fill_model is None:
+            fill_model = getattr(config, "FILL_MODEL", "close")
+        if fill_model not in FILL_MODELS:
+            raise ValueError(f"Unknown fill model: {fill_model}")
+        self.fill_model = fill_model
 
+        # Kill rules (set_kill_rules); a halted engine ignores further events
+        self.kill_max_drawdown = None
+        self.kill_min_equity = None
+        self.halted = False
+        self.halt_reason = None
+        self.halted_at = None
+
+    def set_kill_rules(self, max_drawdown_pct=None, min_equity=None):
+        """
+        Halts the run as soon as the drawdown exceeds max_drawdown_pct (percent) or
+        the balance drops below min_equity. Replays stop at the halting event.
+        """
+        self.kill_max_drawdown = max_drawdown_pct / 100 if max_drawdown_pct is not None else None
+        self.kill_min_equity = min_equity
+
+    @timed("process_signal")
     def process_signal(self, signal):
+        if self.halted:
+            return
         timestamp = signal["timestamp"]
         symbol = signal["symbol"]
 
@@ -104,9 +161,150 @@ class TradeEngine:
             return
 
         # Opening new position
-        direction = signal["direction"]
-        entry_price = signal.get("entry_price", price)
+        self._open_position(
+            symbol,
+            timestamp,
+            signal["direction"],
+            signal.get("entry_price", price),
+            tp=signal.get("take_profit"),
+            sl=signal.get("stop_loss"),
+            trailing=signal.get("trailing")
+        )
+        self._track_equity(timestamp)
+
+    def replay(self, symbol, df, signals):
+        """
+        Batch equivalent of feeding `signals` plus one price_update per candle of `df`
+        through process_signal in timestamp order.
+        """
+        timestamps = df["timestamp"]
+        return self.replay_arrays(
+            symbol,
+            timestamps,
+            df["close"].to_numpy(dtype=np.float64),
+            signals_to_array(signals, timestamps),
+            **bar_ranges(df)
+        )
+
+    def run_strategy(self, strategy):
+        """
+        Runs `strategy` on its data and replays the result. Strategies implementing
+        generate_signals_vectorized() go straight from arrays to the engine;
+        others go through run()/get_results() signal dicts.
+        """
+        return self.replay_arrays(strategy.symbol, *strategy_signal_arrays(strategy), **bar_ranges(strategy.data))
+
+    def run_strategy_rows(self, strategy, start=0, stop=None):
+        """
+        run_strategy limited to rows [start, stop) of the strategy's data. The strategy
+        still sees the whole series (start_bar = start, flat at start), so its
+        indicators have their full history and are cached once for every row range
+        of the same data.
+        """
+        stop = len(strategy.data) if stop is None else stop
+        strategy.start_bar = start
+        timestamps, close, signals = strategy_signal_arrays(strategy)
+        signals = signals[(signals["index"] >= start) & (signals["index"] < stop)]
+        signals["index"] -= start
+        ranges = {name: values[start:stop] for name, values in bar_ranges(strategy.data).items()}
+        return self.replay_arrays(strategy.symbol, _to_epoch_ns(timestamps)[start:stop], close[start:stop], signals,
+                                  **ranges)
+
+    def replay_arrays(self, symbol, timestamps, close, signals, tz="UTC", high=None, low=None):
+        """
+        Replays one symbol's candles and signals without building per-candle events.
 
+        :param timestamps: candle times (datetime-like or int64 epoch nanoseconds), sorted
+        :param close: candle close prices
+        :param signals: SIGNAL_DTYPE array, see signals_to_array
+        :param tz: timezone of the timestamps written to the trades list
+        :param high, low: candle ranges, used by the "pessimistic"/"optimistic" fill models
+        :return: list of trades, identical to the process_signal path under the "close" fill model
+
+        Price updates only matter while a position is open, so the candles between
+        two signals are scanned for a TP/SL hit with array operations. The equity
+        curve is recorded whenever the balance changes.
+        """
+        with timer("replay", items=len(close)):
+            for _ in self.replay_steps(symbol, timestamps, close, signals, tz, high, low):
+                pass
+        return self.trades
+
+    def replay_steps(self, symbol, timestamps, close, signals, tz="UTC", high=None, low=None):
+        """
+        Generator form of replay_arrays. Before each step that can change the engine
+        state it yields the step's sort key (epoch ns, STEP_SIGNAL or STEP_PRICE_UPDATE)
+        and performs it when resumed, so steps of several symbols can be interleaved
+        in time order (see engine.portfolio).
+        """
+        ts = _to_epoch_ns(timestamps)
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        n = len(close)
+        if self.fill_model == "close" or high is None or low is None:
+            ranges = None
+        else:
+            ranges = (np.ascontiguousarray(high, dtype=np.float64), np.ascontiguousarray(low, dtype=np.float64))
+        bar = 0
+        opened_at = -1
+
+        for idx, sig_ts, kind, price, entry_price, tp, sl, trailing_pct in zip(
+            signals["index"].tolist(), signals["timestamp"].tolist(), signals["kind"].tolist(),
+            signals["price"].tolist(), signals["entry_price"].tolist(), signals["take_profit"].tolist(),
+            signals["stop_loss"].tolist(), signals["trailing_pct"].tolist()
+        ):
+            if bar < idx:
+                yield from self._replay_price_updates(symbol, ts, close, bar, idx, tz, ranges, opened_at)
+                bar = idx
+
+            yield sig_ts, STEP_SIGNAL
+            if self.halted:
+                return
+            timestamp = pd.Timestamp(sig_ts, tz=tz)
+            pos = self.positions.get(symbol)
+
+            if kind == SIGNAL_EXIT:
+                if pos is not None:
+                    self._close_position(symbol, timestamp, price)
+                    self._track_equity(timestamp)
+            elif pos is not None:
+                exit_flag, exit_price = pos.should_exit(price)
+                if exit_flag:
+                    self._close_position(symbol, timestamp, exit_price)
+                    self._track_equity(timestamp)
+            elif self._open_position(
+                symbol,
+                timestamp,
+                "LONG" if kind == SIGNAL_LONG else "SHORT",
+                entry_price,
+                tp=None if np.isnan(tp) else tp,
+                sl=None if np.isnan(sl) else sl,
+                trailing=None if np.isnan(trailing_pct) else {"pct": trailing_pct}
+            ):
+                opened_at = idx
+
+        if bar < n and not self.halted:
+            yield from self._replay_price_updates(symbol, ts, close, bar, n, tz, ranges, opened_at)
+
+    def _replay_price_updates(self, symbol, ts, close, start, stop, tz, ranges=None, opened_at=-1):
+        pos = self.positions.get(symbol)
+        if pos is None:
+            return
+        if ranges is None:
+            exit_bar, exit_price = _find_exit(pos, close, start, stop)
+        else:
+            # The range of the candle a position was opened on lies before the entry
+            intrabar_from = start + 1 if opened_at == start else start
+            exit_bar, exit_price = _find_exit(pos, close, start, stop, *ranges, intrabar_from,
+                                              self.fill_model == "pessimistic")
+        if exit_bar >= 0:
+            yield int(ts[exit_bar]), STEP_PRICE_UPDATE
+            if self.halted:
+                return
+            exit_time = pd.Timestamp(int(ts[exit_bar]), tz=tz)
+            self._close_position(symbol, exit_time, exit_price)
+            self._track_equity(exit_time)
+
+    def _open_position(self, symbol, timestamp, direction, entry_price, tp=None, sl=None, trailing=None):
         if POSITION_MODE == "fixed":
             amount_to_use = FIXED_TRADE_AMOUNT
         else:
@@ -114,8 +312,7 @@ class TradeEngine:
 
         if amount_to_use > self.available_balance:
             print(f"❌ Not enough available balance to open position for {symbol}. Skipping.")
-            self._track_equity(timestamp)
-            return
+            return False
 
         qty = amount_to_use / entry_price
 
@@ -125,15 +322,14 @@ class TradeEngine:
             entry_time=timestamp,
             entry_price=entry_price,
             qty=qty,
-            tp=signal.get("take_profit"),
-            sl=signal.get("stop_loss"),
-            trailing=signal.get("trailing")
+            tp=tp,
+            sl=sl,
+            trailing=trailing
         )
 
         self.positions[symbol] = pos
         self.available_balance -= amount_to_use
-
-        self._track_equity(timestamp)
+        return True
 
     def _close_position(self, symbol, exit_time, exit_price):
         pos = self.positions[symbol]
@@ -178,7 +374,7 @@ class TradeEngine:
 
     def _track_equity(self, timestamp):
         current_equity = self.balance
-        self.equity_curve.append({"timestamp": timestamp, "balance": current_equity})
+        self.equity_curve.record(timestamp, current_equity)
 
         if current_equity > self.max_equity:
             self.max_equity = current_equity
@@ -188,11 +384,23 @@ class TradeEngine:
             if drawdown_pct > self.max_drawdown:
                 self.max_drawdown = drawdown_pct
 
-    def get_summary(self):
-        # Save equity curve to CSV
-        df = pd.DataFrame(self.equity_curve)
-        df.to_csv("equity_curve.csv", index=False)
+        if self.halted:
+            return
+        if self.kill_max_drawdown is not None and self.max_drawdown > self.kill_max_drawdown:
+            self._halt(timestamp, f"drawdown {self.max_drawdown * 100:.2f}% > {self.kill_max_drawdown * 100:g}%")
+        elif self.kill_min_equity is not None and current_equity < self.kill_min_equity:
+            self._halt(timestamp, f"equity {current_equity:.2f} < {self.kill_min_equity:g}")
+
+    def _halt(self, timestamp, reason):
+        self.halted = True
+        self.halt_reason = reason
+        self.halted_at = timestamp
+
+    def export_equity_curve(self, filename="equity_curve.npz"):
+        """Writes the equity curve as a binary .npz, see EquityCurve.load."""
+        self.equity_curve.save(filename)
 
+    def get_summary(self):
         return {
             "final_balance": self.balance,
             "total_trades": len(self.trades),
@@ -200,20 +408,128 @@ class TradeEngine:
         }
 
 
+def strategy_signal_arrays(strategy):
+    """(timestamps, close, SIGNAL_DTYPE signals) of a strategy, ready for replay_arrays."""
+    df = strategy.data
+    timestamps = df["timestamp"]
+    close = df["close"].to_numpy(dtype=np.float64)
+    has_vectorized = getattr(strategy, "has_vectorized_signals", None)
+    if has_vectorized is not None and has_vectorized():
+        with timer("signals_vectorized", items=len(close)):
+            return timestamps, close, vectorized_signals_to_array(strategy.generate_signals_vectorized(), timestamps)
+
+    with timer("strategy_run", items=len(close)):
+        strategy.run()
+    with timer("signals_to_array"):
+        return timestamps, close, signals_to_array(strategy.get_results(), timestamps)
+
+
+def bar_ranges(data) -> dict:
+    """{"high": ..., "low": ...} arrays of a candle frame or column dict, for replay_arrays."""
+    if "high" not in data or "low" not in data:
+        return {}
+    return {name: np.asarray(data[name], dtype=np.float64) for name in ("high", "low")}
+
+
+def signals_to_array(signals, timestamps):
+    """
+    Converts strategy signal dicts into a SIGNAL_DTYPE array for TradeEngine.replay_arrays.
+
+    Signals are stably sorted by time and mapped to the first candle at or after
+    their timestamp, matching the order process_signal sees them in when they are
+    merged with per-candle price updates.
+    """
+    out = np.empty(len(signals), dtype=SIGNAL_DTYPE)
+    for i, signal in enumerate(signals):
+        price = signal.get("price") or signal.get("entry_price") or signal.get("exit_price")
+        if price is None:
+            raise ValueError("Signal must include 'price', 'entry_price' or 'exit_price'")
+
+        if signal.get("exit", False):
+            kind = SIGNAL_EXIT
+        elif signal.get("direction") == "LONG":
+            kind = SIGNAL_LONG
+        elif signal.get("direction") == "SHORT":
+            kind = SIGNAL_SHORT
+        else:
+            raise ValueError(f"Signal has no valid direction: {signal}")
+
+        trailing = signal.get("trailing")
+        out[i] = (
+            0,
+            pd.Timestamp(signal["timestamp"]).value,
+            kind,
+            price,
+            signal.get("entry_price", price),
+            signal.get("take_profit") or np.nan,
+            signal.get("stop_loss") or np.nan,
+            trailing["pct"] if trailing else np.nan,
+        )
+
+    out = out[np.argsort(out["timestamp"], kind="stable")]
+    out["index"] = np.searchsorted(_to_epoch_ns(timestamps), out["timestamp"], side="left")
+    return out
+
+
+def vectorized_signals_to_array(vectorized, timestamps):
+    """
+    Converts a BaseStrategy.generate_signals_vectorized() result into a SIGNAL_DTYPE
+    array, exits ahead of entries on the same candle.
+    """
+    ts = _to_epoch_ns(timestamps)
+    n = len(ts)
+    exits = np.flatnonzero(vectorized["exits"])
+    entries = np.flatnonzero(vectorized["entries"])
+    idx = np.concatenate((exits, entries))
+
+    out = np.empty(len(idx), dtype=SIGNAL_DTYPE)
+    out["index"] = idx
+    out["timestamp"] = ts[idx]
+    out["kind"][:len(exits)] = SIGNAL_EXIT
+    out["kind"][len(exits):] = np.broadcast_to(np.asarray(vectorized["direction"], dtype=np.int8), n)[entries]
+    out["price"] = np.asarray(vectorized["price"], dtype=np.float64)[idx]
+    out["entry_price"] = out["price"]
+    for field in ("take_profit", "stop_loss", "trailing_pct"):
+        values = vectorized.get(field)
+        out[field] = np.nan if values is None else np.asarray(values, dtype=np.float64)[idx]
+
+    return out[np.argsort(out["index"], kind="stable")]
+
+
+def _to_epoch_ns(timestamps):
+    if isinstance(timestamps, np.ndarray) and np.issubdtype(timestamps.dtype, np.integer):
+        return timestamps.astype(np.int64, copy=False)
+    return pd.DatetimeIndex(timestamps).as_unit("ns").asi8
+
+
+def _find_exit(pos, close, start, stop, high=None, low=None, intrabar_from=0, pessimistic=True):
+    """
+    Returns (bar, exit_price) of the first candle in close[start:stop] that closes
+    `pos`, or (-1, None), using kernels.find_exit (high/low: intrabar fills). A
+    trailing TP's state is written back to the position so later signals continue
+    from it.
+    """
+    bar, exit_price, tp, trailing_active = find_exit(
+        close, start, stop,
+        SIGNAL_LONG if pos.direction == "LONG" else SIGNAL_SHORT,
+        pos.entry_price,
+        tp=pos.tp if pos.tp is not None else np.nan,
+        sl=pos.sl if pos.sl is not None else np.nan,
+        trailing_pct=pos.trailing["pct"] if pos.trailing else np.nan,
+        trailing_active=pos.trailing_active,
+        high=high,
+        low=low,
+        intrabar_from=intrabar_from,
+        pessimistic=pessimistic,
+    )
+    if pos.trailing and trailing_active:
+        pos.tp = tp
+        pos.trailing_active = True
+    if bar < 0:
+        return -1, None
+    return bar, exit_price
+
+
 def discover_strategy_classes(directory):
-    strategy_classes = []
-    for filename in os.listdir(directory):
-        if filename.endswith(".py") and not filename.startswith("__"):
-            module_name = filename[:-3]
-            filepath = os.path.join(directory, filename)
-            spec = importlib.util.spec_from_file_location(module_name, filepath)
-            module = importlib.util.module_from_spec(spec)
-            try:
-                spec.loader.exec_module(module)
-                for attr_name in dir(module):
-                    obj = getattr(module, attr_name)
-                    if isinstance(obj, type) and hasattr(obj, "generate_param_combinations"):
-                        strategy_classes.append((module_name, attr_name))
-            except Exception as e:
-                print(f"Error loading {filename}: {e}")
-    return strategy_classes
+    """(module name, class name) of the strategies in directory, see strategy_registry.discover."""
+    return strategy_registry.discover(directory)
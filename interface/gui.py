@@ -3,7 +3,6 @@
 import tkinter as tk
 from tkinter import ttk
 import threading
-import importlib.util
 import os
 import sys
 import matplotlib.pyplot as plt
@@ -11,8 +10,7 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 import config
-from engine.optimizer_gui_runner import run_optimizer_with_params
-from engine.trade_engine import discover_strategy_classes
+from engine import strategy_registry
 
 class BacktestGUI:
     def __init__(self, root):
@@ -55,7 +53,7 @@ class BacktestGUI:
         self.refresh_strategies()
 
     def refresh_strategies(self):
-        strategies = discover_strategy_classes("engine/strategies")
+        strategies = strategy_registry.discover("engine/strategies")
         strategy_paths = [f"{name}.{cls}" for name, cls in strategies]
         self.strategy_cb["values"] = strategy_paths
         if strategy_paths:
@@ -114,11 +112,11 @@ class BacktestGUI:
 
         def runner():
             try:
+                # Imported on first run: keeps the engine and pandas out of GUI startup
+                from engine.optimizer_gui_runner import run_optimizer_with_params
+
                 module_name, class_name = strategy_path.split(".")
-                spec = importlib.util.spec_from_file_location(module_name, f"engine/strategies/{module_name}.py")
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                StrategyClass = getattr(module, class_name)
+                StrategyClass = strategy_registry.load_strategy_class("engine/strategies", module_name, class_name)
 
                 def update_progress(current, total):
                     self.progress_var.set(f"Running {current} of {total}")
@@ -1,6 +1,7 @@
 # walk_forward_optimizer.py
 import os
 import sys
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 from engine.export_utils import save_results
@@ -8,142 +9,284 @@ from engine.export_utils import save_results
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import config
-from engine.data_loader import load_csv, validate_candles
-from engine.data_handler import fetch_and_save_candles
+from engine import instrumentation
+from engine.data_loader import load_csv, source_interval, validate_candles
+from engine.candle_store import load_columns
+from engine.data_handler import fetch_and_save_candles, sync_candles
 from engine.export_utils import export_optimizer_top_configs
+from engine.instrumentation import profile_params, timer
+from engine.parallel import run_tasks
+from engine.result_cache import run_strategy_cached
+from engine.pruning import kill_rules, print_prune_report, pruned_info, run_prefix, screen_params
+from engine.shared_candles import SharedCandleCache
 from engine.trade_engine import TradeEngine
 from engine.strategies.example_strategy import ExampleStrategy
 
 def split_train_test(df, train_days=20, test_days=10):
-    """Split DataFrame into train and test segments by date."""
+    """Split DataFrame into train and test segments by date (the last walk-forward fold)."""
     if df.empty:
         return None, None
-    end_date = pd.to_datetime(df["timestamp"].iloc[-1], utc=True)
-    train_start = end_date - pd.Timedelta(days=train_days + test_days)
-    train_end = end_date - pd.Timedelta(days=test_days)
-    train_df = df[(df["timestamp"] >= train_start.isoformat()) & (df["timestamp"] < train_end.isoformat())]
-    test_df = df[(df["timestamp"] >= train_end.isoformat()) & (df["timestamp"] <= end_date.isoformat())]
-    return train_df.reset_index(drop=True), test_df.reset_index(drop=True)
+    folds = walk_forward_folds(df["timestamp"], train_days, test_days, max_folds=1)
+    if not folds:
+        return None, None
+    (train_lo, train_hi), (test_lo, test_hi) = folds[0]
+    return df.iloc[train_lo:train_hi].reset_index(drop=True), df.iloc[test_lo:test_hi].reset_index(drop=True)
+
+def walk_forward_folds(timestamps, train_days, test_days, step_days=None, anchored=False, max_folds=None):
+    """
+    Row ranges of walk-forward folds, oldest first: ((train_lo, train_hi), (test_lo, test_hi)).
+
+    The last test window ends with the data and each earlier fold is shifted back by
+    step_days. Rolling folds train on the train_days before their test window,
+    anchored folds on everything since the first candle. Boundaries are found with
+    searchsorted on the timestamps; the oldest train window may be cut short by the
+    start of the data, down to half its length.
+
+    :param step_days: shift between folds, default test_days (back-to-back test windows)
+    :param max_folds: keep at most this many of the newest folds
+    """
+    ts = pd.DatetimeIndex(timestamps).as_unit("ns").asi8
+    if len(ts) == 0:
+        return []
+    day = pd.Timedelta(days=1).value
+    step = int((step_days or test_days) * day)
+    first, last = int(ts[0]), int(ts[-1])
+
+    folds = []
+    test_end = last
+    while max_folds is None or len(folds) < max_folds:
+        test_start = test_end - int(test_days * day)
+        train_start = first if anchored else test_start - int(train_days * day)
+        if test_start <= first or test_start - max(train_start, first) < (test_start - train_start) / 2:
+            break
+        train_lo, test_lo, test_hi = np.searchsorted(ts, [train_start, test_start, test_end])
+        # The newest fold tests up to and including the last candle
+        test_hi = len(ts) if test_end == last else test_hi
+        if test_lo > train_lo and test_hi > test_lo:
+            folds.append(((int(train_lo), int(test_lo)), (int(test_lo), int(test_hi))))
+        test_end -= step
+    return folds[::-1]
+
+def fold_days(folds=None, train_days=None, test_days=None):
+    """
+    (folds, train_days, test_days) from arguments or config. Unset windows split
+    config.HISTORICAL_DAYS so that train = 2 x test and all rolling folds fit:
+    one fold trains on the first 2/3 and tests on the last 1/3.
+    """
+    if folds is None:
+        folds = getattr(config, "WALK_FORWARD_FOLDS", 1)
+    if test_days is None:
+        test_days = getattr(config, "WALK_FORWARD_TEST_DAYS", None) or config.HISTORICAL_DAYS / (folds + 2)
+    if train_days is None:
+        train_days = getattr(config, "WALK_FORWARD_TRAIN_DAYS", None) or 2 * test_days
+    return folds, train_days, test_days
 
 def ensure_data(symbol: str, interval: str) -> bool:
+    # Higher intervals are resampled from 1m on load; only the source is downloaded
+    interval = source_interval(interval)
     filename = f"data/{symbol}_{interval}m.csv"
-    if not os.path.isfile(filename):
+    # Only the timestamp column is read here; load_csv maps the full store later
+    columns = load_columns(symbol, interval)
+    if columns is None:
         print(f"❌ File not found: {filename}")
         print(f"⬇️ Downloading missing data for {symbol} interval {interval}m...")
         success = fetch_and_save_candles(symbol, interval, config.HISTORICAL_DAYS)
         return success
 
-    df = load_csv(symbol, interval)
-    if df is None or df.empty:
+    if len(columns["timestamp"]) == 0:
         print(f"❌ Data empty or None for {filename}")
         print(f"⬇️ Re-downloading corrupted data for {symbol} interval {interval}m...")
         success = fetch_and_save_candles(symbol, interval, config.HISTORICAL_DAYS)
         return success
 
     required_start = datetime.now(timezone.utc) - timedelta(days=config.HISTORICAL_DAYS)
-    first_timestamp = pd.to_datetime(df["timestamp"].iloc[0], utc=True)
+    first_timestamp = pd.Timestamp(int(columns["timestamp"][0]), tz="UTC")
 
     if first_timestamp > required_start:
         print(f"❌ Data too short for {symbol} interval {interval}m ({first_timestamp} > {required_start})")
         print(f"⬇️ Downloading missing data for {symbol} interval {interval}m...")
-        success = fetch_and_save_candles(symbol, interval, config.HISTORICAL_DAYS)
+        success = sync_candles(symbol, interval, config.HISTORICAL_DAYS)
         return success
 
     return True
 
-def run_walk_forward_optimization(symbol: str, interval: str):
+def _new_engine():
+    return TradeEngine(
+        starting_balance=config.START_BALANCE,
+        fee_pct=config.FEE_PCT,
+        slippage_pct=config.SLIPPAGE_PCT,
+        risk_per_trade=config.RISK_PCT
+    )
+
+def _evaluate_task(context, task):
+    fold, params = task
+    with profile_params(params, f"walk_forward_{context['symbol']}_{context['interval']}m_fold{fold + 1}"), timer("evaluate"):
+        return _evaluate_fold(context, fold, params)
+
+def _evaluate_fold(context, fold, params):
+    symbol = context["symbol"]
+    interval = context["interval"]
+    (train_lo, train_hi), (test_lo, test_hi) = context["folds"][fold]
+    # Every fold runs on the full series, so its indicators are computed once per worker
+    df = context["candles"].frame()
+
+    # Train
+    trade_engine_train = _new_engine()
+    trade_engine_train.set_kill_rules(**kill_rules())
+    run_strategy_cached(trade_engine_train, ExampleStrategy(symbol, interval, df, params), train_lo, train_hi)
+    if trade_engine_train.halted:
+        return {"fold": fold + 1, **params, **pruned_info(trade_engine_train, df.iloc[train_lo:train_hi], "train")}
+
+    train_final_balance = trade_engine_train.balance
+    train_trades = trade_engine_train.get_trades()
+    train_equity_curve = build_equity_curve(train_trades, config.START_BALANCE)
+
+    # Test
+    trade_engine_test = _new_engine()
+    run_strategy_cached(trade_engine_test, ExampleStrategy(symbol, interval, df, params), test_lo, test_hi)
+
+    test_final_balance = trade_engine_test.balance
+    test_trades = trade_engine_test.get_trades()
+    test_equity_curve = build_equity_curve(test_trades, config.START_BALANCE)
+
+    win_rate = calc_win_rate(test_trades)
+    max_drawdown = calc_max_drawdown(test_trades)
+
+    return {
+        "fold": fold + 1,
+        **params,
+        "train_final_balance": round(train_final_balance, 2),
+        "test_final_balance": round(test_final_balance, 2),
+        "train_total_trades": len(train_trades),
+        "test_total_trades": len(test_trades),
+        "win_rate": win_rate,
+        "max_drawdown": round(max_drawdown, 2),
+        "train_equity_curve": train_equity_curve,
+        "test_equity_curve": test_equity_curve
+    }
+
+def _screen_task(context, task):
+    params, fraction = task
+    return run_prefix(ExampleStrategy, context["symbol"], context["interval"], context["train"], params, fraction)
+
+@instrumentation.run("walk_forward")
+def run_walk_forward_optimization(symbol: str, interval: str, workers=None, folds=None,
+                                  train_days=None, test_days=None, anchored=None):
+    """
+    Optimizes ExampleStrategy on every walk-forward fold of symbol/interval; the
+    (fold, params) runs of all folds share one worker pool.
+
+    :param folds, train_days, test_days: see fold_days
+    :param anchored: anchored instead of rolling train windows, default config.WALK_FORWARD_ANCHORED
+    :return: (one result row per fold and parameter set with "fold" numbered from 1,
+        summarize_folds rows)
+    """
     print(f"▶ Starting walk-forward optimization for {symbol} {interval}m")
 
     if not ensure_data(symbol, interval):
         print(f"❌ Unable to get data for {symbol} interval {interval}m, skipping.")
-        return []
+        return [], []
 
     df = load_csv(symbol, interval)
     if df is None or df.empty:
         print(f"❌ Loaded data empty or None for {symbol} interval {interval}m, skipping.")
-        return []
+        return [], []
 
     if not validate_candles(df, interval=int(interval)):
         print(f"❌ Candle data validation failed for {symbol} interval {interval}m, skipping.")
-        return []
-
-    # Use config.HISTORICAL_DAYS to split train/test (e.g. 2/3 train, 1/3 test)
-    total_days = config.HISTORICAL_DAYS
-    train_days = int(total_days * 2 / 3)
-    test_days = total_days - train_days
-
-    train_df, test_df = split_train_test(df, train_days=train_days, test_days=test_days)
-    if train_df is None or test_df is None or train_df.empty or test_df.empty:
-        print(f"❌ Not enough data ({len(df)} rows) for train+test split ({train_days}+{test_days} days) on {symbol} {interval}m")
-        return []
+        return [], []
+
+    folds, train_days, test_days = fold_days(folds, train_days, test_days)
+    if anchored is None:
+        anchored = getattr(config, "WALK_FORWARD_ANCHORED", False)
+    bounds = walk_forward_folds(df["timestamp"], train_days, test_days, anchored=anchored, max_folds=folds)
+    if not bounds:
+        print(f"❌ Not enough data ({len(df)} rows) for a {train_days:g}+{test_days:g} day fold on {symbol} {interval}m")
+        return [], []
+    if len(bounds) < folds:
+        print(f"⚠️ Only {len(bounds)} of {folds} folds fit the data for {symbol} {interval}m")
 
     param_sets = list(ExampleStrategy.generate_param_combinations())
-    print(f"Running walk-forward optimization for {symbol} {interval}m with {len(param_sets)} parameter sets...")
-
-    results = []
-
-    for idx, params in enumerate(param_sets, 1):
-        # Train
-        strat_train = ExampleStrategy(symbol, interval, train_df, params)
-        strat_train.run()
-        trade_engine_train = TradeEngine(
-            starting_balance=config.START_BALANCE,
-            fee_pct=config.FEE_PCT,
-            slippage_pct=config.SLIPPAGE_PCT,
-            risk_per_trade=config.RISK_PCT
-        )
-        for event in strat_train.signals + price_update_events(train_df, symbol):
-            trade_engine_train.process_signal(event)
-
-        train_final_balance = trade_engine_train.balance
-        train_trades = trade_engine_train.get_trades()
-        train_equity_curve = build_equity_curve(train_trades, config.START_BALANCE)
-
-        # Test
-        strat_test = ExampleStrategy(symbol, interval, test_df, params)
-        strat_test.run()
-        trade_engine_test = TradeEngine(
-            starting_balance=config.START_BALANCE,
-            fee_pct=config.FEE_PCT,
-            slippage_pct=config.SLIPPAGE_PCT,
-            risk_per_trade=config.RISK_PCT
-        )
-        for event in strat_test.signals + price_update_events(test_df, symbol):
-            trade_engine_test.process_signal(event)
-
-        test_final_balance = trade_engine_test.balance
-        test_trades = trade_engine_test.get_trades()
-        test_equity_curve = build_equity_curve(test_trades, config.START_BALANCE)
-
-        win_rate = calc_win_rate(test_trades)
-        max_drawdown = calc_max_drawdown(test_trades)
-
-        results.append({
-            "test_id": idx,
-            **params,
-            "train_final_balance": round(train_final_balance, 2),
-            "test_final_balance": round(test_final_balance, 2),
-            "train_total_trades": len(train_trades),
-            "test_total_trades": len(test_trades),
-            "win_rate": win_rate,
-            "max_drawdown": round(max_drawdown, 2),
-            "train_equity_curve": train_equity_curve,
-            "test_equity_curve": test_equity_curve
+    print(f"Running walk-forward optimization for {symbol} {interval}m: {len(bounds)} "
+          f"{'anchored' if anchored else 'rolling'} folds x {len(param_sets)} parameter sets...")
+
+    results = {}
+    pruned_rows = []
+
+    with SharedCandleCache() as cache:
+        candles = cache.publish((symbol, interval), df)
+
+        tasks = []
+        for fold, ((train_lo, train_hi), _) in enumerate(bounds):
+            fold_context = {"symbol": symbol, "interval": interval, "train": candles.slice(train_lo, train_hi)}
+            surviving, pruned = screen_params(_screen_task, param_sets, fold_context, workers)
+            pruned_rows += [{"fold": fold + 1, **param_sets[idx], **info} for idx, info in sorted(pruned.items())]
+            tasks += [(fold, idx) for idx in surviving]
+
+        context = {"symbol": symbol, "interval": interval, "candles": candles, "folds": bounds}
+        run = [(fold, param_sets[idx]) for fold, idx in tasks]
+        for done, (j, result) in enumerate(run_tasks(_evaluate_task, run, context, workers), 1):
+            fold, idx = tasks[j]
+            if "pruned_by" in result:
+                pruned_rows.append(result)
+                print(f"[{done}/{len(run)}] Fold {fold + 1} | Params: {param_sets[idx]} | Pruned: {result['pruned_reason']}")
+                continue
+            results[(fold, idx)] = {"test_id": fold * len(param_sets) + idx + 1, **result}
+            print(f"[{done}/{len(run)}] Fold {fold + 1} | Params: {param_sets[idx]} | Train Bal: {result['train_final_balance']:.2f} | Test Bal: {result['test_final_balance']:.2f} | Trades (Train/Test): {result['train_total_trades']}/{result['test_total_trades']}")
+
+    print_prune_report(pruned_rows, len(bounds) * len(param_sets))
+    results = [results[key] for key in sorted(results)]
+    return results, summarize_folds(results, df, bounds, symbol, interval)
+
+
+def summarize_folds(results, df, bounds, symbol, interval):
+    """
+    Out-of-sample view of walk-forward results: for each fold the parameter set with
+    the best train balance and how it did on the fold's test window.
+
+    :return: one row per fold
+    """
+    timestamps = df["timestamp"]
+    rows = []
+    for fold, ((train_lo, train_hi), (test_lo, test_hi)) in enumerate(bounds, 1):
+        candidates = [r for r in results if r["fold"] == fold]
+        if not candidates:
+            continue
+        best = max(candidates, key=lambda r: (r["train_final_balance"], -r["test_id"]))
+        rows.append({
+            "symbol": symbol,
+            "interval": interval,
+            "fold": fold,
+            "train_start": timestamps.iloc[train_lo],
+            "train_end": timestamps.iloc[train_hi - 1],
+            "test_start": timestamps.iloc[test_lo],
+            "test_end": timestamps.iloc[test_hi - 1],
+            **{k: best[k] for k in ExampleStrategy.param_grid},
+            "train_final_balance": best["train_final_balance"],
+            "test_final_balance": best["test_final_balance"],
+            "test_return_pct": round((best["test_final_balance"] / config.START_BALANCE - 1) * 100, 4),
+            "test_total_trades": best["test_total_trades"],
+            "win_rate": best["win_rate"],
+            "max_drawdown": best["max_drawdown"],
         })
-
-        print(f"[{idx}/{len(param_sets)}] Params: {params} | Train Bal: {train_final_balance:.2f} | Test Bal: {test_final_balance:.2f} | Trades (Train/Test): {len(train_trades)}/{len(test_trades)}")
-
-    return results
-
-
-# Helper to convert candle DataFrame to price update events
-def price_update_events(df, symbol):
-    return [{
-        "timestamp": pd.to_datetime(row["timestamp"]),
-        "symbol": symbol,
-        "action": "price_update",
-        "price": row["close"],
-    } for _, row in df.iterrows()]
+    return rows
+
+
+def aggregate_folds(fold_rows):
+    """Out-of-sample metrics over all fold rows of summarize_folds."""
+    if not fold_rows:
+        return {}
+    growth = float(np.prod([r["test_final_balance"] / config.START_BALANCE for r in fold_rows]))
+    returns = [r["test_return_pct"] for r in fold_rows]
+    return {
+        "folds": len(fold_rows),
+        "oos_return_pct": round((growth - 1) * 100, 4),
+        "mean_fold_return_pct": round(float(np.mean(returns)), 4),
+        "profitable_folds": sum(r > 0 for r in returns),
+        "test_total_trades": sum(r["test_total_trades"] for r in fold_rows),
+        "mean_win_rate": round(float(np.mean([r["win_rate"] for r in fold_rows])), 4),
+        "worst_max_drawdown": max(r["max_drawdown"] for r in fold_rows),
+    }
 
 
 # Build equity curve from trades
@@ -178,15 +321,20 @@ def calc_max_drawdown(trades):
     return drawdown
 
 
+@instrumentation.run("walk_forward")
 def main():
     all_results = []
+    all_folds = []
 
     os.makedirs("results", exist_ok=True)
 
     for symbol in config.SYMBOLS:
         for interval in config.INTERVAL:
-            results = run_walk_forward_optimization(symbol, interval, train_days=20, test_days=10)
+            results, fold_rows = run_walk_forward_optimization(symbol, interval)
             all_results.extend(results)
+            all_folds.extend(fold_rows)
+            if fold_rows:
+                print(f"🧾 Out-of-sample {symbol} {interval}m: {aggregate_folds(fold_rows)}")
 
     if not all_results:
         print("No walk-forward results to save.")
@@ -198,6 +346,7 @@ def main():
     print("\nTop 10 optimizer configs by test final balance:")
     for r in all_results[:10]:
         print({
+            "fold": r["fold"],
             "entry_interval": r["entry_interval"],
             "exit_offset": r["exit_offset"],
             "test_final_balance": float(r["test_final_balance"]),
@@ -211,6 +360,11 @@ def main():
     
     save_results(all_results, "results/optimizer_results.csv")  # Full param set results
 
+    # Best-on-train params of every fold and their out-of-sample results
+    pd.DataFrame(all_folds).to_csv("results/walk_forward_folds.csv", index=False)
+    print(f"🧾 Out-of-sample over all folds: {aggregate_folds(all_folds)}")
+    print("Fold results saved to results/walk_forward_folds.csv")
+
     # Optional: Create a very basic summary
     summary = {
         "total_tests": len(all_results),